@@ -17,12 +17,18 @@ setup(
         "O365",
         "pandas",
         "selenium",
-        "xlwings",
         "openpyxl",
         "more-itertools",
         "typer",
         "XlsxWriter",
+        "watchdog",
+        "requests",
     ],
+    extras_require={
+        "excel": ["xlwings"],  # recalculates reports in Excel
+        "calamine": ["python-calamine"],  # faster Excel reader
+        "parquet": ["pyarrow"],  # parquet side exports
+    },
     include_package_data=True,
     package_dir={"": "src"},  # this is required to access code in src/
     packages=find_packages(where="src"),  # same as above
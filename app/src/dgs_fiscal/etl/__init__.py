@@ -1,5 +1,32 @@
+from __future__ import annotations  # prevents NameError for typehints
+import importlib
+from typing import TYPE_CHECKING
+
 __all__ = ["PromptPayment", "ContractManagement", "AgingReport"]
 
-from dgs_fiscal.etl.prompt_payment import PromptPayment
-from dgs_fiscal.etl.contract_management import ContractManagement
-from dgs_fiscal.etl.aging_report import AgingReport
+# maps each workflow to the sub-package that defines it so that running one
+# workflow doesn't import the systems and dependencies used by the others
+WORKFLOWS = {
+    "PromptPayment": "dgs_fiscal.etl.prompt_payment",
+    "ContractManagement": "dgs_fiscal.etl.contract_management",
+    "AgingReport": "dgs_fiscal.etl.aging_report",
+}
+
+if TYPE_CHECKING:
+    from dgs_fiscal.etl.prompt_payment import PromptPayment
+    from dgs_fiscal.etl.contract_management import ContractManagement
+    from dgs_fiscal.etl.aging_report import AgingReport
+
+
+def __getattr__(name: str):
+    """Imports the class for a workflow the first time it's accessed"""
+    if name not in WORKFLOWS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    workflow = getattr(importlib.import_module(WORKFLOWS[name]), name)
+    globals()[name] = workflow  # skips __getattr__ on subsequent access
+    return workflow
+
+
+def __dir__() -> list:
+    """Includes the lazily imported workflows in dir()"""
+    return sorted([*globals(), *__all__])
@@ -1,13 +1,18 @@
 from __future__ import annotations  # prevents NameError for typehints
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from pathlib import Path
 from datetime import datetime
 
 import pandas as pd
-from O365.drive import File
 
+from dgs_fiscal.config import settings
+from dgs_fiscal.metrics import timed
 from dgs_fiscal.systems import CitiBuy, SharePoint
-from dgs_fiscal.etl.aging_report import constants
+from dgs_fiscal.etl.excel import read_excel
+from dgs_fiscal.etl.aging_report import constants, utils
+
+if TYPE_CHECKING:
+    from O365.drive import File
 
 REPORT_PATH = "/Prompt Payment/Priority Vendor (Aging) Report/AgingReport.xlsx"
 MATCH_COLS = ["Vendor ID", "Invoice Key"]
@@ -24,17 +29,52 @@ class AgingReport:
     ----------
     citibuy: CitiBuy
         An instance of the CitiBuy class which manages connection to the
-        CitiBuy database
+        CitiBuy database, created lazily on first access
     sharepoint: SharePoint
         An instance of the SharePoint class which manages graph API calls to
-        SharePoint resources
+        SharePoint resources, created lazily on first access
+    citibuy_url: str
+        Connection url used to create the CitiBuy client, if one wasn't passed
     """
 
-    def __init__(self, citibuy_url: str = None) -> None:
-        """Inits the AgingReport class"""
-        self.citibuy = CitiBuy(conn_url=citibuy_url)
-        self.sharepoint = SharePoint()
+    def __init__(
+        self,
+        citibuy_url: str = None,
+        citibuy: CitiBuy = None,
+        sharepoint: SharePoint = None,
+    ) -> None:
+        """Inits the AgingReport class
+
+        The CitiBuy and SharePoint clients are created the first time they're
+        accessed unless existing instances are passed to the constructor
+        """
+        self.citibuy_url = citibuy_url
+        self._citibuy = citibuy
+        self._sharepoint = sharepoint
+
+    @property
+    def citibuy(self) -> CitiBuy:
+        """Returns the CitiBuy client, creating it on first access"""
+        if self._citibuy is None:
+            self._citibuy = CitiBuy(conn_url=self.citibuy_url)
+        return self._citibuy
+
+    @property
+    def sharepoint(self) -> SharePoint:
+        """Returns the SharePoint client, authenticating on first access"""
+        if self._sharepoint is None:
+            self._sharepoint = SharePoint()
+        return self._sharepoint
+
+    def query_report(self) -> Optional[str]:
+        """Returns the profile of each CitiBuy query run by the workflow, or
+        None if the CitiBuy client wasn't created or isn't profiling queries
+        """
+        if self._citibuy is None or self._citibuy.profiler is None:
+            return None
+        return self._citibuy.profiler.report()
 
+    @timed
     def get_sharepoint_data(
         self,
         report_path: Optional[str] = REPORT_PATH,
@@ -54,9 +94,9 @@ class AgingReport:
 
         # download and read in file from SharePoint
         file.download(download_loc)
-        df = pd.read_excel(
+        df = read_excel(
             tmp_file,
-            dtype={
+            dtypes={
                 "Vendor ID": "string",
                 "WO": "string",
                 "Invoice": "string",
@@ -70,6 +110,7 @@ class AgingReport:
 
         return df
 
+    @timed
     def get_receipt_queue(self, receipt_window: int = 365) -> pd.DataFrame:
         """Exports unapproved receipts from CitiBuy
 
@@ -79,19 +120,21 @@ class AgingReport:
             A dataframe of the receipts exported from CitiBuy
         """
         # query receipts not yet approved or approved within the last year
-        # and the people listed in the approval path
-        df = self.citibuy.get_receipts(days_ago=receipt_window).dataframe
-
-        # reorder and rename the columns
-        cols = constants.CITIBUY["receipt_cols"]
-        df = df[cols.keys()]
-        df.columns = cols.values()
-
-        # recode invoice and PO statuses so they're more descriptive
-        df = df.replace(self.citibuy.RECEIPT_STATUS)
+        # and the people listed in the approval path, with the columns
+        # renamed and the statuses decoded by the query
+        df = self.citibuy.get_receipts(
+            days_ago=receipt_window,
+            labels=constants.CITIBUY["receipt_cols"],
+            decode_statuses=True,
+        ).dataframe
+
+        # store the receipt statuses as categoricals
+        statuses = {"Receipt Status": self.citibuy.RECEIPT_STATUS}
+        df = utils.recode_statuses(df, statuses)
 
         return df
 
+    @timed
     def get_citibuy_data(self, invoice_window: int = 365) -> pd.DataFrame:
         """Exports open and recently paid invoices from CitiBuy
 
@@ -107,25 +150,25 @@ class AgingReport:
             A dataframe of the invoices exported from CitiBuy
         """
         # query the data from city,
-        # including invoices paid or cancelled up to a year ago
-        df = self.citibuy.get_invoices(days_ago=invoice_window).dataframe
-
-        # add PO type column
-        open_market = df["contract_end_date"].isna()
-        df["po_type"] = "Release"
-        df.loc[open_market, "po_type"] = "Open Market"
-
-        # reorder and rename the columns
-        cols = constants.CITIBUY["invoice_cols"]
-        df = df[cols.keys()]
-        df.columns = cols.values()
-
-        # recode invoice and PO statuses so they're more descriptive
-        df = df.replace(self.citibuy.INVOICE_STATUS)
-        df = df.replace(self.citibuy.PO_STATUS)
+        # including invoices paid or cancelled up to a year ago,
+        # with the PO type computed, the columns renamed, and the statuses
+        # decoded by the query
+        df = self.citibuy.get_invoices(
+            days_ago=invoice_window,
+            labels=constants.CITIBUY["invoice_cols"],
+            decode_statuses=True,
+        ).dataframe
+
+        # store the invoice and PO statuses as categoricals
+        statuses = {
+            "Invoice Status": self.citibuy.INVOICE_STATUS,
+            "PO Status": self.citibuy.PO_STATUS,
+        }
+        df = utils.recode_statuses(df, statuses)
 
         return df
 
+    @timed
     def populate_report(
         self,
         report: pd.DataFrame,
@@ -156,9 +199,10 @@ class AgingReport:
             on=MATCH_COLS,
         )
         df = df.rename(columns={"Invoice Status": "CitiBuy Status"})
-        df = df.fillna("")
+        df = utils.fill_blanks(df)
         return df
 
+    @timed
     def update_sharepoint(
         self,
         df: pd.DataFrame,
@@ -190,7 +234,12 @@ class AgingReport:
 
         # export the invoice data to local archive
         archive = self.sharepoint.get_archive_folder(local_archive)
-        tmp_file = archive.export_dataframe(df, file_name)
+        tmp_file = archive.export_dataframe(
+            df,
+            file_name,
+            constant_memory=settings.get("archive_constant_memory", False),
+            side_exports=settings.get("archive_side_exports", []),
+        )
 
         # upload the exported file to SharePoint
         folder = folder_name or "aging_report"
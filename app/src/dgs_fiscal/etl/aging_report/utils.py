@@ -0,0 +1,61 @@
+import pandas as pd
+
+
+def recode_status(col: pd.Series, codes: dict) -> pd.Series:
+    """Recodes a column of status codes as a categorical of their descriptions
+
+    Each distinct code is only looked up once, after the column has been
+    factorized into categories. Codes missing from the mapping are kept as
+    their own categories after the described statuses, so columns that were
+    already decoded by the CitiBuy query are only converted to categoricals.
+
+    Parameters
+    ----------
+    col: pd.Series
+        The column of status codes to recode
+    codes: dict
+        Maps each status code to its description, e.g. CitiBuy.INVOICE_STATUS
+
+    Returns
+    -------
+    pd.Series
+        The recoded column with a categorical dtype whose categories are the
+        descriptions in the order they're listed in codes
+    """
+    col = col.astype("category")
+    described = list(codes.values())
+    found = [codes.get(code, code) for code in col.cat.categories]
+    col = col.cat.rename_categories(found)
+    unknown = [status for status in found if status not in described]
+    return col.cat.set_categories([*described, *unknown])
+
+
+def recode_statuses(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """Recodes each of the status columns in a dataframe with recode_status()
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        The dataframe with the status columns to recode
+    columns: dict
+        Maps the name of each status column to the codes used to recode it
+
+    Returns
+    -------
+    pd.DataFrame
+        The dataframe with only the status columns recoded
+    """
+    recoded = {
+        name: recode_status(df[name], codes) for name, codes in columns.items()
+    }
+    return df.assign(**recoded)
+
+
+def fill_blanks(df: pd.DataFrame) -> pd.DataFrame:
+    """Replaces missing values with empty strings, first adding an empty
+    string to the categories of the categorical columns so they can hold it
+    """
+    for name in df.select_dtypes("category").columns:
+        if "" not in df[name].cat.categories:
+            df[name] = df[name].cat.add_categories("")
+    return df.fillna("")
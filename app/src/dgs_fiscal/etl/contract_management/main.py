@@ -1,12 +1,14 @@
 from __future__ import annotations  # prevents NameError for typehints
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 
 import pandas as pd
 import numpy as np
 
+from dgs_fiscal.metrics import timed
 from dgs_fiscal.systems import CitiBuy, SharePoint
 from dgs_fiscal.systems.sharepoint import BatchedChanges, BatchResults
+from dgs_fiscal.systems.sharepoint.utils import serialize_value
 from dgs_fiscal.etl.contract_management import constants
 
 
@@ -18,10 +20,11 @@ class ContractManagement:
     ----------
     citibuy: CitiBuy
         An instance of the CitiBuy class which connects to and queries data
-        from the CitiBuy database
+        from the CitiBuy database, created lazily on first access
     sharepoint: SharePoint
         Instance of SharePoint class used to read and write to the SharePoint
-        lists and folders associated with the Contract Management workflow
+        lists and folders associated with the Contract Management workflow,
+        created lazily on first access
     po_list: str
         The name of the SharePoint list for Purchase Orders
     vend_list: str
@@ -36,14 +39,44 @@ class ContractManagement:
         vendor_list: str = "Vendors",
         po_list: str = "PO Releases",
         contract_list: str = "Master Blanket POs",
+        citibuy: CitiBuy = None,
+        sharepoint: SharePoint = None,
     ) -> None:
-        """Inits the ContractManagement class"""
-        self.citibuy = CitiBuy(conn_url=citibuy_url)
-        self.sharepoint = SharePoint()
+        """Inits the ContractManagement class
+
+        The CitiBuy and SharePoint clients are created the first time they're
+        accessed unless existing instances are passed to the constructor
+        """
+        self.citibuy_url = citibuy_url
+        self._citibuy = citibuy
+        self._sharepoint = sharepoint
         self.po_list = po_list
         self.vendor_list = vendor_list
         self.contract_list = contract_list
 
+    @property
+    def citibuy(self) -> CitiBuy:
+        """Returns the CitiBuy client, creating it on first access"""
+        if self._citibuy is None:
+            self._citibuy = CitiBuy(conn_url=self.citibuy_url)
+        return self._citibuy
+
+    @property
+    def sharepoint(self) -> SharePoint:
+        """Returns the SharePoint client, authenticating on first access"""
+        if self._sharepoint is None:
+            self._sharepoint = SharePoint()
+        return self._sharepoint
+
+    def query_report(self) -> Optional[str]:
+        """Returns the profile of each CitiBuy query run by the workflow, or
+        None if the CitiBuy client wasn't created or isn't profiling queries
+        """
+        if self._citibuy is None or self._citibuy.profiler is None:
+            return None
+        return self._citibuy.profiler.report()
+
+    @timed
     def get_citibuy_data(self) -> ContractData:
         """Gets the list of active or recently closed Purchase Orders and the
         unique list of DGS vendors from CitiBuy
@@ -53,58 +86,22 @@ class ContractManagement:
         ContractData
             A ContractData instance of the PO and vendor data from CitiBuy
         """
-        po_cols = constants.CITIBUY["po_cols"]
-        ven_cols = constants.CITIBUY["vendor_cols"]
-        con_cols = constants.CITIBUY["contract_cols"]
-
-        # get PO data from citibuy
-        df = self.citibuy.get_purchase_orders().dataframe
-        df = df.sort_values(
-            # sort by PO and release number
-            # with DGS contracts before AGY contracts
-            by=["po_nbr", "release_nbr", "contract_agency"],
-            ascending=[True, True, False],
+        # get the unique POs, vendors, and contracts from citibuy, which are
+        # de-duplicated and have their locations aggregated in the query
+        sets = self.citibuy.get_purchase_order_sets(
+            po_cols=constants.CITIBUY["po_cols"],
+            vendor_cols=constants.CITIBUY["vendor_cols"],
+            contract_cols=constants.CITIBUY["contract_cols"],
         )
-
-        # set the PO title
-        release = df["release_nbr"].astype(str)
-        df["po_title"] = np.where(
-            release == "0",  # when release number is 0
-            df["po_nbr"],  # exclude it from the title: 'P12345'
-            df["po_nbr"] + ":" + release,  # otherwise append it: 'P12345:1'
+        # datetime cols are serialized when the requests to SharePoint are
+        # built, so only the dates of changed items are formatted
+        return ContractData(
+            po=sets["po"].dataframe,
+            vendor=sets["vendor"].dataframe,
+            contract=sets["contract"].dataframe,
         )
 
-        # convert datetime cols to string to avoid serialization error
-        for col in ["start_date", "end_date", "date"]:
-            df[col] = pd.to_datetime(df[col])
-            df[col] = df[col].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-            # replaces NaT to prevent error
-            df[col] = df[col].replace({pd.NaT: None})
-
-        # sets the PO type
-        blanket_po = (release == "0") & (df["start_date"].notna())
-        open_market = (release == "0") & (df["start_date"].isna())
-        df["po_type"] = "Release"
-        df.loc[blanket_po, "po_type"] = "Master Blanket"
-        df.loc[open_market, "po_type"] = "Open Market"
-
-        # aggregates the location field for contracts and vendors
-        # excluding all non DGS locations
-        dgs_po = df["agency"] == "DGS"  # excludes non-DGS POs
-        df["con_loc"] = df["po_nbr"].map(
-            df[dgs_po].groupby("po_nbr")["unit"].agg(set).str.join(", ")
-        )
-        df["ven_loc"] = df["vendor_id"].map(
-            df[dgs_po].groupby("vendor_id")["unit"].agg(set).str.join(", ")
-        )
-
-        # isloate and format separate dataframes
-        df_po = self._get_unique(df, po_cols, "po_title")
-        df_ven = self._get_unique(df, ven_cols, "vendor_id")
-        df_con = self._get_unique(df[blanket_po], con_cols, "po_nbr")
-
-        return ContractData(po=df_po, vendor=df_ven, contract=df_con)
-
+    @timed
     def get_sharepoint_data(self) -> ContractData:
         """Get current POs and Vendors from their respective SharePoint lists
 
@@ -127,6 +124,7 @@ class ContractManagement:
 
         return ContractData(po=df_po, vendor=df_ven, contract=df_con)
 
+    @timed
     def update_vendor_list(
         self,
         old: pd.Dataframe,
@@ -173,6 +171,7 @@ class ContractManagement:
         )
         return output
 
+    @timed
     def update_contract_list(
         self,
         old: pd.Dataframe,
@@ -233,6 +232,7 @@ class ContractManagement:
         )
         return output
 
+    @timed
     def update_po_list(
         self,
         old: pd.Dataframe,
@@ -321,17 +321,6 @@ class ContractManagement:
         )
         return output
 
-    def _get_unique(
-        self,
-        df: pd.DataFrame,
-        cols: dict,
-        unique_col: str,
-    ) -> pd.DataFrame:
-        """Isolates and dedupes a subset of the colums from a dataframe"""
-        df_new = df[cols.keys()].drop_duplicates(unique_col)
-        df_new.columns = cols.values()
-        return df_new
-
     def _detect_changes(
         self,
         old_items: List[dict],
@@ -367,7 +356,7 @@ class ContractManagement:
 
             # add items whose values have changed to update list
             for field, new_val in item.items():
-                if existing[field] != new_val:
+                if existing[field] != serialize_value(new_val):
                     changes.updates[existing["id"]] = item
                     break
 
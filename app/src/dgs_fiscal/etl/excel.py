@@ -0,0 +1,169 @@
+from __future__ import annotations  # prevents NameError for typehints
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+from dynaconf import Dynaconf
+
+from dgs_fiscal.config import settings
+
+# strings that pd.read_excel() parses as missing values by default
+NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+def iter_openpyxl(file: Path, sheet_name: str = None) -> Iterator[tuple]:
+    """Streams the rows of a worksheet with openpyxl's read-only mode, which
+    parses the workbook row by row instead of loading every cell at once
+    """
+    # pylint: disable=import-outside-toplevel
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = (
+            workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        )
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_calamine(file: Path, sheet_name: str = None) -> Iterator[list]:
+    """Reads the rows of a worksheet with python-calamine, a Rust-based reader
+    that's much faster than openpyxl on large workbooks. Empty cells are
+    returned as empty strings
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        from python_calamine import CalamineWorkbook
+    except ImportError as err:
+        message = "The calamine engine requires: pip install python-calamine"
+        raise ImportError(message) from err
+
+    workbook = CalamineWorkbook.from_path(str(file))
+    if sheet_name:
+        worksheet = workbook.get_sheet_by_name(sheet_name)
+    else:
+        worksheet = workbook.get_sheet_by_index(0)
+    yield from worksheet.to_python()
+
+
+ENGINES: Dict[str, Callable] = {
+    "openpyxl": iter_openpyxl,
+    "calamine": iter_calamine,
+}
+
+
+def read_excel(
+    file: Path,
+    dtypes: Optional[dict] = None,
+    usecols: Optional[List[str]] = None,
+    sheet_name: Optional[str] = None,
+    engine: Optional[str] = None,
+    config: Dynaconf = settings,
+) -> pd.DataFrame:
+    """Reads a worksheet into a dataframe, parsing only the columns that are
+    needed and setting the dtype of each column as it's built
+
+    Parameters
+    ----------
+    file: Path
+        Path to the Excel workbook to read
+    dtypes: dict, optional
+        Maps column names to the dtype they should be parsed as, columns that
+        aren't listed have their dtype inferred from the cell values
+    usecols: List[str], optional
+        The names of the columns to read, defaults to every column
+    sheet_name: str, optional
+        The name of the worksheet to read, defaults to the first worksheet
+    engine: str, optional
+        Either "openpyxl", "calamine", or "pandas" to use pd.read_excel().
+        Defaults to the excel_engine setting
+    config: Dynaconf, optional
+        Configuration settings used to look up the default engine
+
+    Returns
+    -------
+    pd.DataFrame
+        The columns read from the worksheet
+
+    Raises
+    ------
+    ValueError
+        If the engine is unknown or a column in usecols isn't in the worksheet
+    """
+    dtypes = dtypes or {}
+    engine = engine or config.get("excel_engine", "openpyxl")
+    if engine == "pandas":
+        return pd.read_excel(
+            file,
+            dtype=dtypes,
+            usecols=usecols,
+            sheet_name=sheet_name or 0,
+            engine="openpyxl",
+        )
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown Excel engine '{engine}'")
+
+    # find the position of each column that will be read
+    rows = ENGINES[engine](file, sheet_name)
+    header = [
+        f"Unnamed: {i}" if name in (None, "") else str(name)
+        for i, name in enumerate(next(rows, ()))
+    ]
+    names = usecols or header
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError(f"Columns not found in {file}: {missing}")
+    positions = [header.index(name) for name in names]
+
+    # collect the values in each column, skipping blank rows
+    values: List[list] = [[] for _ in positions]
+    for row in rows:
+        if all(value in (None, "") for value in row):
+            continue
+        row = list(row) + [None] * (len(header) - len(row))
+        for column, i in zip(values, positions):
+            column.append(to_value(row[i]))
+
+    # set each column's dtype as the dataframe is built
+    data = {}
+    for name, column in zip(names, values):
+        if name in dtypes:
+            data[name] = pd.Series(column, dtype=object).astype(dtypes[name])
+        else:
+            data[name] = pd.Series(column, dtype=None if column else object)
+    return pd.DataFrame(data, columns=names)
+
+
+def to_value(value):
+    """Parses a cell value the way pd.read_excel() does, which converts the
+    strings in NA_VALUES to missing values and whole number floats to ints so
+    that ids stored as numbers aren't read as strings like '1851.0'
+    """
+    if isinstance(value, str) and value in NA_VALUES:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
@@ -8,7 +8,7 @@ NEW_REPORT = {
         "Amount": "float64",
         "Document Type": "string",
         "Name": "string",
-        # "Creation Date": "datetime64",
+        "Creation Date": "float64",  # Excel serial date
         "Vendor ID": "string",
         "Vendor Name": "string",
         "Document Number": "string",
@@ -94,3 +94,14 @@ VALIDATION = [
     "Reassign",
     "Duplicate",
 ]
+
+# (low, high) cutoffs between green, yellow, and red highlighting
+HIGHLIGHTS = {
+    "Age of Invoice": (15, 30),
+    "Days Since Creation": (15, 30),
+    "Status Age (days)": (7, 15),
+}
+
+HIDDEN_COLUMNS = ["Days Since Creation"]
+
+DROPDOWNS = {"Current Status": VALIDATION}
@@ -2,15 +2,20 @@
 from __future__ import annotations  # prevents NameError for typehints
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from dataclasses import dataclass
 
 import pandas as pd
-from O365.drive import File
 
+from dgs_fiscal.metrics import timed
 from dgs_fiscal.systems import CoreIntegrator, SharePoint
+from dgs_fiscal.etl.excel import read_excel
 from dgs_fiscal.etl.prompt_payment import constants, utils
 
+if TYPE_CHECKING:
+    from O365.drive import File
+    from dgs_fiscal.systems.sharepoint.archive import ArchiveFolder
+
 REPORT_PATH = "/Prompt Payment/Prompt Payment Report.xlsx"
 
 
@@ -37,6 +42,10 @@ class PromptPayment:
     archive: ArchiveFolder
         Instance of ArchiveFolder class that reads from and writes to the
         archive folder in SharePoint
+    local_archive: Path
+        Path to the local archive directory used by the ArchiveFolder
+
+    Each of the clients listed above is created the first time it's accessed
     """
 
     DGS_LOCATIONS = (
@@ -47,12 +56,45 @@ class PromptPayment:
         "Dept of Gen Serv",
     )
 
-    def __init__(self, local_archive: Path = None) -> None:
-        """Inits the PromptPayment class"""
-        self.core_integrator = CoreIntegrator()
-        self.sharepoint = SharePoint()
-        self.archive = self.sharepoint.get_archive_folder(local_archive)
-
+    def __init__(
+        self,
+        local_archive: Path = None,
+        core_integrator: CoreIntegrator = None,
+        sharepoint: SharePoint = None,
+    ) -> None:
+        """Inits the PromptPayment class
+
+        The CoreIntegrator, SharePoint, and ArchiveFolder clients are created
+        the first time they're accessed unless they're passed in directly
+        """
+        self.local_archive = local_archive
+        self._core_integrator = core_integrator
+        self._sharepoint = sharepoint
+        self._archive = None
+
+    @property
+    def core_integrator(self) -> CoreIntegrator:
+        """Returns the CoreIntegrator client, creating it on first access"""
+        if self._core_integrator is None:
+            self._core_integrator = CoreIntegrator()
+        return self._core_integrator
+
+    @property
+    def sharepoint(self) -> SharePoint:
+        """Returns the SharePoint client, authenticating on first access"""
+        if self._sharepoint is None:
+            self._sharepoint = SharePoint()
+        return self._sharepoint
+
+    @property
+    def archive(self) -> ArchiveFolder:
+        """Returns the archive folder client, retrieving it on first access"""
+        if self._archive is None:
+            archive = self.sharepoint.get_archive_folder(self.local_archive)
+            self._archive = archive
+        return self._archive
+
+    @timed
     def get_new_report(self) -> ReportOutput:
         """Downloads the most recent Prompt Payment report from CoreIntegrator,
         uploads it to the archive folder, then loads it as a dataframe
@@ -70,7 +112,7 @@ class PromptPayment:
 
         # read scraped report as a dataframe
         file = self.core_integrator.scrape_report()
-        df = pd.read_excel(file, dtype=dtypes, engine="openpyxl")
+        df = read_excel(file, dtypes=dtypes, usecols=list(dtypes))
 
         # zfill vendor_id to 8 characters
         df["Vendor ID"] = df["Vendor ID"].str.zfill(8)
@@ -98,6 +140,7 @@ class PromptPayment:
 
         return ReportOutput(df=df, file=file)
 
+    @timed
     def get_old_report(self) -> pd.DataFrame:
         """Retrieves the previous Prompt Payment report from SharePoint,
         uploads it to the archive, then loads it as a DataFrame
@@ -113,6 +156,7 @@ class PromptPayment:
         invoices = invoice_list.get_items(query=query)
         return invoices.to_dataframe()
 
+    @timed
     def get_old_excel(
         self,
         report_path: Optional[str] = REPORT_PATH,
@@ -141,16 +185,15 @@ class PromptPayment:
 
         # download and read in file from SharePoint
         file.download(download_loc)
-        df = pd.read_excel(tmp_file, dtype=dtypes)
+        # only the columns used for matching are read
+        df = read_excel(tmp_file, dtypes=dtypes, usecols=list(dtypes))
 
         # zfill vendor_id to 8 characters
         df["Vendor ID"] = df["Vendor ID"].str.zfill(8)
 
-        # preserve only a subset of columns for matching
-        df = df[dtypes.keys()]
-
         return ReportOutput(df=df, file=tmp_file)
 
+    @timed
     def reconcile_reports(
         self,
         new_report: pd.DataFrame,
@@ -179,6 +222,7 @@ class PromptPayment:
         file = self._export_report(df=df, export_path=export_path)
         return ReportOutput(df=df, file=file)
 
+    @timed
     def update_sharepoint(
         self,
         file_path: Path,
@@ -275,13 +319,12 @@ class PromptPayment:
 
         # export dataframe and format
         with pd.ExcelWriter(
-            file, engine="openpyxl", datetime_format="MM/DD/YYYY"
+            file,
+            engine="xlsxwriter",
+            datetime_format="MM/DD/YYYY",
+            date_format="MM/DD/YYYY",
         ) as writer:
-            # write
             df.to_excel(writer, sheet_name=sheet_name, index=False)
-            # update formatting and save
-            wb = writer.book
-            utils.format_workbook(wb)
-            writer.save()
+            utils.format_workbook(writer, df, sheet_name)
 
         return file
@@ -1,13 +1,18 @@
 # pylint: skip-file
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
-from openpyxl.formatting.rule import CellIsRule
-from openpyxl.styles.fills import PatternFill
-from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.utils import get_column_letter
 
-from dgs_fiscal.etl.prompt_payment.constants import DIVISIONS, VALIDATION
+from dgs_fiscal.etl.prompt_payment.constants import (
+    DIVISIONS,
+    DROPDOWNS,
+    HIDDEN_COLUMNS,
+    HIGHLIGHTS,
+)
+
+MAX_ROW = 1048575  # last row in an Excel worksheet, zero indexed
+FILLS = {"green": "#B6D7A8", "yellow": "#FFF2CC", "red": "#E6B8AF"}
 
 
 def compute_age_of_invoice(df: pd.DataFrame) -> pd.Series:
@@ -44,140 +49,131 @@ def compute_days_with_baps(df: pd.DataFrame) -> pd.DataFrame:
     return days_with_baps
 
 
+def build_staff_index(staff_mapping: dict) -> dict:
+    """Inverts the division to staff mapping into a staff name to division
+    index, later divisions take precedence if a name is listed twice
+    """
+    return {
+        name: division
+        for division, names in staff_mapping.items()
+        for name in names
+    }
+
+
+STAFF_INDEX = build_staff_index(DIVISIONS)
+
+
 def update_division(  # pylint: disable=dangerous-default-value
     df: pd.DataFrame,
-    staff_mapping: list = DIVISIONS,
+    staff_mapping: dict = DIVISIONS,
 ) -> pd.DataFrame:
-    """Assigns the division associated with a give AP staff"""
-
-    # change default to "No matching division"
-    df["Division"] = "No matching division"
-
-    # update rows that have multiple people listed
-    multiples = df["DGS Name"].str.contains(",")
-    df.loc[multiples, "Division"] = "Multiple people listed"
+    """Assigns the division associated with a give AP staff
 
-    # update remaining rows based on staff mapping
-    for division, names in staff_mapping.items():
-        staff = df["DGS Name"].isin(names)
-        df.loc[staff, "Division"] = division
+    Rows with several comma-separated names are assigned the division those
+    names share if every name matches a division, otherwise they're flagged
+    as "Multiple people listed"
+    """
+    if staff_mapping is DIVISIONS:
+        index = STAFF_INDEX
+    else:
+        index = build_staff_index(staff_mapping)
+
+    # resolve each of the names listed in a row to its division
+    names = pd.Series(df["DGS Name"].to_numpy(dtype=object))
+    divisions = names.str.split(",").explode().str.strip().map(index)
+    matches = divisions.groupby(level=0).agg(
+        ["first", "nunique", "count", "size"]
+    )
+    shared = (matches["count"] == matches["size"]) & (matches["nunique"] == 1)
+
+    # assign the matching division or flag rows with multiple people
+    multiples = names.str.contains(",", na=False)
+    df["Division"] = np.select(
+        [shared, multiples | (matches["nunique"] > 1)],
+        [matches["first"], "Multiple people listed"],
+        "No matching division",
+    )
 
     return df
 
 
-def format_workbook(workbook, sheet="Prompt Payment"):
-    """Formats workbook before saving it. Called by overwrite_sheet() function
+def format_workbook(writer, df, sheet="Prompt Payment"):
+    """Formats the Prompt Payment sheet in a single pass over its columns.
+    Called by PromptPayment._export_report() after the report is written
     Args:
-        workbook (openpyxl.workbook): Workbook object of OneDrive excel file
+        writer (pd.ExcelWriter): ExcelWriter using the xlsxwriter engine that
+            the report was written with
+        df (dataframe): The report that was written to the sheet
         sheet (str): Name of the sheet with the Prompt Payment report
-        to_loc (int): Position of the Prompt Payment sheet after formatting
-    Returns:
-        message (str): Message indicating a successful formatting
-        workbook (openpyxl.workbook) Formatted workbook object
     """
-    # load Prompt Payment worksheet
-    worksheet = workbook[sheet]
-
-    # add conditional highlighting
-    add_conditional_formatting(worksheet, "Age of Invoice", 15, 30)
-    add_conditional_formatting(worksheet, "Days Since Creation", 15, 30)
-    add_conditional_formatting(worksheet, "Status Age (days)", 7, 15)
-
-    # hide Days Since Creation
-    col = get_excel_range(worksheet, "Days Since Creation")[0]
-    worksheet.column_dimensions[col].hidden = True
-
-    # add dropdown to Current Status column
-    add_data_validation(worksheet, "Current Status")
-
-    # adjust column width, filter worksheet, and freeze header row
-    autoresize_cols(worksheet)
-    worksheet.auto_filter.ref = worksheet.dimensions
-    worksheet.freeze_panes = "A2"
-
-
-def add_conditional_formatting(ws, column, low, high):
+    workbook = writer.book
+    worksheet = writer.sheets[sheet]
+
+    # resolve the formats and column widths once for the whole sheet
+    fills = {
+        name: workbook.add_format({"bg_color": color})
+        for name, color in FILLS.items()
+    }
+    widths = column_widths(df)
+
+    # set the width and formatting of each column
+    for col, name in enumerate(df.columns):
+        hidden = {"hidden": True} if name in HIDDEN_COLUMNS else None
+        worksheet.set_column(col, col, widths[name], None, hidden)
+        if name in HIGHLIGHTS:
+            low, high = HIGHLIGHTS[name]
+            add_conditional_formatting(worksheet, col, low, high, fills)
+        if name in DROPDOWNS:
+            add_data_validation(worksheet, col, DROPDOWNS[name])
+
+    # filter worksheet and freeze header row
+    worksheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+    worksheet.freeze_panes(1, 0)
+
+
+def add_conditional_formatting(ws, col, low, high, fills):
     """Adds conditional formatting to a column in a worksheet
     Args:
-        ws (worksheet): Worksheet object for the Prompt Payment report
-        column (str): Name of the column to apply the conditional formatting to
+        ws (worksheet): XlsxWriter worksheet for the Prompt Payment report
+        col (int): Index of the column to apply the conditional formatting to
         low (int): The cutoff between green and yellow highlighting
         high (int): The cutoff between yellow and red highlighting
+        fills (dict): XlsxWriter formats for the green, yellow, and red fills
     """
-
-    range = get_excel_range(ws, column)
-
-    # helper function to set the fill format
-    def fill(name):
-        colors = {"green": "B6D7A8", "yellow": "FFF2CC", "red": "E6B8AF"}
-        format = PatternFill(
-            start_color=colors[name], end_color=colors[name], fill_type="solid"
-        )
-        return format
-
-    # helper function to create the conditional formatting rule
-    def rule(operator, value, color):
-        condition = CellIsRule(
-            operator=(operator),
-            formula=[str(value)],
-            stopIfTrue=True,
-            fill=fill(color),
-        )
-        return condition
-
-    ws.conditional_formatting.add(range, rule("lessThan", low, "green"))
-    ws.conditional_formatting.add(range, rule("lessThan", high, "yellow"))
-    ws.conditional_formatting.add(
-        range, rule("greaterThanOrEqual", high, "red")
-    )
-
-
-def add_data_validation(ws, column, src=VALIDATION):
-    """Adds data validation to a column in a worksheet
+    rules = [("<", low, "green"), ("<", high, "yellow"), (">=", high, "red")]
+    for criteria, value, color in rules:
+        rule = {
+            "type": "cell",
+            "criteria": criteria,
+            "value": value,
+            "format": fills[color],
+            "stop_if_true": True,
+        }
+        ws.conditional_format(1, col, MAX_ROW, col, rule)
+
+
+def add_data_validation(ws, col, options):
+    """Adds a dropdown list of options to a column in a worksheet
     Args:
-        ws (worksheet): Worksheet object for the Prompt Payment report
-        column (str): Name of the column to apply the data validation to
-        src_sheet (str): Name of the sheet that contains the validation options
-        src_range (str): Cell range for options on src_sheet
+        ws (worksheet): XlsxWriter worksheet for the Prompt Payment report
+        col (int): Index of the column to apply the data validation to
+        options (list): The options listed in the dropdown
     """
+    validation = {"validate": "list", "source": options, "ignore_blank": True}
+    ws.data_validation(1, col, MAX_ROW, col, validation)
 
-    range = get_excel_range(ws, column)
-    options = ",".join(src)
-    options_str = f'"{options}"'
-
-    # create the validation rule
-    validation = DataValidation(
-        type="list",
-        formula1=options_str,
-        allow_blank=True,
-    )
-    validation.add(range)
 
-    # add the validation to the seet
-    ws.add_data_validation(validation)
-
-
-def autoresize_cols(ws, max_width=80, min_width=10):
-    """Adjusts column width to fit column contents upt to a max value
+def column_widths(df, max_width=80, min_width=10):
+    """Computes the width of each column from the length of its longest value
+    or header, up to a max value
     Args:
-        ws (worksheet): Worksheet object for the Prompt Payment report
+        df (dataframe): The report that will be written to the worksheet
         max_width (int): The maximum width for a column
+        min_width (int): The minimum width for a column
+    Returns:
+        widths (pd.Series): The width of each column indexed by column name
     """
-
-    def cell_len(cell):
-        return len(str(cell.value))
-
-    for col in ws.columns:
-        column = col[0].column_letter  # Get the column name
-        max_cell = max(col, key=cell_len)
-        adjusted_width = cell_len(max_cell) + 2
-        # ensure width remains within limits
-        width = sorted([min_width, adjusted_width, max_width])[1]
-        ws.column_dimensions[column].width = width
-
-
-def get_excel_range(ws, name):
-    """Get the excel range for a column"""
-    headers = [cell.value for cell in ws[1]]
-    col = get_column_letter(headers.index(name) + 1)
-    return f"{col}2:{col}1048576"
+    lengths = df.astype(str).apply(lambda col: col.str.len().max())
+    headers = df.columns.to_series().astype(str).str.len()
+    widths = pd.concat([lengths.fillna(0), headers], axis=1).max(axis=1)
+    return (widths + 2).clip(min_width, max_width)
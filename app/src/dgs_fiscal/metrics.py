@@ -0,0 +1,190 @@
+from __future__ import annotations  # prevents NameError for typehints
+import functools
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+from dynaconf import Dynaconf
+
+from dgs_fiscal.config import settings
+
+PREFIX = "dgs_fiscal"
+FORMATS = ("json", "prometheus")
+
+
+@dataclass
+class StepTiming:
+    """Data class for storing how long each call to a step took
+
+    Attributes
+    ----------
+    calls: int
+        The number of times the step was run
+    seconds: float
+        The total number of seconds spent in the step across each call
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class Metrics:
+    """Collects the time spent in each step of a workflow and counters for
+    the work done by each system client, e.g. the rows fetched from CitiBuy
+
+    Attributes
+    ----------
+    timings: Dict[str, StepTiming]
+        The time spent in each step, keyed by the name of the step
+    counters: Dict[str, float]
+        The value of each counter, keyed by the name of the counter
+    """
+
+    timings: Dict[str, StepTiming] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def timer(self, step: str) -> Iterator[None]:
+        """Records the time spent in the body of the with statement under
+        the name of the step, including when the body raises an error
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing = self.timings.setdefault(step, StepTiming())
+            timing.calls += 1
+            timing.seconds += time.perf_counter() - start
+
+    def increment(self, counter: str, value: float = 1) -> None:
+        """Adds the value to a counter, starting the counter at zero"""
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def reset(self) -> None:
+        """Clears the timings and counters before the next command is run"""
+        self.timings.clear()
+        self.counters.clear()
+
+    def to_json_lines(self, command: str) -> List[str]:
+        """Returns a JSON record for each step and counter
+
+        Parameters
+        ----------
+        command: str
+            The name of the runner command the metrics were collected for
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        base = {"timestamp": now, "command": command}
+        records = [
+            {
+                **base,
+                "type": "timing",
+                "name": step,
+                "calls": timing.calls,
+                "seconds": round(timing.seconds, 6),
+            }
+            for step, timing in self.timings.items()
+        ]
+        records.extend(
+            {**base, "type": "counter", "name": counter, "value": value}
+            for counter, value in self.counters.items()
+        )
+        return [json.dumps(record) for record in records]
+
+    def to_prometheus(self, command: str) -> List[str]:
+        """Returns the metrics in the Prometheus text exposition format
+
+        Parameters
+        ----------
+        command: str
+            The name of the runner command the metrics were collected for
+        """
+        lines = [
+            f"# TYPE {PREFIX}_step_seconds gauge",
+            f"# TYPE {PREFIX}_step_calls gauge",
+        ]
+        for step, timing in self.timings.items():
+            labels = f'command="{command}",step="{step}"'
+            lines.append(f"{PREFIX}_step_seconds{{{labels}}} {timing.seconds}")
+            lines.append(f"{PREFIX}_step_calls{{{labels}}} {timing.calls}")
+        for counter, value in self.counters.items():
+            name = f"{PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f'{name}{{command="{command}"}} {value}')
+        return lines
+
+    def write(self, command: str, config: Dynaconf = settings) -> Path:
+        """Writes the metrics for a command to the metrics directory
+
+        JSON lines are appended to metrics.jsonl so that the file keeps a
+        history of each run. Prometheus metrics overwrite the command's .prom
+        file, which is replaced atomically so that the node exporter's
+        textfile collector never reads a partial file.
+
+        Parameters
+        ----------
+        command: str
+            The name of the runner command the metrics were collected for
+        config: Dynaconf, optional
+            Configuration settings used to look up the metrics_format and
+            metrics_dir settings
+
+        Returns
+        -------
+        Path
+            Path to the file the metrics were written to
+
+        Raises
+        ------
+        ValueError
+            If the metrics_format setting isn't one of FORMATS
+        """
+        file_format = config.get("metrics_format", "json")
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported metrics format '{file_format}'")
+        metrics_dir = Path(config.get("metrics_dir", "archives/metrics"))
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        if file_format == "json":
+            file = metrics_dir / "metrics.jsonl"
+            with open(file, "a", encoding="utf-8") as jsonl:
+                for line in self.to_json_lines(command):
+                    jsonl.write(line + "\n")
+        else:
+            file = metrics_dir / f"{command}.prom"
+            tmp_file = file.with_suffix(".prom.tmp")
+            lines = self.to_prometheus(command)
+            tmp_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            tmp_file.replace(file)
+        return file
+
+
+# collects the metrics for the command that's currently running
+metrics = Metrics()
+
+
+def timed(func: Callable = None, *, step: str = None) -> Callable:
+    """Decorates a function so each call is timed by metrics.timer()
+
+    Parameters
+    ----------
+    func: Callable
+        The function to time, which is passed when the decorator is used
+        without arguments, e.g. @timed
+    step: str, optional
+        The name the time is recorded under. Defaults to the qualified name of
+        the function, e.g. ContractManagement.get_citibuy_data
+    """
+    if func is None:
+        return functools.partial(timed, step=step)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with metrics.timer(step or func.__qualname__):
+            return func(*args, **kwargs)
+
+    return wrapper
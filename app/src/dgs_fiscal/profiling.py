@@ -0,0 +1,154 @@
+from __future__ import annotations  # prevents NameError for typehints
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dynaconf import Dynaconf
+
+from dgs_fiscal.config import settings
+
+TOP_FUNCTIONS = 20
+TOP_MODULES = 10
+PEAK_SAMPLE_INTERVAL = 0.1  # seconds between checks for a new memory peak
+
+
+class CommandProfiler:
+    """Profiles a runner command with cProfile and traces the memory it
+    allocates with tracemalloc
+
+    Attributes
+    ----------
+    command: str
+        The name of the command being profiled, used to name the stats file
+    profile: bool
+        Runs the command under cProfile and saves the stats to profile_dir
+    trace_memory: bool
+        Traces the memory allocated while the command runs
+    profile_dir: Path
+        The directory the cProfile stats are saved to
+    sample_interval: float
+        The number of seconds between checks for a new memory peak, at which
+        a snapshot of the memory allocated by each module is taken
+    """
+
+    def __init__(
+        self,
+        command: str,
+        profile: bool = False,
+        trace_memory: bool = False,
+        config: Dynaconf = settings,
+        sample_interval: float = PEAK_SAMPLE_INTERVAL,
+    ) -> None:
+        """Inits the CommandProfiler class"""
+        self.command = command or "dgs_fiscal"
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_dir = Path(config.get("profile_dir", "archives/profiles"))
+        self.sample_interval = sample_interval
+        self._profiler: Optional[cProfile.Profile] = None
+        self._peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_size = 0
+        self._stop_sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts tracing memory and profiling function calls"""
+        if self.trace_memory:
+            tracemalloc.start()
+            self._sampler = threading.Thread(
+                target=self._sample_peak, daemon=True
+            )
+            self._sampler.start()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self) -> str:
+        """Stops profiling and returns a report of the hottest functions and
+        the modules that allocated the most memory
+        """
+        lines = []
+        if self._profiler is not None:
+            self._profiler.disable()
+            file = self.save_stats()
+            lines.append(f"Profile written to {file}")
+            lines.append(self.top_functions())
+        if self.trace_memory and tracemalloc.is_tracing():
+            lines.extend(self.memory_report())
+        return "\n".join(lines)
+
+    def save_stats(self) -> Path:
+        """Saves the cProfile stats to a .pstats file, which can be opened
+        with pstats, snakeviz, or converted for speedscope
+        """
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        file = self.profile_dir / f"{self.command}_{timestamp}.pstats"
+        self._profiler.dump_stats(file)
+        return file
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> str:
+        """Returns the functions with the highest cumulative time"""
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return output.getvalue()
+
+    def memory_report(self, limit: int = TOP_MODULES) -> List[str]:
+        """Stops tracing memory and returns the peak memory allocated along
+        with the memory each module had allocated at the sampled peak
+        """
+        self._stop_sampling.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._snapshot_if_peak()  # the peak may be when the command finished
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        by_module = allocations_by_module(self._peak_snapshot)
+        lines = [f"Peak memory allocated: {peak / 2**20:.1f} MiB"]
+        lines.append(
+            "Memory allocated by module at the sampled peak "
+            f"({self._peak_size / 2**20:.1f} MiB):"
+        )
+        top = sorted(by_module.items(), key=lambda item: -item[1])[:limit]
+        for module, size in top:
+            lines.append(f"  {size / 2**20:8.1f} MiB  {module}")
+        return lines
+
+    def _sample_peak(self) -> None:
+        """Checks for a new memory peak every sample_interval seconds until
+        memory_report() is called
+        """
+        while not self._stop_sampling.wait(self.sample_interval):
+            self._snapshot_if_peak()
+
+    def _snapshot_if_peak(self) -> None:
+        """Takes a snapshot of the memory allocated if it's more than the
+        memory allocated when the last snapshot was taken
+        """
+        current, _ = tracemalloc.get_traced_memory()
+        if self._peak_snapshot is None or current > self._peak_size:
+            self._peak_snapshot = tracemalloc.take_snapshot()
+            self._peak_size = current
+
+
+def allocations_by_module(snapshot: tracemalloc.Snapshot) -> Dict[str, int]:
+    """Sums the bytes allocated in each file of a tracemalloc snapshot by the
+    module the file belongs to
+    """
+    modules = {
+        getattr(module, "__file__", None): name
+        for name, module in list(sys.modules.items())
+    }
+    totals: Dict[str, int] = {}
+    for stat in snapshot.statistics("filename"):
+        filename = stat.traceback[0].filename
+        module = modules.get(filename, filename)
+        totals[module] = totals.get(module, 0) + stat.size
+    return totals
@@ -1,9 +1,82 @@
+import functools
+from typing import Callable
+
 import typer
 
+from dgs_fiscal.metrics import metrics
+
 # instantiate typer app
 app = typer.Typer()
 
 
+def record_metrics(command: str) -> Callable:
+    """Times each step of a command and writes the metrics collected while it
+    ran to the metrics directory once it finishes, even if it fails
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics.reset()
+            try:
+                with metrics.timer(command):
+                    return func(*args, **kwargs)
+            finally:
+                file = metrics.write(command)
+                typer.echo(f"Metrics written to {file}")
+
+        return wrapper
+
+    return decorator
+
+
+def echo_query_report(workflow) -> None:
+    """Prints the profile of each CitiBuy query if the workflow's CitiBuy
+    client was created with profiling enabled
+    """
+    report = workflow.query_report()
+    if report is not None:
+        typer.echo("CitiBuy query profile:")
+        typer.echo(report)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Profile the command with cProfile and print the hot functions",
+    ),
+    trace_memory: bool = typer.Option(
+        False,
+        "--trace-memory",
+        help="Trace memory with tracemalloc and report peak usage by module",
+    ),
+    refresh_cache: bool = typer.Option(
+        False,
+        "--refresh-cache",
+        help="Rerun the CitiBuy queries instead of reading cached results",
+    ),
+):
+    """Runs the DGS Fiscal workflows"""
+    if refresh_cache:
+        # pylint: disable=import-outside-toplevel
+        from dgs_fiscal.config import settings
+
+        settings.set("citibuy_cache_refresh", True)
+    if not (profile or trace_memory):
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from dgs_fiscal.profiling import CommandProfiler
+
+    # profile the command and print the report once it finishes
+    profiler = CommandProfiler(ctx.invoked_subcommand, profile, trace_memory)
+    profiler.start()
+    ctx.call_on_close(lambda: typer.echo(profiler.stop()))
+
+
 @app.command(name="hello")
 def hello_world(name: str):
     """Prints 'Hello, {name}' to the console"""
@@ -11,6 +84,7 @@ def hello_world(name: str):
 
 
 @app.command(name="contract_management")
+@record_metrics("contract_management")
 def run_contract_management_etl():
     """Run the contract management workflow"""
 
@@ -48,10 +122,12 @@ def run_contract_management_etl():
         vendor_lookup=vendor_output.mapping,
         contract_lookup=contract_output.mapping,
     )
+    echo_query_report(contract_etl)
     typer.echo("Workflow ran successfully")
 
 
 @app.command(name="aging_report")
+@record_metrics("aging_report")
 def run_aging_report_etl():
     """Run the Aging Report workflow"""
 
@@ -71,10 +147,12 @@ def run_aging_report_etl():
     aging_etl.update_sharepoint(invoice_data, "InvoiceExport")
     aging_etl.update_sharepoint(receipt_data, "ReceiptExport")
 
+    echo_query_report(aging_etl)
     typer.echo("Workflow ran successfully")
 
 
 @app.command(name="prompt_payment")
+@record_metrics("prompt_payment")
 def run_prompt_payment_etl():
     """Run the Prompt Payment Report Workflow"""
 
@@ -117,3 +195,54 @@ def run_prompt_payment_etl():
     )
 
     typer.echo("Workflow ran successfully")
+
+
+@app.command(name="citibuy_ddl")
+def emit_citibuy_ddl(
+    dialect: str = typer.Option("mssql", help="mssql, postgresql, or sqlite"),
+    tables: bool = typer.Option(False, help="Include CREATE TABLE as well"),
+):
+    """Print the DDL for the indexes on the CitiBuy models"""
+
+    # pylint: disable=import-outside-toplevel
+    from dgs_fiscal.systems.citibuy.schema import generate_ddl
+
+    for statement in generate_ddl(dialect, tables):
+        typer.echo(f"{statement};\n")
+
+
+@app.command(name="citibuy_query_plans")
+def check_citibuy_query_plans(conn_url: str):
+    """Flag full table scans in the query plans of the CitiBuy queries"""
+
+    # pylint: disable=import-outside-toplevel
+    from dgs_fiscal.systems import CitiBuy
+    from dgs_fiscal.systems.citibuy.schema import check_query_plans
+
+    plans = check_query_plans(CitiBuy(conn_url=conn_url))
+    for plan in plans:
+        typer.echo(f"{plan.name}:")
+        for step in plan.steps:
+            flag = "FULL SCAN " if step in plan.full_scans else ""
+            typer.echo(f"  {flag}{step}")
+    scans = sum(len(plan.full_scans) for plan in plans)
+    typer.echo(f"Found {scans} full table scans")
+
+
+@app.command(name="citibuy_sync")
+def sync_citibuy_staging(
+    full: bool = typer.Option(False, help="Recopy every table in full"),
+    conn_url: str = typer.Option(None, help="Sync from this database URL"),
+):
+    """Sync the local CitiBuy staging database with CitiBuy"""
+
+    # pylint: disable=import-outside-toplevel
+    from dgs_fiscal.systems import CitiBuy
+
+    citibuy = CitiBuy(conn_url=conn_url, staging=True)
+    for result in citibuy.staging.sync(full):
+        sync_type = "changed" if result.incremental else "all"
+        typer.echo(
+            f"{result.table}: copied {result.rows} rows ({sync_type}) "
+            f"in {result.seconds:.2f}s"
+        )
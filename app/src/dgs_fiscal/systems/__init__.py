@@ -1,5 +1,33 @@
+from __future__ import annotations  # prevents NameError for typehints
+import importlib
+from typing import TYPE_CHECKING
+
 __all__ = ["SharePoint", "CoreIntegrator", "CitiBuy"]
 
-from dgs_fiscal.systems.sharepoint import SharePoint
-from dgs_fiscal.systems.core_integrator import CoreIntegrator
-from dgs_fiscal.systems.citibuy import CitiBuy
+# maps each client to the sub-package that defines it so that the heavy
+# dependencies of a system (e.g. selenium, O365, SQLAlchemy) are only
+# imported the first time that system's client is accessed
+CLIENTS = {
+    "SharePoint": "dgs_fiscal.systems.sharepoint",
+    "CoreIntegrator": "dgs_fiscal.systems.core_integrator",
+    "CitiBuy": "dgs_fiscal.systems.citibuy",
+}
+
+if TYPE_CHECKING:
+    from dgs_fiscal.systems.sharepoint import SharePoint
+    from dgs_fiscal.systems.core_integrator import CoreIntegrator
+    from dgs_fiscal.systems.citibuy import CitiBuy
+
+
+def __getattr__(name: str):
+    """Imports the client for a system the first time it's accessed"""
+    if name not in CLIENTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    client = getattr(importlib.import_module(CLIENTS[name]), name)
+    globals()[name] = client  # skips __getattr__ on subsequent access
+    return client
+
+
+def __dir__() -> list:
+    """Includes the lazily imported clients in dir()"""
+    return sorted([*globals(), *__all__])
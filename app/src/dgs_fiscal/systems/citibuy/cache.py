@@ -0,0 +1,149 @@
+from __future__ import annotations  # prevents NameError for typehints
+import hashlib
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import ClauseElement
+
+# the file extension used to save the cached results in each format
+FORMATS = {"parquet": ".parquet", "pickle": ".pkl"}
+# raised by pandas when pyarrow isn't installed, or by pyarrow when it can't
+# convert a column, e.g. an object column with a mix of ints and strings
+PARQUET_ERRORS = (ImportError, TypeError, ValueError, NotImplementedError)
+
+
+class QueryCache:
+    """Caches the results of the CitiBuy queries on disk so that identical
+    queries return the cached results until they expire
+
+    Results are keyed on the compiled SQL, its bound parameters, and the
+    database it's run against, so a query whose parameters change, e.g. the
+    cutoff date computed from days_ago, isn't read from the cache.
+
+    Attributes
+    ----------
+    cache_dir: Path
+        The directory the cached results are saved to
+    ttl: int
+        The number of seconds results are read from the cache after they're
+        saved
+    file_format: str
+        The format results are saved in, either "parquet" or "pickle". Results
+        that can't be saved as parquet, because pyarrow isn't installed or
+        can't convert one of the columns, are pickled instead
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl: int,
+        file_format: str = "parquet",
+    ) -> None:
+        """Inits the QueryCache class
+
+        Raises
+        ------
+        ValueError
+            If the file format isn't one of FORMATS
+        """
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported cache format '{file_format}'")
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.file_format = file_format
+
+    @staticmethod
+    def key(
+        engine: Engine,
+        query: ClauseElement,
+        params: Optional[dict] = None,
+    ) -> str:
+        """Returns the cache key for a query run against an engine's database
+
+        Parameters
+        ----------
+        engine: Engine
+            The engine the query is run with, whose URL is included in the
+            key without the password
+        query: ClauseElement
+            The query statement, which is compiled for the engine's dialect
+        params: dict, optional
+            The values passed for the query's bound parameters when it's
+            executed, which replace the values bound to the statement
+        """
+        compiled = query.compile(dialect=engine.dialect)
+        params = params or {}
+        params = sorted(
+            (name, params.get(name, value))
+            for name, value in compiled.params.items()
+        )
+        url = engine.url.render_as_string(hide_password=True)
+        text = "\n".join([url, str(compiled), repr(params)])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Returns the cached results for a key, or None if the results
+        haven't been cached or have expired. Expired results are deleted
+        """
+        for file_format in FORMATS:
+            file = self._file(key, file_format)
+            if not file.exists():
+                continue
+            if time.time() - file.stat().st_mtime > self.ttl:
+                file.unlink(missing_ok=True)
+                return None
+            if file_format == "pickle":
+                return pd.read_pickle(file)
+            try:
+                return pd.read_parquet(file)
+            except ImportError:  # cached by an install that has pyarrow
+                return None
+        return None
+
+    def set(self, key: str, df: pd.DataFrame) -> Path:
+        """Saves the results of a query to the cache
+
+        The results are written to a temporary file that replaces the cached
+        file once it's complete, so a failed write never leaves a partial
+        file in the cache. Results that can't be saved as parquet are pickled
+        instead, so a cache problem never stops the query that was run
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        file_format = self.file_format
+        if file_format == "parquet":
+            tmp_file = self._file(key, file_format).with_suffix(".tmp")
+            try:
+                df.to_parquet(tmp_file, index=False)
+            except PARQUET_ERRORS:
+                tmp_file.unlink(missing_ok=True)
+                file_format = "pickle"
+        if file_format == "pickle":
+            tmp_file = self._file(key, file_format).with_suffix(".tmp")
+            df.to_pickle(tmp_file)
+        file = self._file(key, file_format)
+        tmp_file.replace(file)
+        # removes the results cached in the other format by an earlier set()
+        for other in FORMATS:
+            if other != file_format:
+                self._file(key, other).unlink(missing_ok=True)
+        return file
+
+    def clear(self) -> int:
+        """Deletes every cached result and returns the number deleted"""
+        files = [
+            file
+            for suffix in FORMATS.values()
+            for file in self.cache_dir.glob(f"*{suffix}")
+        ]
+        for file in files:
+            file.unlink(missing_ok=True)
+        return len(files)
+
+    def _file(self, key: str, file_format: str) -> Path:
+        """Returns the path to the file the results for a key are cached in
+        when they're saved in the format passed
+        """
+        return self.cache_dir / f"{key}{FORMATS[file_format]}"
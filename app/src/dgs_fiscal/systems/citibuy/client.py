@@ -1,16 +1,103 @@
 from __future__ import annotations  # prevents NameError for typehints
-from typing import List
+import functools
+import inspect
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
 from datetime import date, timedelta
+from contextlib import nullcontext
+from pathlib import Path
 
-import pyodbc
 import sqlalchemy as sa
 from sqlalchemy.orm import Session, aliased
 from sqlalchemy.engine import URL, Row
+from sqlalchemy.sql import ColumnElement, Select
 from dynaconf import Dynaconf
 import pandas as pd
 
 from dgs_fiscal.config import settings
+from dgs_fiscal.metrics import metrics
 from dgs_fiscal.systems.citibuy import models
+from dgs_fiscal.systems.citibuy.cache import QueryCache
+from dgs_fiscal.systems.citibuy.functions import string_agg
+from dgs_fiscal.systems.citibuy.profiler import QueryProfiler
+from dgs_fiscal.systems.citibuy.staging import StagingDatabase
+
+# days after their end date that blanket contracts are still returned
+CONTRACT_DAYS = 90
+
+# the query statements built by the CitiBuy client, see cached_statement()
+STATEMENTS: OrderedDict[tuple, Select] = OrderedDict()
+# the number of statements kept before the least recently used is dropped
+STATEMENT_CACHE_SIZE = 128
+
+
+def cached_statement(build: Callable) -> Callable:
+    """Decorates a method that builds a query statement so that the statement
+    is only built the first time the method is called with each set of
+    arguments, and the same statement is returned by every call after that
+
+    The statements are shared by the clients whose engines use the same
+    dialect, and only the STATEMENT_CACHE_SIZE most recently used statements
+    are kept so that the cache doesn't grow with each distinct limit.
+
+    The cutoff dates are left as bound parameters in the cached statements
+    and their values are passed when the statements are executed, see
+    query_params(). Because the statement and its SQL don't change from one
+    run to the next, SQLAlchemy's compiled cache and the database's plan
+    cache are reused instead of compiling the query again. The limit of the
+    PO queries is part of the statement instead of a bound parameter, since
+    SQL Server only accepts a literal value for TOP.
+    """
+    signature = inspect.signature(build)
+
+    @functools.wraps(build)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = list(bound.arguments.items())[1:]  # skips self
+        dialect = bound.arguments["self"].engine.dialect.name
+        key = (
+            dialect,
+            build.__name__,
+            *(freeze(value) for _, value in arguments),
+        )
+        if key in STATEMENTS:
+            STATEMENTS.move_to_end(key)
+            return STATEMENTS[key]
+        STATEMENTS[key] = build(*args, **kwargs)
+        if len(STATEMENTS) > STATEMENT_CACHE_SIZE:
+            STATEMENTS.popitem(last=False)
+        return STATEMENTS[key]
+
+    return wrapper
+
+
+def freeze(value: Any) -> Any:
+    """Converts dictionaries to tuples so they can be part of a cache key"""
+    if isinstance(value, dict):
+        return tuple((key, freeze(val)) for key, val in value.items())
+    return value
+
+
+def query_params(days_ago: int = 90) -> Dict[str, Any]:
+    """Returns the values of the parameters bound to the cached statements
+
+    Parameters
+    ----------
+    days_ago: int, optional
+        The number of days in the past used to compute the cutoff_date of
+        get_invoices() and get_receipts()
+
+    Returns
+    -------
+    Dict[str, Any]
+        The value of each parameter keyed by the name of the bound parameter
+    """
+    today = date.today()
+    return {
+        "cutoff_date": today - timedelta(days_ago),
+        "contract_cutoff": today - timedelta(CONTRACT_DAYS),
+    }
 
 
 class CitiBuy:
@@ -19,6 +106,21 @@ class CitiBuy:
     Attributes
     ----------
     engine: sqlalchemy.Engine
+        The engine the queries are run against, which is connected to the
+        staging database in staging mode
+    source_engine: sqlalchemy.Engine
+        The engine connected to the CitiBuy database
+    staging: StagingDatabase
+        The local copy of the CitiBuy tables the queries are run against if
+        staging mode is enabled, otherwise None
+    profiler: QueryProfiler
+        Profiles each query run by the client if profiling is enabled,
+        otherwise None
+    cache: QueryCache
+        Caches the results of each query if caching is enabled, otherwise None
+    refresh_cache: bool
+        Runs each query against the database instead of reading the cached
+        results, which are replaced by the new results
     """
 
     INVOICE_STATUS = {
@@ -59,9 +161,26 @@ class CitiBuy:
         self,
         config: Dynaconf = settings,
         conn_url: str = None,
+        profile: bool = None,
+        staging: bool = None,
+        cache: bool = None,
+        refresh_cache: bool = None,
     ) -> None:
-        """Instantiates the CitiBuy class and connects to the database"""
+        """Instantiates the CitiBuy class and connects to the database
+
+        Queries are profiled if profile is True, which defaults to the
+        citibuy_profile setting. Queries are run against a local staging copy
+        of the database if staging is True, which defaults to the
+        citibuy_staging setting, and the copy is synced on the first query
+        unless it was synced within citibuy_staging_max_age seconds. Query
+        results are cached if cache is True, which defaults to the
+        citibuy_cache setting, and the cache is bypassed if refresh_cache is
+        True, which defaults to the citibuy_cache_refresh setting
+        """
         if not conn_url:
+            # pyodbc is only needed to connect to the production database
+            import pyodbc  # pylint: disable=import-outside-toplevel
+
             conn_str = (
                 "Driver={SQL Server};"
                 f"Server={config.citibuy_server};"
@@ -73,35 +192,82 @@ class CitiBuy:
             conn_url = URL.create(
                 "mssql+pyodbc", query={"odbc_connect": conn_str}
             )
-        self.engine = sa.create_engine(conn_url)
+        self.source_engine = sa.create_engine(conn_url)
+        self.engine = self.source_engine
+        self.staging: StagingDatabase = None
+        if staging is None:
+            staging = config.get("citibuy_staging", False)
+        if staging:
+            self.staging = StagingDatabase(
+                self.source_engine,
+                config.get(
+                    "citibuy_staging_url",
+                    "sqlite:///archives/citibuy_staging.db",
+                ),
+                max_age=config.get("citibuy_staging_max_age", 14400),
+            )
+            self.engine = self.staging.engine
+        self._staged = False
+        self.profiler: QueryProfiler = None
+        if profile is None:
+            profile = config.get("citibuy_profile", False)
+        if profile:
+            self.profiler = QueryProfiler(
+                self.source_engine,
+                statistics=config.get("citibuy_statistics", False),
+                profile_dir=Path(
+                    config.get("citibuy_profile_dir", "archives/profiles")
+                ),
+            )
+            if self.engine is not self.source_engine:
+                self.profiler.listen(self.engine)
+        self.cache: QueryCache = None
+        if cache is None:
+            cache = config.get("citibuy_cache", False)
+        if cache:
+            self.cache = QueryCache(
+                cache_dir=config.get("citibuy_cache_dir", "archives/cache"),
+                ttl=config.get("citibuy_cache_ttl", 14400),
+                file_format=config.get("citibuy_cache_format", "parquet"),
+            )
+        if refresh_cache is None:
+            refresh_cache = config.get("citibuy_cache_refresh", False)
+        self.refresh_cache = refresh_cache
 
-    def execute_stmt(self, query_str: str) -> DatabaseRows:
+    def execute_stmt(
+        self,
+        query_str: str,
+        staged: bool = False,
+    ) -> DatabaseRows:
         """Executes a SQL query against the CitiBuy database
 
         Parameters
         ----------
         query_str: str
             A string with valid SQL syntax
-        fetch: FetchOpts
-            How many rows should be fetched from the cursor, either all or
-            just the first. Default is to return all.
+        staged: bool, optional
+            Runs the query through the staging database and the query cache,
+            if they're enabled, like the client's other queries. Default is
+            to run it against the CitiBuy database without caching the rows
 
         Returns
         -------
         DatabaseRows
             An instance of DatabaseRows with the results from the query
         """
+        query = sa.text(query_str)
         try:
-            with self.engine.connect() as conn:
-                query = sa.text(query_str)
-                rows = conn.execute(query).fetchall()
+            if staged:
+                return self._execute(query, "execute_stmt")
+            return self._fetch(self.source_engine, query, "execute_stmt")
         except sa.exc.ProgrammingError as error:
             raise error
-        return DatabaseRows(rows)
 
-    def get_purchase_orders(  # pylint: disable=too-many-locals
+    def get_purchase_orders(
         self,
         limit: int = 10000,
+        labels: Optional[Dict[str, str]] = None,
+        decode_statuses: bool = False,
     ) -> DatabaseRows:
         """Gets a list of POs from CitiBuy
 
@@ -109,12 +275,36 @@ class CitiBuy:
         ----------
         limit: int
             Number of records to return from the query results
+        labels: Dict[str, str], optional
+            Maps the columns to return, including the computed po_title and
+            po_type columns, to the names they're returned under. Default is
+            to return every column under its original name
+        decode_statuses: bool, optional
+            Replaces the status codes with their descriptions in the query
 
         Returns
         -------
         DatabaseRows
             An instance of DatabaseRows for the purchase order records
         """
+        query = self.purchase_order_query(limit, labels, decode_statuses)
+        return self._execute(query, "get_purchase_orders", query_params())
+
+    @cached_statement
+    def purchase_order_query(  # pylint: disable=too-many-locals
+        self,
+        limit: int = 10000,
+        labels: Optional[Dict[str, str]] = None,
+        decode_statuses: bool = False,
+    ) -> Select:
+        """Builds the query used by get_purchase_orders(), with the
+        contract_cutoff bound parameter
+
+        Returns
+        -------
+        Select
+            The query statement for the purchase order records
+        """
         # create aliases for the tables
         po = aliased(models.PurchaseOrder, name="po")
         ven = aliased(models.Vendor, name="v")
@@ -151,7 +341,7 @@ class CitiBuy:
 
         # filter for recent blanket contracts and open market POs
         open_market = con.contract_agency.is_(None)
-        not_closed = con.end_date > (date.today() - timedelta(90))
+        not_closed = con.end_date > sa.bindparam("contract_cutoff")
         query = query.where(open_market | not_closed)
 
         # filter for DGS releases or blanket POs available to DGS
@@ -162,11 +352,130 @@ class CitiBuy:
         # filter out POs and releases that are closed
         query = query.where(po.status.notin_(("3PCO", "3PCA")))
 
-        with Session(self.engine) as session:
-            rows = session.execute(query).fetchall()
-        return DatabaseRows(rows)
+        if labels is None and not decode_statuses:
+            return query
+        computed = {"po_title": po_title, "po_type": po_type}
+        statuses = {"status": self.PO_STATUS} if decode_statuses else {}
+        return label_columns(query, labels, computed, statuses)
 
-    def get_invoices(self, days_ago: int = 90) -> DatabaseRows:
+    def get_purchase_order_sets(
+        self,
+        po_cols: Dict[str, str],
+        vendor_cols: Dict[str, str],
+        contract_cols: Dict[str, str],
+        limit: int = 10000,
+    ) -> Dict[str, DatabaseRows]:
+        """Gets the unique POs, vendors, and master blanket contracts from the
+        POs returned by get_purchase_orders()
+
+        Each set is de-duplicated in the query, preferring DGS contracts over
+        AGY contracts, and the DGS business units of each vendor and contract
+        are aggregated into a comma separated list in the ven_loc and con_loc
+        columns
+
+        Parameters
+        ----------
+        po_cols: Dict[str, str]
+            Maps the PO columns, including po_title and po_type, to the names
+            they're returned under
+        vendor_cols: Dict[str, str]
+            Maps the vendor columns, including ven_loc, to the names they're
+            returned under
+        contract_cols: Dict[str, str]
+            Maps the contract columns, including con_loc, to the names they're
+            returned under
+        limit: int
+            Number of POs to de-duplicate, passed to purchase_order_query()
+
+        Returns
+        -------
+        Dict[str, DatabaseRows]
+            The DatabaseRows for the "po", "vendor", and "contract" sets
+        """
+        queries = self.purchase_order_set_queries(
+            po_cols, vendor_cols, contract_cols, limit
+        )
+        params = query_params()
+        return {
+            name: self._execute(
+                query, f"get_purchase_order_sets.{name}", params
+            )
+            for name, query in queries.items()
+        }
+
+    @cached_statement
+    def purchase_order_set_queries(  # pylint: disable=too-many-locals
+        self,
+        po_cols: Dict[str, str],
+        vendor_cols: Dict[str, str],
+        contract_cols: Dict[str, str],
+        limit: int = 10000,
+    ) -> Dict[str, Select]:
+        """Builds the queries used by get_purchase_order_sets(), with the
+        bound parameters of purchase_order_query()
+
+        Returns
+        -------
+        Dict[str, Select]
+            The query statements for the "po", "vendor", and "contract" sets
+        """
+        pos = self.purchase_order_query(limit).cte("purchase_orders")
+
+        # rank the rows for each PO and vendor so that DGS contracts are
+        # listed before AGY contracts
+        dgs_first = pos.c.contract_agency.desc()
+        po_order = (pos.c.po_nbr, pos.c.release_nbr, dgs_first)
+        ranked = sa.select(
+            pos,
+            sa.func.row_number()
+            .over(partition_by=po_order[:2], order_by=dgs_first)
+            .label("po_rank"),
+            sa.func.row_number()
+            .over(partition_by=pos.c.vendor_id, order_by=po_order)
+            .label("vendor_rank"),
+        ).cte("ranked")
+
+        # aggregate the DGS business units of each contract and vendor
+        con_loc = aggregate_units(pos, "po_nbr", "con_loc")
+        ven_loc = aggregate_units(pos, "vendor_id", "ven_loc")
+
+        # isolate the unique POs, vendors, and contracts
+        po_query = sa.select(ranked).where(ranked.c.po_rank == 1)
+        vendor_query = (
+            sa.select(ranked, ven_loc.c.ven_loc)
+            .join_from(
+                ranked,
+                ven_loc,
+                ranked.c.vendor_id == ven_loc.c.vendor_id,
+                isouter=True,
+            )
+            .where(ranked.c.vendor_rank == 1)
+        )
+        contract_query = (
+            sa.select(ranked, con_loc.c.con_loc)
+            .join_from(
+                ranked,
+                con_loc,
+                ranked.c.po_nbr == con_loc.c.po_nbr,
+                isouter=True,
+            )
+            .where(ranked.c.po_rank == 1)
+            .where(ranked.c.release_nbr == 0)
+            .where(ranked.c.start_date.isnot(None))
+        )
+        computed = {"po_title": po_title, "po_type": po_type}
+        return {
+            "po": label_columns(po_query, po_cols, computed),
+            "vendor": label_columns(vendor_query, vendor_cols),
+            "contract": label_columns(contract_query, contract_cols),
+        }
+
+    def get_invoices(
+        self,
+        days_ago: int = 90,
+        labels: Optional[Dict[str, str]] = None,
+        decode_statuses: bool = False,
+    ) -> DatabaseRows:
         """Gets a list of invoices from CitiBuy
 
         Parameters
@@ -175,12 +484,37 @@ class CitiBuy:
             The maximum number of days in the past an invoice must have been
             paid or cancelled in order for it to appear in the results. Older
             paid or cancelled invoices will be excluded
+        labels: Dict[str, str], optional
+            Maps the columns to return, including the computed po_type column,
+            to the names they're returned under. Default is to return every
+            column under its original name
+        decode_statuses: bool, optional
+            Replaces the invoice and PO status codes with their descriptions
+            in the query
 
         Returns
         -------
         DatabaseRows
             An instance of DatabaseRows for the invoice records
         """
+        query = self.invoice_query(labels, decode_statuses)
+        params = query_params(days_ago=days_ago)
+        return self._execute(query, "get_invoices", params)
+
+    @cached_statement
+    def invoice_query(
+        self,
+        labels: Optional[Dict[str, str]] = None,
+        decode_statuses: bool = False,
+    ) -> Select:
+        """Builds the query used by get_invoices(), with the cutoff_date bound
+        parameter
+
+        Returns
+        -------
+        Select
+            The query statement for the invoice records
+        """
         # create aliases for the tables
         po = aliased(models.PurchaseOrder, name="po")
         ven = aliased(models.Vendor, name="vendor")
@@ -190,7 +524,9 @@ class CitiBuy:
         # create foreign key join conditions
         dgs_contract = con.contract_agency == "DGS"
         fkey_vendor = inv.vendor_id == ven.vendor_id
-        fkey_po = (po.po_nbr == inv.po_nbr) & (po.release_nbr == inv.release_nbr)  # fmt: skip
+        fkey_po = (po.po_nbr == inv.po_nbr) & (
+            po.release_nbr == inv.release_nbr
+        )
         fkey_contract = (inv.po_nbr == con.po_nbr) & (dgs_contract)
 
         # build the query statement
@@ -220,24 +556,66 @@ class CitiBuy:
             # invoice still open or recently closed or cancelled
             # as determined by the days_ago parameter cutoff
             (inv.status.not_in(("4IP", "4IC")))
-            | (inv.modified > (date.today() - timedelta(days_ago)))
+            | (inv.modified > sa.bindparam("cutoff_date"))
         )
 
-        # execute the query
-        with Session(self.engine) as session:
-            rows = session.execute(query).fetchall()
-        return DatabaseRows(rows)
-
-    def get_receipts(self, days_ago: int = 90) -> DatabaseRows:
+        if labels is None and not decode_statuses:
+            return query
+        computed = {"po_type": invoice_po_type}
+        statuses = {}
+        if decode_statuses:
+            statuses = {
+                "status": self.INVOICE_STATUS,
+                "po_status": self.PO_STATUS,
+            }
+        return label_columns(query, labels, computed, statuses)
+
+    def get_receipts(
+        self,
+        days_ago: int = 90,
+        labels: Optional[Dict[str, str]] = None,
+        decode_statuses: bool = False,
+    ) -> DatabaseRows:
         """Gets open receipts from CitiBuy
 
         This query pulls both the PO Receipts and the associated approval paths
         from CitiBuy in order to help Fiscal AP Analysts monitor their queue
 
+        Parameters
+        ----------
+        days_ago: int
+            The maximum number of days in the past a receipt must have been
+            approved in order for it to appear in the results
+        labels: Dict[str, str], optional
+            Maps the columns to return to the names they're returned under.
+            Default is to return every column under its original name
+        decode_statuses: bool, optional
+            Replaces the receipt status codes with their descriptions in the
+            query
+
         Returns
         -------
+        DatabaseRows
             An instance of DatabaseRows for the receipt records
         """
+        query = self.receipt_query(labels, decode_statuses)
+        params = query_params(days_ago=days_ago)
+        return self._execute(query, "get_receipts", params)
+
+    @cached_statement
+    def receipt_query(
+        self,
+        labels: Optional[Dict[str, str]] = None,
+        decode_statuses: bool = False,
+    ) -> Select:
+        """Builds the query used by get_receipts(), with the cutoff_date bound
+        parameter
+
+        Returns
+        -------
+        Select
+            The query statement for the receipt records
+        """
         # create aliases for the tables
         receipt = aliased(models.Receipt, name="receipt")
         approver = aliased(models.Approver, name="approver")
@@ -263,7 +641,7 @@ class CitiBuy:
 
         # build the final query and filter out approved receipts
         # and previous approval paths
-        approval_cutoff = date.today() - timedelta(days_ago)
+        approval_cutoff = sa.bindparam("cutoff_date")
         not_approved = subq.c.status.in_(("5CR", "5CRT", "5CI"))
         last_approver = subq.c.approval_nbr == 1
         dgs_receipt = subq.c.agency == "DGS"
@@ -273,10 +651,176 @@ class CitiBuy:
             (not_approved) | (subq.c.modified_date > approval_cutoff)
         )
 
-        # execute the query and return the db rows
-        with Session(self.engine) as session:
-            rows = session.execute(query).fetchall()
-        return DatabaseRows(rows)
+        if labels is None and not decode_statuses:
+            return query
+        statuses = {"status": self.RECEIPT_STATUS} if decode_statuses else {}
+        return label_columns(query, labels, statuses=statuses)
+
+    def _execute(
+        self,
+        query: sa.sql.Executable,
+        name: str = "query",
+        params: Optional[Dict[str, Any]] = None,
+    ) -> DatabaseRows:
+        """Executes a query statement with the values of its bound parameters
+        and returns the rows, profiling the query under the name passed if
+        profiling is enabled
+
+        If caching is enabled the cached results are returned until they
+        expire, unless the cache is being refreshed
+        """
+        self._ensure_staged()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(self.engine, query, params)
+            cached = None if self.refresh_cache else self.cache.get(key)
+            if cached is not None:
+                metrics.increment("citibuy_cache_hits")
+                return DatabaseRows.from_dataframe(cached)
+        results = self._fetch(self.engine, query, name, params)
+        if key is not None:
+            self.cache.set(key, results.dataframe)
+        return results
+
+    def _fetch(
+        self,
+        engine: sa.engine.Engine,
+        query: sa.sql.Executable,
+        name: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> DatabaseRows:
+        """Runs a query against an engine and returns the rows, profiling the
+        query under the name passed if profiling is enabled
+        """
+        with self._profile(name) as profile, Session(engine) as session:
+            result = session.execute(query, params)
+            rows = profile.fetch(result) if profile else result.fetchall()
+        metrics.increment("citibuy_rows_fetched", len(rows))
+        return DatabaseRows(rows, cols=tuple(result.keys()))
+
+    def _ensure_staged(self) -> None:
+        """Syncs the staging database the first time the client runs a query
+        in staging mode, so each run picks up the rows that changed since the
+        last one, unless the staging database is still fresh
+        """
+        if self.staging is None or self._staged:
+            return
+        if not self.staging.is_fresh:
+            self.staging.sync()
+        self._staged = True
+
+    def _profile(self, name: str):
+        """Returns the context that profiles a query, which yields None if
+        profiling isn't enabled
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.profile(name)
+
+
+def aggregate_units(pos: sa.sql.CTE, key: str, name: str) -> sa.sql.Subquery:
+    """Aggregates the unique DGS business units of the POs for each value of
+    the key column into a sorted, comma separated list
+    """
+    units = (
+        sa.select(pos.c[key], pos.c.unit)
+        .where(pos.c.agency == "DGS")
+        .where(pos.c.unit.isnot(None))
+        .distinct()
+        .order_by(pos.c[key], pos.c.unit)
+        .subquery()
+    )
+    return (
+        sa.select(units.c[key], string_agg(units.c.unit, ", ").label(name))
+        .group_by(units.c[key])
+        .subquery()
+    )
+
+
+def decode_status(col: ColumnElement, codes: dict) -> ColumnElement:
+    """Returns a CASE expression that replaces the status codes in a column
+    with their descriptions, leaving codes without a description as is
+    """
+    return sa.case(codes, value=col, else_=col)
+
+
+def po_title(cols: sa.sql.ColumnCollection) -> ColumnElement:
+    """Returns the PO title, which appends the release number to the PO number
+    for releases: 'P12345:1', and leaves it off of the PO itself: 'P12345'
+    """
+    release = sa.cast(cols.release_nbr, sa.String)
+    return sa.case(
+        (cols.release_nbr == 0, cols.po_nbr),
+        else_=cols.po_nbr.concat(":").concat(release),
+    )
+
+
+def po_type(cols: sa.sql.ColumnCollection) -> ColumnElement:
+    """Returns the type of a PO: Master Blanket for POs with a contract, Open
+    Market for POs without one, or Release for releases against a PO
+    """
+    return sa.case(
+        (
+            (cols.release_nbr == 0) & cols.start_date.isnot(None),
+            "Master Blanket",
+        ),
+        (
+            (cols.release_nbr == 0) & cols.start_date.is_(None),
+            "Open Market",
+        ),
+        else_="Release",
+    )
+
+
+def invoice_po_type(cols: sa.sql.ColumnCollection) -> ColumnElement:
+    """Returns the type of the PO an invoice was created from: Open Market for
+    POs without a DGS contract, otherwise Release
+    """
+    return sa.case(
+        (cols.contract_end_date.is_(None), "Open Market"),
+        else_="Release",
+    )
+
+
+def label_columns(
+    query: Select,
+    labels: Optional[Dict[str, str]] = None,
+    computed: Optional[Dict[str, Callable]] = None,
+    statuses: Optional[Dict[str, dict]] = None,
+) -> Select:
+    """Wraps a query so that its columns are returned in the order and under
+    the names passed to labels, with their status codes decoded
+
+    Parameters
+    ----------
+    query: Select
+        The query whose columns are selected
+    labels: Dict[str, str], optional
+        Maps the name of each column to select to the name it's returned
+        under. Default is to select every column of the query under its
+        original name
+    computed: Dict[str, Callable], optional
+        Maps the names of columns that aren't selected by the query to
+        functions that compute them from the query's columns
+    statuses: Dict[str, dict], optional
+        Maps the names of status columns to the codes used to decode them
+
+    Returns
+    -------
+    Select
+        A query that selects the labeled columns from the original query
+    """
+    computed = computed or {}
+    statuses = statuses or {}
+    subq = query.subquery()
+    labels = labels or {name: name for name in subq.c.keys()}
+    columns = []
+    for name, label in labels.items():
+        col = computed[name](subq.c) if name in computed else subq.c[name]
+        if name in statuses:
+            col = decode_status(col, statuses[name])
+        columns.append(col.label(label))
+    return sa.select(*columns)
 
 
 class DatabaseRows:
@@ -294,11 +838,26 @@ class DatabaseRows:
         A tuple of the names of the columns returned by the query
     """
 
-    def __init__(self, rows: List[Row], row_type: str = "columns") -> None:
+    def __init__(
+        self,
+        rows: List[Row],
+        row_type: str = "columns",
+        cols: tuple = None,
+    ) -> None:
         """Inits the DatabaseRows class"""
         self.rows = rows
         self.row_type = row_type
-        self.cols = rows[0]._fields
+        self.cols = cols if cols is not None else rows[0]._fields
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> DatabaseRows:
+        """Creates an instance of DatabaseRows from a dataframe of query
+        results, e.g. results read from the QueryCache, with missing values
+        returned as None
+        """
+        df = df.astype(object).where(df.notna(), None)
+        rows = list(df.itertuples(index=False, name=None))
+        return cls(rows, cols=tuple(df.columns))
 
     @property
     def dataframe(self) -> pd.DataFrame:
@@ -308,4 +867,4 @@ class DatabaseRows:
     @property
     def records(self) -> List[dict]:
         """Returns the rows as a list of dictionaries"""
-        return [row._asdict() for row in self.rows]
+        return [dict(zip(self.cols, row)) for row in self.rows]
@@ -0,0 +1,58 @@
+from __future__ import annotations  # prevents NameError for typehints
+
+import sqlalchemy as sa
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class string_agg(FunctionElement):  # pylint: disable=invalid-name
+    """Aggregates the values in a column into a single string, with the values
+    sorted and separated by the separator passed to the function
+
+    This is compiled to STRING_AGG() WITHIN GROUP for SQL Server, which is the
+    CitiBuy backend, and to GROUP_CONCAT() for the SQLite test database
+
+    Parameters
+    ----------
+    expr: ColumnElement
+        The column whose values are aggregated
+    separator: str
+        The string placed between each of the aggregated values
+    """
+
+    type = sa.String()
+    name = "string_agg"
+    inherit_cache = True
+
+    def __init__(self, expr, separator: str) -> None:
+        """Inits the string_agg function"""
+        super().__init__(expr, sa.literal(separator))
+
+
+@compiles(string_agg)
+def compile_string_agg(element, compiler, **kwargs) -> str:
+    """Compiles string_agg for SQL Server"""
+    expr, separator = list(element.clauses)
+    expr = compiler.process(expr, **kwargs)
+    separator = compiler.process(separator, **kwargs)
+    return f"STRING_AGG({expr}, {separator}) WITHIN GROUP (ORDER BY {expr})"
+
+
+@compiles(string_agg, "postgresql")
+def compile_string_agg_postgresql(element, compiler, **kwargs) -> str:
+    """Compiles string_agg for PostgreSQL"""
+    expr, separator = list(element.clauses)
+    expr = compiler.process(expr, **kwargs)
+    separator = compiler.process(separator, **kwargs)
+    return f"STRING_AGG({expr}, {separator} ORDER BY {expr})"
+
+
+@compiles(string_agg, "sqlite")
+def compile_string_agg_sqlite(element, compiler, **kwargs) -> str:
+    """Compiles string_agg for SQLite, which concatenates the values in the
+    order they're selected, so the values should be sorted in a subquery
+    """
+    expr, separator = list(element.clauses)
+    expr = compiler.process(expr, **kwargs)
+    separator = compiler.process(separator, **kwargs)
+    return f"GROUP_CONCAT({expr}, {separator})"
@@ -5,7 +5,11 @@ class Invoice(db.Base):
     """Table that contains summary level information about an Invoice"""
 
     __tablename__ = "INVOICE_HDR"
-    __table_args__ = (db.init_po_joint_key(),)
+    __table_args__ = (
+        db.init_po_joint_key(),
+        # filters out invoices that were closed before the days_ago cutoff
+        db.Index("IX_INVOICE_HDR_UPDATED_DATE", "UPDATED_DATE"),
+    )
 
     # columns
     id = db.Column("ID", db.String, primary_key=True)
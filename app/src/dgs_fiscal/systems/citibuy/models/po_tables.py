@@ -20,6 +20,10 @@ class PurchaseOrder(db.Base):
     """Table that contains summary level information about a Purchase Order"""
 
     __tablename__ = "PO_HEADER"
+    __table_args__ = (
+        # filters the POs, invoices, and contracts to DGS POs
+        db.Index("IX_PO_HEADER_DEPT_NBR_PREFIX_REF", "DEPT_NBR_PREFIX_REF"),
+    )
 
     # columns
     po_nbr = db.Column("PO_NBR", db.String, primary_key=True)
@@ -60,7 +64,11 @@ class BlanketContract(db.Base):
     """Table that contains details about the blanket contract for the PO"""
 
     __tablename__ = "BLANKET_CONTROL"
-    __table_args__ = (db.init_po_joint_key(),)
+    __table_args__ = (
+        db.init_po_joint_key(),
+        # filters out expired contracts
+        db.Index("IX_BLANKET_CONTROL_BLANKET_END_DATE", "BLANKET_END_DATE"),
+    )
 
     # columns
     po_nbr = db.Column("PO_NBR", db.String, primary_key=True)
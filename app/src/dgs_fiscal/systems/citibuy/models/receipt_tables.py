@@ -68,3 +68,12 @@ class Approver(db.Base):
         "requested_date",
         "approval_date",
     )
+
+
+# ranks the approval paths of each receipt by their order sequence, which is
+# declared after the model because receipt_id isn't named until it's mapped
+db.Index(
+    "IX_RECEIPT_ROUTING_RECEIPT_ID_ORDER_SEQUENCE",
+    Approver.receipt_id,
+    Approver.order,
+)
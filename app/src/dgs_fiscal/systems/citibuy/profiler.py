@@ -0,0 +1,204 @@
+from __future__ import annotations  # prevents NameError for typehints
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy.engine import CursorResult, Engine, Row
+
+PROFILE_FILE = "citibuy_queries.jsonl"
+REPORT_COLS = ["name", "execute_seconds", "fetch_seconds", "rows", "bytes"]
+
+
+@dataclass
+class QueryProfile:  # pylint: disable=too-many-instance-attributes
+    """Data class for storing the profile of a single CitiBuy query
+
+    Attributes
+    ----------
+    name: str
+        The name of the client method that ran the query, e.g. get_receipts
+    sql: str
+        The SQL statement sent to the database, with placeholders for the
+        bound parameters
+    params: str
+        The parameters bound to the statement
+    execute_seconds: float
+        The number of seconds the database took to execute the statement
+    fetch_seconds: float
+        The number of seconds spent fetching the rows from the cursor
+    rows: int
+        The number of rows returned by the query
+    bytes: int
+        The approximate size of the values returned by the query
+    statistics: List[str]
+        The SET STATISTICS IO and TIME messages returned by SQL Server
+    timestamp: str
+        When the query was run
+    """
+
+    name: str
+    sql: str = ""
+    params: str = ""
+    execute_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    statistics: List[str] = field(default_factory=list)
+    timestamp: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    def fetch(self, result: CursorResult) -> List[Row]:
+        """Fetches the rows returned by the query and records how long it
+        took, how many rows were returned, and their size
+        """
+        start = time.perf_counter()
+        rows = result.fetchall()
+        self.fetch_seconds = time.perf_counter() - start
+        self.rows = len(rows)
+        self.bytes = sum(value_bytes(value) for row in rows for value in row)
+        return rows
+
+
+class QueryProfiler:
+    """Profiles the queries run by the CitiBuy client with SQLAlchemy engine
+    events
+
+    Only the statements executed in the body of profile() are recorded, so
+    the queries SQLAlchemy runs on its own, e.g. when it first connects,
+    aren't included in the report. The executions of the engine passed to
+    the constructor are timed, and listen() adds other engines the client
+    runs queries on, e.g. the staging database.
+
+    Attributes
+    ----------
+    engine: Engine
+        The engine connected to the CitiBuy database, whose cursor executions
+        are timed
+    statistics: bool
+        Turns on SET STATISTICS IO and TIME before each query and captures
+        the messages they return. Only supported by SQL Server, so it's only
+        used for the queries run on SQL Server engines
+    profile_dir: Path, optional
+        The directory each profile is appended to as a JSON line so that
+        runs can be compared over time. Profiles aren't saved if this is None
+    profiles: List[QueryProfile]
+        The profile of each query that's been run
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        statistics: bool = False,
+        profile_dir: Optional[Path] = None,
+    ) -> None:
+        """Inits the QueryProfiler class and listens for the engine events"""
+        self.engine = engine
+        self.statistics = statistics and engine.dialect.name == "mssql"
+        self.profile_dir = profile_dir
+        self.profiles: List[QueryProfile] = []
+        self._active: Optional[QueryProfile] = None
+        self.listen(engine)
+
+    def listen(self, engine: Engine) -> None:
+        """Times the cursor executions of an engine"""
+        sa.event.listen(engine, "before_cursor_execute", self._before_execute)
+        sa.event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[QueryProfile]:
+        """Records the statements executed in the body of the with statement
+        in a QueryProfile, which is saved once the body finishes
+        """
+        self._active = QueryProfile(name)
+        try:
+            yield self._active
+        finally:
+            profile, self._active = self._active, None
+            self.profiles.append(profile)
+            if self.profile_dir:
+                self.save(profile)
+
+    def save(self, profile: QueryProfile) -> Path:
+        """Appends a profile to the PROFILE_FILE in the profile directory"""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        file = self.profile_dir / PROFILE_FILE
+        with open(file, "a", encoding="utf-8") as jsonl:
+            jsonl.write(json.dumps(asdict(profile)) + "\n")
+        return file
+
+    def report(self) -> str:
+        """Returns a table of the time spent on each query and the rows and
+        bytes they returned, with the slowest queries listed first
+        """
+        if not self.profiles:
+            return "No CitiBuy queries were profiled"
+        df = pd.DataFrame([asdict(p) for p in self.profiles])[REPORT_COLS]
+        df["total_seconds"] = df["execute_seconds"] + df["fetch_seconds"]
+        df = df.sort_values("total_seconds", ascending=False)
+        return df.to_string(index=False, float_format="{:.3f}".format)
+
+    def _before_execute(  # pylint: disable=too-many-arguments
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        """Records the statement and starts the execution timer"""
+        if self._active is None:
+            return
+        if self._uses_statistics(conn):
+            cursor.execute("SET STATISTICS IO, TIME ON")
+        self._active.sql = statement
+        self._active.params = repr(parameters)
+        conn.info["profile_start"] = time.perf_counter()
+
+    def _after_execute(  # pylint: disable=too-many-arguments
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        """Stops the execution timer and captures the statistics messages"""
+        if self._active is None:
+            return
+        start = conn.info.pop("profile_start")
+        self._active.execute_seconds += time.perf_counter() - start
+        if self._uses_statistics(conn):
+            messages = getattr(cursor, "messages", None) or []
+            self._active.statistics.extend(msg for _, msg in messages)
+
+    def _uses_statistics(self, conn: sa.engine.Connection) -> bool:
+        """Returns True if statistics are captured for the connection"""
+        return self.statistics and conn.dialect.name == "mssql"
+
+
+def value_bytes(value) -> int:
+    """Returns the approximate number of bytes used to send a value"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bytes):
+        return len(value)
+    return 8  # numbers and dates
+
+
+def load_profiles(profile_dir: Path) -> pd.DataFrame:
+    """Loads the profiles saved in a profile directory so the time spent on
+    each query can be compared across runs
+
+    Parameters
+    ----------
+    profile_dir: Path
+        The directory the profiles were saved to
+
+    Returns
+    -------
+    pd.DataFrame
+        A row for each query that was profiled, in the order they were run
+    """
+    file = Path(profile_dir) / PROFILE_FILE
+    if not file.exists():
+        return pd.DataFrame(columns=["timestamp", "sql", *REPORT_COLS])
+    return pd.read_json(file, lines=True)
@@ -0,0 +1,169 @@
+from __future__ import annotations  # prevents NameError for typehints
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql, postgresql, sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.sql import Select, visitors
+
+from dgs_fiscal.systems.citibuy import models
+from dgs_fiscal.systems.citibuy.client import query_params
+
+if TYPE_CHECKING:
+    from dgs_fiscal.systems.citibuy.client import CitiBuy
+
+DIALECTS = {
+    "mssql": mssql.dialect,
+    "postgresql": postgresql.dialect,
+    "sqlite": sqlite.dialect,
+}
+
+# patterns that mark a step in the query plan as a scan of a whole table
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?!.*\bINDEX\b)")
+MSSQL_SCAN = re.compile(r"\b(Table Scan|Clustered Index Scan)\b")
+
+
+@dataclass
+class QueryPlan:
+    """Data class for storing the query plan of a CitiBuy query
+
+    Attributes
+    ----------
+    name: str
+        The name of the client method that runs the query
+    steps: List[str]
+        Each step in the query plan returned by the database
+    full_scans: List[str]
+        The steps in the plan that scan every row of a table
+    """
+
+    name: str
+    steps: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+
+
+def generate_ddl(dialect: str = "mssql", tables: bool = False) -> List[str]:
+    """Compiles the DDL that creates the indexes declared on the CitiBuy
+    models, e.g. to add them to a reporting replica
+
+    Parameters
+    ----------
+    dialect: str, optional
+        The database the DDL is compiled for, one of DIALECTS
+    tables: bool, optional
+        Also includes the CREATE TABLE statements for each model so that a
+        new replica can be created from scratch
+
+    Returns
+    -------
+    List[str]
+        A CREATE TABLE or CREATE INDEX statement for each table or index
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unsupported dialect '{dialect}'")
+    compiler = DIALECTS[dialect]()
+    statements = []
+    for table in models.Base.metadata.sorted_tables:
+        if tables:
+            statements.append(CreateTable(table).compile(dialect=compiler))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(CreateIndex(index).compile(dialect=compiler))
+    return [str(stmt).strip() for stmt in statements]
+
+
+def client_queries(citibuy: CitiBuy) -> Dict[str, Select]:
+    """Returns the queries run by the CitiBuy client's get methods with the
+    default values bound to their parameters, keyed by the name of the method
+    """
+    params = query_params()
+    return {
+        "get_purchase_orders": citibuy.purchase_order_query().params(params),
+        "get_invoices": citibuy.invoice_query().params(params),
+        "get_receipts": citibuy.receipt_query().params(params),
+    }
+
+
+def explain(engine: sa.engine.Engine, query: Select) -> List[str]:
+    """Returns the steps of the query plan the database uses for a query,
+    which are returned by EXPLAIN QUERY PLAN for SQLite and by SET
+    SHOWPLAN_TEXT for SQL Server
+    """
+    dialect = engine.dialect.name
+    with engine.connect() as conn:
+        if dialect == "sqlite":
+            compiled = query.compile(
+                dialect=engine.dialect,
+                compile_kwargs={"literal_binds": True},
+            )
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+            return [row[-1] for row in rows]
+        if dialect == "mssql":
+            conn.exec_driver_sql("SET SHOWPLAN_TEXT ON")
+            try:
+                result = conn.execute(query)
+                steps = [row[0] for row in result]
+                while result.cursor.nextset():  # the plan is the second set
+                    steps.extend(row[0] for row in result.cursor.fetchall())
+            finally:
+                conn.exec_driver_sql("SET SHOWPLAN_TEXT OFF")
+            return steps
+    raise ValueError(f"Query plans aren't supported for '{dialect}'")
+
+
+def find_full_scans(
+    query: Select,
+    steps: List[str],
+    dialect: str = "sqlite",
+) -> List[str]:
+    """Returns the steps of a query plan that scan every row of a table
+
+    SQLite also reports scans of subqueries and with statements, so only the
+    scans of the tables selected by the query are returned for SQLite
+    """
+    if dialect == "mssql":
+        return [step for step in steps if MSSQL_SCAN.search(step)]
+    tables = set()
+    for element in visitors.iterate(query):
+        if isinstance(element, sa.Table):
+            tables.add(element.name)
+        elif isinstance(element, sa.sql.Alias) and isinstance(
+            element.element, sa.Table
+        ):
+            tables.add(element.name)
+    full_scans = []
+    for step in steps:
+        match = SQLITE_SCAN.search(step)
+        if match and match.group(1) in tables:
+            full_scans.append(step)
+    return full_scans
+
+
+def check_query_plans(
+    citibuy: CitiBuy,
+    queries: Optional[Dict[str, Select]] = None,
+) -> List[QueryPlan]:
+    """Captures the query plan of each CitiBuy query and flags the steps that
+    scan a whole table instead of using an index
+
+    Parameters
+    ----------
+    citibuy: CitiBuy
+        The client whose engine the queries are explained with, typically
+        connected to the local mock database
+    queries: Dict[str, Select], optional
+        The queries to check, keyed by name. Defaults to client_queries()
+
+    Returns
+    -------
+    List[QueryPlan]
+        The plan of each query and its full table scans
+    """
+    engine = citibuy.engine
+    plans = []
+    for name, query in (queries or client_queries(citibuy)).items():
+        steps = explain(engine, query)
+        full_scans = find_full_scans(query, steps, engine.dialect.name)
+        plans.append(QueryPlan(name, steps, full_scans))
+    return plans
@@ -0,0 +1,225 @@
+from __future__ import annotations  # prevents NameError for typehints
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection, Engine, make_url
+
+from dgs_fiscal.metrics import metrics
+from dgs_fiscal.systems.citibuy import models
+
+BATCH_SIZE = 10_000  # number of rows copied by each executemany()
+
+# the column that records when each row was last changed, for the tables that
+# can be synced incrementally. The other tables are copied in full each sync
+WATERMARKS: Dict[str, str] = {
+    "INVOICE_HDR": "UPDATED_DATE",
+    "INVOICE_STATUS_DATES": "INVOICE_STATUS_DATE",
+    "RECEIPT_HEADER": "DATE_LAST_UPDATED",
+}
+
+# records when each table was last synced and the watermark it was synced to
+sync_state = sa.Table(
+    "STAGING_SYNC_STATE",
+    sa.MetaData(),
+    sa.Column("table_name", sa.String(50), primary_key=True),
+    sa.Column("watermark", sa.DateTime),
+    sa.Column("synced_at", sa.DateTime),
+    sa.Column("rows", sa.Integer),
+)
+
+
+@dataclass
+class SyncResult:
+    """Data class for storing the result of syncing a table
+
+    Attributes
+    ----------
+    table: str
+        The name of the table that was synced
+    rows: int
+        The number of rows copied from the source database
+    incremental: bool
+        True if only the rows changed since the last sync were copied, False
+        if the whole table was copied
+    seconds: float
+        The number of seconds it took to sync the table
+    """
+
+    table: str
+    rows: int = 0
+    incremental: bool = False
+    seconds: float = 0.0
+
+
+class StagingDatabase:
+    """Local SQLite copy of the CitiBuy tables covered by the models, which the
+    CitiBuy client can query instead of the source database
+
+    Tables listed in WATERMARKS are synced incrementally by copying the rows
+    modified since the latest timestamp already in the staging database. The
+    rest of the tables don't have a reliable modified timestamp, so they're
+    copied in full each time. Rows deleted from the source aren't removed by
+    an incremental sync, pass full=True to sync() to recopy every table.
+
+    Attributes
+    ----------
+    source: Engine
+        The engine connected to the CitiBuy database the rows are copied from
+    engine: Engine
+        The engine connected to the local staging database
+    batch_size: int
+        The number of rows copied by each executemany()
+    max_age: float
+        The number of seconds after a sync that the staging database is
+        considered fresh. Default is 0, which means it's never fresh
+    """
+
+    def __init__(
+        self,
+        source: Engine,
+        staging_url: str,
+        batch_size: int = BATCH_SIZE,
+        max_age: float = 0,
+    ) -> None:
+        """Inits the StagingDatabase class
+
+        Raises
+        ------
+        ValueError
+            If the staging database isn't a SQLite database
+        """
+        url = make_url(staging_url)
+        if url.get_backend_name() != "sqlite":
+            raise ValueError("The staging database must be a SQLite database")
+        if url.database and url.database != ":memory:":
+            Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+        self.source = source
+        self.engine = sa.create_engine(url)
+        self.batch_size = batch_size
+        self.max_age = max_age
+
+    @property
+    def is_synced(self) -> bool:
+        """Returns True if every table has been synced at least once"""
+        if not sa.inspect(self.engine).has_table(sync_state.name):
+            return False
+        with self.engine.connect() as conn:
+            synced = conn.execute(sa.select(sync_state.c.table_name))
+            tables = {row.table_name for row in synced}
+        return tables.issuperset(models.Base.metadata.tables)
+
+    @property
+    def is_fresh(self) -> bool:
+        """Returns True if every table was synced within the last max_age
+        seconds
+        """
+        synced = self.last_synced()
+        if not set(synced).issuperset(models.Base.metadata.tables):
+            return False
+        age = datetime.now() - min(synced.values())
+        return age.total_seconds() < self.max_age
+
+    def last_synced(self) -> Dict[str, datetime]:
+        """Returns when each table was last synced, keyed by table name"""
+        if not sa.inspect(self.engine).has_table(sync_state.name):
+            return {}
+        with self.engine.connect() as conn:
+            rows = conn.execute(sa.select(sync_state))
+            return {row.table_name: row.synced_at for row in rows}
+
+    def sync(self, full: bool = False) -> List[SyncResult]:
+        """Copies the rows that changed since the last sync from the source
+        database to the staging database
+
+        Parameters
+        ----------
+        full: bool, optional
+            Recopies every table in full instead of only the changed rows
+
+        Returns
+        -------
+        List[SyncResult]
+            The result of syncing each table, in the order they were synced
+        """
+        models.Base.metadata.create_all(self.engine)
+        sync_state.create(self.engine, checkfirst=True)
+        results = []
+        for table in models.Base.metadata.sorted_tables:
+            results.append(self.sync_table(table, full))
+        return results
+
+    def sync_table(self, table: sa.Table, full: bool = False) -> SyncResult:
+        """Copies the rows of a table that changed since the last sync, or
+        every row if the table can't be synced incrementally
+
+        Each table is synced in a single transaction so that the staging
+        database never contains a partial copy of a table
+        """
+        start = time.perf_counter()
+        col = WATERMARKS.get(table.name)
+        query = sa.select(table)
+        with self.engine.begin() as staging:
+            watermark = None
+            if col is not None and not full:
+                watermark = self._watermark(staging, table.name)
+            if watermark is not None:
+                # rows modified at the watermark itself may not have been
+                # committed at the last sync, so they're copied again
+                query = query.where(table.c[col] >= watermark)
+            else:
+                staging.execute(table.delete())
+            rows = self._copy_rows(staging, table, query)
+            if col is not None:
+                latest = staging.execute(sa.select(sa.func.max(table.c[col])))
+                watermark = latest.scalar()
+            upsert = sa.insert(sync_state).prefix_with("OR REPLACE")
+            staging.execute(
+                upsert,
+                {
+                    "table_name": table.name,
+                    "watermark": watermark,
+                    "synced_at": datetime.now(),
+                    "rows": rows,
+                },
+            )
+        metrics.increment("citibuy_rows_staged", rows)
+        return SyncResult(
+            table=table.name,
+            rows=rows,
+            incremental=query.whereclause is not None,
+            seconds=time.perf_counter() - start,
+        )
+
+    def _copy_rows(
+        self,
+        staging: Connection,
+        table: sa.Table,
+        query: sa.sql.Select,
+    ) -> int:
+        """Streams the rows returned by the query from the source database
+        and upserts them into the staging table in batches
+        """
+        upsert = sa.insert(table).prefix_with("OR REPLACE")
+        count = 0
+        with self.source.connect() as source:
+            result = source.execution_options(stream_results=True).execute(
+                query
+            )
+            for batch in result.mappings().partitions(self.batch_size):
+                staging.execute(upsert, [dict(row) for row in batch])
+                count += len(batch)
+        return count
+
+    @staticmethod
+    def _watermark(staging: Connection, table_name: str) -> Optional[datetime]:
+        """Returns the latest modified timestamp synced for a table, or None
+        if the table hasn't been synced yet
+        """
+        query = sa.select(sync_state.c.watermark).where(
+            sync_state.c.table_name == table_name
+        )
+        return staging.execute(query).scalar()
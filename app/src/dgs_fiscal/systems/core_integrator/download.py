@@ -0,0 +1,112 @@
+from __future__ import annotations  # prevents NameError for typehints
+import time
+import threading
+from pathlib import Path
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+
+PARTIAL_SUFFIX = ".crdownload"  # suffix Chrome uses for downloads in progress
+# seconds the observer thread blocks between checks for events, which is
+# also how long it takes to stop once the download is complete
+OBSERVER_TIMEOUT = 0.1
+
+
+class DownloadWatcher:
+    """Waits for a browser download to finish using filesystem notifications
+
+    Attributes
+    ----------
+    download_path: Path
+        Path to the location where the downloaded file will be saved
+    download_dir: Path
+        The directory being watched for the download
+    """
+
+    def __init__(self, download_path: Path) -> None:
+        """Inits the DownloadWatcher class"""
+        self.download_path = download_path
+        self.download_dir = download_path.parent
+
+    @property
+    def is_complete(self) -> bool:
+        """Returns True if the file has been downloaded and Chrome is no
+        longer writing to a partial download in the same directory
+        """
+        if not self.download_path.exists():
+            return False
+        partials = self.download_dir.glob(f"*{PARTIAL_SUFFIX}")
+        return next(partials, None) is None
+
+    def wait(self, timeout: float = 60) -> float:
+        """Blocks until the download is complete and returns the elapsed time
+
+        Parameters
+        ----------
+        timeout: float, optional
+            Maximum number of seconds to wait for the download to complete
+
+        Returns
+        -------
+        float
+            The number of seconds spent waiting for the download
+
+        Raises
+        ------
+        FileNotFoundError
+            If the download doesn't complete within the timeout
+        """
+        start = time.perf_counter()
+        if self.is_complete:  # skips starting an observer thread
+            return time.perf_counter() - start
+        done = threading.Event()
+        handler = DownloadHandler(self, done)
+        observer = Observer(timeout=OBSERVER_TIMEOUT)
+        self.download_dir.mkdir(exist_ok=True, parents=True)
+        observer.schedule(handler, str(self.download_dir), recursive=False)
+        observer.start()
+        try:
+            # the download may have finished before the observer started
+            handler.check()
+            if not done.wait(timeout):
+                message = (
+                    f"File not found at '{self.download_path}' "
+                    f"after {timeout} seconds."
+                )
+                raise FileNotFoundError(message)
+            # measured before the observer is stopped, which isn't part of
+            # the time spent waiting for the download
+            elapsed = time.perf_counter() - start
+        finally:
+            observer.stop()
+            observer.join()
+        return elapsed
+
+
+class DownloadHandler(FileSystemEventHandler):
+    """Checks whether a download is complete each time the files in the
+    download directory change
+
+    Attributes
+    ----------
+    watcher: DownloadWatcher
+        The DownloadWatcher used to check whether the download is complete
+    done: threading.Event
+        Event that's set once the download is complete
+    """
+
+    def __init__(self, watcher: DownloadWatcher, done: threading.Event):
+        """Inits the DownloadHandler class"""
+        self.watcher = watcher
+        self.done = done
+
+    def check(self) -> None:
+        """Sets self.done if the download is complete"""
+        if self.watcher.is_complete:
+            self.done.set()
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Re-checks the download on each created, modified, moved, or deleted
+        file in the download directory
+        """
+        self.check()
@@ -1,4 +1,5 @@
 from __future__ import annotations  # prevents NameError for typehints
+import json
 from pathlib import Path
 
 from dynaconf import Dynaconf
@@ -9,6 +10,7 @@ from selenium.webdriver.support import expected_conditions as Expected
 from selenium.common.exceptions import (
     TimeoutException,
     SessionNotCreatedException,
+    WebDriverException,
 )
 
 from dgs_fiscal.config import settings
@@ -21,6 +23,7 @@ class Driver:
         self,
         download_dir: Path,
         config: Dynaconf = settings,
+        headless: bool = None,
     ) -> None:
         """Inits the Driver class with specific download directory
 
@@ -28,18 +31,30 @@ class Driver:
         ----------
         download_dir: Path
             Path to directory where downloads from the browser should be saved
-        driver_path: Path
-            Location where the latest version of chromedriver is downloaded
+        config: Dynaconf, optional
+            Configuration settings with the location of chromedriver and the
+            default value of core_headless
+        headless: bool, optional
+            Whether to run Chrome without a visible browser window. Default is
+            to use the core_headless config setting
         """
         # get path to chromedriver and project root
+        if headless is None:
+            headless = config.get("core_headless", False)
         self.driver_path = Path(config.chrome_driver_path)
         self.download_dir = download_dir
-        self.driver = self.create_driver(self.download_dir, self.driver_path)
+        self.headless = headless
+        self.driver = self.create_driver(
+            self.download_dir,
+            self.driver_path,
+            headless,
+        )
 
     def create_driver(
         self,
         download_dir: Path,
         driver_path: Path,
+        headless: bool = False,
     ) -> webdriver.Chrome:
         """Configures a selenium webdriver with a specific download directory
 
@@ -49,6 +64,8 @@ class Driver:
             Location where the latest version of chromedriver is downloaded
         download_dir: Path
             Path to directory where downloads from the browser should be saved
+        headless: bool, optional
+            Whether to run Chrome without a visible browser window
 
         Returns
         -------
@@ -57,16 +74,7 @@ class Driver:
         """
         # sets default download directory
         download_dir.mkdir(exist_ok=True, parents=True)
-        options = webdriver.ChromeOptions()
-        prefs = {
-            "download.default_directory": str(download_dir),
-            "download.prompt_for_download": False,
-            "download.directory_upgrade": True,
-            "safebrowsing.enabled": True,
-        }
-        options.add_experimental_option("prefs", prefs)
-        # Addresses this issue: https://stackoverflow.com/a/63270005
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
+        options = self.build_options(download_dir, headless)
 
         # creates driver
         if not driver_path.exists():
@@ -77,8 +85,47 @@ class Driver:
         except SessionNotCreatedException as error:
             raise error
 
+        # headless Chrome blocks downloads unless they're explicitly allowed
+        if headless:
+            params = {"behavior": "allow", "downloadPath": str(download_dir)}
+            driver.execute_cdp_cmd("Page.setDownloadBehavior", params)
+
         return driver
 
+    def build_options(
+        self,
+        download_dir: Path,
+        headless: bool = False,
+    ) -> webdriver.ChromeOptions:
+        """Builds the Chrome options used to create the webdriver
+
+        Parameters
+        ----------
+        download_dir: Path
+            Path to directory where downloads from the browser should be saved
+        headless: bool, optional
+            Whether to run Chrome without a visible browser window
+
+        Returns
+        -------
+        webdriver.ChromeOptions
+            The options passed to the Chrome webdriver when it's created
+        """
+        options = webdriver.ChromeOptions()
+        prefs = {
+            "download.default_directory": str(download_dir),
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "safebrowsing.enabled": True,
+        }
+        options.add_experimental_option("prefs", prefs)
+        # Addresses this issue: https://stackoverflow.com/a/63270005
+        options.add_experimental_option("excludeSwitches", ["enable-logging"])
+        if headless:
+            options.add_argument("--headless")
+            options.add_argument("--window-size=1920,1080")
+        return options
+
     def fill_in(self, element_id: str, content: str) -> None:
         """Uses the webdriver to fill in a form field with content
 
@@ -143,6 +190,77 @@ class Driver:
         except TimeoutException as error:
             raise error
 
+    def accept_alert(self, seconds: int = 5) -> None:
+        """Waits for an alert to open then accepts it
+
+        Parameters
+        ----------
+        seconds: int, optional
+            Time to wait for the alert to open before raising an error
+        """
+        try:
+            WebDriverWait(self.driver, seconds).until(
+                Expected.alert_is_present()
+            )
+        except TimeoutException as error:
+            raise error
+        self.driver.switch_to.alert.accept()
+
+    def is_present(self, locator: str, loc_type: str = "id") -> bool:
+        """Checks whether an element is on the current page without waiting
+
+        Parameters
+        ----------
+        locator: str
+            Id or text of the HTML element to look for
+        loc_type: str, optional
+            The type of locator used to find the element. Default is to locate
+            by id but also accepts "link" to locate by link text
+        """
+        if loc_type == "id":
+            elements = self.driver.find_elements_by_id(locator)
+        elif loc_type == "link":
+            elements = self.driver.find_elements_by_partial_link_text(locator)
+        else:
+            raise KeyError("Parameter loc_type must be one of ('id','link')")
+        return len(elements) > 0
+
+    def save_cookies(self, cookie_path: Path) -> None:
+        """Saves the cookies for the current session to a JSON file
+
+        Parameters
+        ----------
+        cookie_path: Path
+            Location of the JSON file where the cookies will be saved
+        """
+        cookie_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(cookie_path, "w", encoding="utf-8") as file:
+            json.dump(self.driver.get_cookies(), file)
+
+    def load_cookies(self, cookie_path: Path) -> bool:
+        """Adds the cookies saved by a previous session to the browser
+
+        The browser must already be on a page from the same domain as the
+        cookies, after which the page needs to be reloaded to use them
+
+        Parameters
+        ----------
+        cookie_path: Path
+            Location of the JSON file where the cookies were saved
+
+        Returns
+        -------
+        bool
+            True if cookies were loaded, False if no saved cookies were found
+        """
+        if not cookie_path.exists():
+            return False
+        with open(cookie_path, encoding="utf-8") as file:
+            cookies = json.load(file)
+        for cookie in cookies:
+            self.driver.add_cookie(cookie)
+        return len(cookies) > 0
+
     def get(self, url) -> None:
         """Loads the webpage for a URL"""
         return self.driver.get(url)
@@ -151,6 +269,17 @@ class Driver:
         """Closes the webdriver"""
         return self.driver.quit()
 
+    @property
+    def is_alive(self) -> bool:
+        """Returns True if the browser session can still be used"""
+        if not self.driver.session_id:
+            return False
+        try:
+            self.driver.current_url  # pylint: disable=pointless-statement
+        except WebDriverException:
+            return False
+        return True
+
     @property
     def current_url(self) -> str:
         """Returns the URL that the webdriver is currently on"""
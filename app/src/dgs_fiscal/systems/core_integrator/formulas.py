@@ -0,0 +1,323 @@
+from __future__ import annotations  # prevents NameError for typehints
+import operator
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.formula import Tokenizer
+from openpyxl.formula.tokenizer import Token
+from openpyxl.worksheet.worksheet import Worksheet
+
+
+class UnsupportedFormula(ValueError):
+    """Raised when a formula uses a function, operator, or reference that
+    FormulaEvaluator doesn't support
+    """
+
+
+class ExcelError(str):
+    """An Excel error value, e.g. #N/A, which propagates through the
+    operators and functions that use it the way it does in Excel
+    """
+
+
+def hyperlink(link: str, friendly_name: Any = None) -> Any:
+    """Returns the value Excel displays for the HYPERLINK() function"""
+    return link if friendly_name is None else friendly_name
+
+
+def concatenate(*args: Any) -> str:
+    """Returns the value of the CONCATENATE() function"""
+    return "".join(to_text(arg) for arg in args)
+
+
+def to_text(value: Any) -> str:
+    """Converts a value to text the way Excel does when concatenating it"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value).upper()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def to_number(value: Any) -> Any:
+    """Converts a value to a number the way Excel does in arithmetic"""
+    if isinstance(value, (ExcelError, int, float)):
+        return value
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return ExcelError("#VALUE!")
+    raise UnsupportedFormula(f"Unsupported operand {value!r}")
+
+
+FUNCTIONS: Dict[str, Callable] = {
+    "HYPERLINK": hyperlink,
+    "CONCATENATE": concatenate,
+}
+# the minimum and maximum number of arguments each function accepts
+ARGUMENTS: Dict[str, Tuple[int, int]] = {
+    "HYPERLINK": (1, 2),
+    "CONCATENATE": (1, 255),
+}
+OPERATORS: Dict[str, Callable] = {
+    "&": lambda a, b: to_text(a) + to_text(b),
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+PRECEDENCE = {"&": 1, "+": 2, "-": 2, "*": 3, "/": 3}
+
+
+class FormulaEvaluator:
+    """Evaluates the formulas in a worksheet without opening Excel
+
+    Only the functions in FUNCTIONS, the operators in OPERATORS, unary
+    minus, error values, and references to single cells (including cells on
+    other worksheets) are supported, which covers the formulas in the
+    reports exported from CoreIntegrator.
+
+    Each formula cell is evaluated once and its value is reused by the
+    formulas that reference it. Formulas that reference a cell that couldn't
+    be evaluated, or that reference themselves through a chain of cells,
+    raise UnsupportedFormula instead of being evaluated.
+
+    Attributes
+    ----------
+    worksheet: Worksheet
+        The openpyxl worksheet whose cell references are used to evaluate
+        formulas
+    values: Dict[Tuple[str, str], Any]
+        The value of each formula cell that's been evaluated, keyed by the
+        title of its worksheet and its coordinate
+    unsupported: Set[Tuple[str, str]]
+        The formula cells that couldn't be evaluated, keyed the same way
+    """
+
+    def __init__(self, worksheet: Worksheet) -> None:
+        """Inits the FormulaEvaluator class"""
+        self.worksheet = worksheet
+        self.values: Dict[Tuple[str, str], Any] = {}
+        self.unsupported: Set[Tuple[str, str]] = set()
+        self._evaluating: Set[Tuple[str, str]] = set()
+
+    def evaluate(self, formula: str) -> Any:
+        """Returns the value of a formula
+
+        Parameters
+        ----------
+        formula: str
+            The formula to evaluate, including the leading "="
+
+        Raises
+        ------
+        UnsupportedFormula
+            If the formula uses a function, operator, or reference that isn't
+            supported
+        """
+        if not isinstance(formula, str):  # e.g. array formulas
+            raise UnsupportedFormula(f"Unsupported formula {formula}")
+        tokens = [
+            token
+            for token in Tokenizer(formula).items
+            if token.type != Token.WSPACE
+        ]
+        try:
+            value, position = self._expression(tokens, 0)
+        except (IndexError, RecursionError) as err:
+            raise UnsupportedFormula(f"Unable to evaluate {formula}") from err
+        if position != len(tokens):
+            raise UnsupportedFormula(f"Unable to evaluate {formula}")
+        return value
+
+    def evaluate_cell(self, worksheet: Worksheet, coordinate: str) -> Any:
+        """Returns the value of a formula cell, evaluating it against its own
+        worksheet the first time it's referenced
+
+        Raises
+        ------
+        UnsupportedFormula
+            If the formula isn't supported, references a cell whose formula
+            isn't supported, or is part of a circular reference
+        """
+        key = (worksheet.title, coordinate)
+        if key in self.values:
+            return self.values[key]
+        if key in self.unsupported:
+            raise UnsupportedFormula(f"Unable to evaluate {coordinate}")
+        if key in self._evaluating:
+            raise UnsupportedFormula(f"Circular reference to {coordinate}")
+        self._evaluating.add(key)
+        current, self.worksheet = self.worksheet, worksheet
+        try:
+            value = self.evaluate(worksheet[coordinate].value)
+        except UnsupportedFormula:
+            self.unsupported.add(key)
+            raise
+        finally:
+            self.worksheet = current
+            self._evaluating.discard(key)
+        self.values[key] = value
+        return value
+
+    def _expression(
+        self,
+        tokens: List[Token],
+        position: int,
+        min_precedence: int = 1,
+    ) -> tuple:
+        """Evaluates operands joined by infix operators, evaluating the
+        operators with a higher precedence first
+        """
+        value, position = self._operand(tokens, position)
+        while position < len(tokens) and tokens[position].type == Token.OP_IN:
+            symbol = tokens[position].value
+            if symbol not in OPERATORS:
+                raise UnsupportedFormula(f"Unsupported operator {symbol}")
+            if PRECEDENCE[symbol] < min_precedence:
+                break
+            right, position = self._expression(
+                tokens, position + 1, PRECEDENCE[symbol] + 1
+            )
+            value = self._apply(symbol, value, right)
+        return value, position
+
+    @staticmethod
+    def _apply(symbol: str, left: Any, right: Any) -> Any:
+        """Applies an infix operator to two operands, returning the Excel
+        error value the operator would return in Excel if it fails
+        """
+        if symbol != "&":
+            left, right = to_number(left), to_number(right)
+        for operand in (left, right):
+            if isinstance(operand, ExcelError):
+                return operand
+        try:
+            return OPERATORS[symbol](left, right)
+        except ZeroDivisionError:
+            return ExcelError("#DIV/0!")
+
+    def _operand(self, tokens: List[Token], position: int) -> tuple:
+        """Evaluates a literal, cell reference, function call, negated
+        operand, or an expression in parentheses
+        """
+        token = tokens[position]
+        if token.type == Token.OP_PRE:
+            value, position = self._operand(tokens, position + 1)
+            if token.value == "-":
+                value = self._apply("-", 0, value)
+            return value, position
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self._function(tokens, position)
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            value, position = self._expression(tokens, position + 1)
+            return value, position + 1  # skips the closing ")"
+        if token.type != Token.OPERAND:
+            raise UnsupportedFormula(f"Unexpected token {token.value}")
+        if token.subtype == Token.TEXT:
+            return token.value[1:-1].replace('""', '"'), position + 1
+        if token.subtype == Token.NUMBER:
+            return float(token.value), position + 1
+        if token.subtype == Token.LOGICAL:
+            return token.value.upper() == "TRUE", position + 1
+        if token.subtype == Token.ERROR:
+            return ExcelError(token.value), position + 1
+        if token.subtype == Token.RANGE:
+            return self.cell_value(token.value), position + 1
+        raise UnsupportedFormula(f"Unsupported operand {token.value}")
+
+    def _function(self, tokens: List[Token], position: int) -> tuple:
+        """Evaluates a function call and each of its arguments"""
+        name = tokens[position].value[:-1].upper()  # strips the "("
+        if name not in FUNCTIONS:
+            raise UnsupportedFormula(f"Unsupported function {name}")
+        args = []
+        position += 1
+        while tokens[position].type != Token.FUNC:  # until the closing ")"
+            arg, position = self._expression(tokens, position)
+            args.append(arg)
+            if tokens[position].type == Token.SEP:
+                position += 1
+        low, high = ARGUMENTS[name]
+        if not low <= len(args) <= high:
+            raise UnsupportedFormula(f"Wrong number of arguments to {name}")
+        for arg in args:
+            if isinstance(arg, ExcelError):
+                return arg, position + 1
+        return FUNCTIONS[name](*args), position + 1
+
+    def cell_value(self, reference: str) -> Any:
+        """Returns the value of a cell, evaluating it if it's a formula
+
+        Parameters
+        ----------
+        reference: str
+            The reference to a single cell, e.g. "$A$2" or "'Sheet 2'!A2"
+        """
+        worksheet = self.worksheet
+        if "!" in reference:
+            sheet, reference = reference.rsplit("!", 1)
+            sheet = sheet.strip("'").replace("''", "'")
+            if sheet not in worksheet.parent.sheetnames:
+                raise UnsupportedFormula(f"Unsupported reference {sheet}")
+            worksheet = worksheet.parent[sheet]
+        if ":" in reference:
+            raise UnsupportedFormula(f"Unsupported range {reference}")
+        cell = worksheet[reference.replace("$", "")]
+        if cell.data_type == "e":
+            return ExcelError(cell.value)
+        if cell.data_type == "f":
+            return self.evaluate_cell(worksheet, cell.coordinate)
+        return cell.value
+
+
+def recalculate(file: Path) -> List[str]:
+    """Replaces each formula in a workbook with its value and saves it so the
+    values can be read by pd.read_excel()
+
+    Formulas that FormulaEvaluator doesn't support, and the formulas that
+    reference them, are replaced with the value cached in the workbook
+    instead, which is blank if the workbook was saved without the values of
+    its formulas
+
+    Parameters
+    ----------
+    file: Path
+        Path to the Excel workbook to recalculate
+
+    Returns
+    -------
+    List[str]
+        The cells whose formulas weren't supported, e.g. ["Sheet1!B2"]
+    """
+    workbook = load_workbook(file)
+    cached = load_workbook(file, data_only=True)
+    evaluator = FormulaEvaluator(workbook.active)
+    formulas = [
+        (worksheet, cell)
+        for worksheet in workbook.worksheets
+        for row in worksheet.iter_rows()
+        for cell in row
+        if cell.data_type == "f"
+    ]
+    # evaluate every formula before any cell is replaced with its value
+    unsupported = []
+    for worksheet, cell in formulas:
+        try:
+            evaluator.evaluate_cell(worksheet, cell.coordinate)
+        except UnsupportedFormula:
+            unsupported.append(f"{worksheet.title}!{cell.coordinate}")
+    for worksheet, cell in formulas:
+        key = (worksheet.title, cell.coordinate)
+        if key in evaluator.values:
+            cell.value = evaluator.values[key]
+        else:
+            cell.value = cached[worksheet.title][cell.coordinate].value
+    workbook.save(file)
+    return unsupported
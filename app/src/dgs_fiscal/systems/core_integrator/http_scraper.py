@@ -0,0 +1,259 @@
+from __future__ import annotations  # prevents NameError for typehints
+import re
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Tuple
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from dynaconf import Dynaconf
+
+from dgs_fiscal.config import settings
+from dgs_fiscal.systems.core_integrator.constants import CORE_ELEMENTS
+
+POSTBACK = re.compile(r"__doPostBack\('([^']*)','([^']*)'\)")
+EXCEL_TYPES = ("application/vnd.", "application/octet-stream")
+
+
+class FormPage:
+    """Parsed ASP.NET page with the form state needed to replay a postback
+
+    Attributes
+    ----------
+    url: str
+        The URL the page was loaded from
+    action: str
+        The absolute URL that the page's form posts back to
+    inputs: Dict[str, dict]
+        The attributes of each input element on the page, keyed by the id of
+        the element or by its name if it doesn't have an id
+    links: List[Tuple[str, str]]
+        The text and href of each link on the page
+    """
+
+    def __init__(self, url: str, html: str) -> None:
+        """Inits the FormPage class by parsing the HTML of the page"""
+        parser = FormParser()
+        parser.feed(html)
+        self.url = url
+        self.action = urljoin(url, parser.action or url)
+        self.inputs = parser.inputs
+        self.links = parser.links
+
+    def field_name(self, element_id: str) -> str:
+        """Returns the name used to post the value of an element by its id
+
+        Raises
+        ------
+        KeyError
+            If no input element on the page has the id that was passed
+        """
+        if element_id not in self.inputs:
+            raise KeyError(f"No element found with the id '{element_id}'")
+        return self.inputs[element_id]["name"]
+
+    def form_data(self) -> dict:
+        """Returns the hidden and text fields that are posted with the form,
+        which includes the ASP.NET __VIEWSTATE and __EVENTVALIDATION
+        """
+        data = {}
+        for attrs in self.inputs.values():
+            if attrs.get("type", "text") in ("hidden", "text", "password"):
+                data[attrs["name"]] = attrs.get("value", "")
+        return data
+
+    def find_link(self, text: str) -> str:
+        """Returns the href of the first link whose text includes the text
+        passed to the method
+
+        Raises
+        ------
+        KeyError
+            If no link on the page includes the text that was passed
+        """
+        for link_text, href in self.links:
+            if text in link_text:
+                return href
+        raise KeyError(f"No link found with the text '{text}'")
+
+
+class FormParser(HTMLParser):
+    """Collects the form action, inputs, and links from an ASP.NET page"""
+
+    def __init__(self) -> None:
+        """Inits the FormParser class"""
+        super().__init__()
+        self.action: str = None
+        self.inputs: Dict[str, dict] = {}
+        self.links: List[Tuple[str, str]] = []
+        self._href: str = None
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        """Records form, input, and link elements as they're parsed"""
+        attrs = dict(attrs)
+        if tag == "form" and self.action is None:
+            self.action = attrs.get("action")
+        elif tag == "input" and attrs.get("name"):
+            self.inputs[attrs.get("id") or attrs["name"]] = attrs
+        elif tag == "a" and attrs.get("href"):
+            self._href = attrs["href"]
+            self._text = []
+
+    def handle_data(self, data: str) -> None:
+        """Collects the text of the link that's currently being parsed"""
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        """Records a link once all of its text has been parsed"""
+        if tag == "a" and self._href is not None:
+            self.links.append(("".join(self._text).strip(), self._href))
+            self._href = None
+
+
+class HttpScraper:
+    """Exports the Prompt Payment report from CoreIntegrator with a plain HTTP
+    session by replaying the ASP.NET postbacks made by the browser
+
+    Attributes
+    ----------
+    elements: dict
+        Dictionary of HTML id tags used to find the form fields and buttons on
+        each page of the CoreIntegrator website
+    session: requests.Session
+        The HTTP session that stores the cookies set by CoreIntegrator
+    timeout: int
+        Number of seconds to wait for each response from CoreIntegrator
+    """
+
+    def __init__(  # pylint: disable=dangerous-default-value
+        self,
+        elements: dict = CORE_ELEMENTS,
+        session: requests.Session = None,
+        timeout: int = 90,
+    ) -> None:
+        """Inits the HttpScraper class"""
+        self.elements = elements
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def export_report(
+        self,
+        file_path: Path,
+        config: Dynaconf = settings,
+        chunk_size: int = 1024 * 64,
+    ) -> Path:
+        """Logs into CoreIntegrator, runs the Prompt Payment report for
+        today's date, and streams the Excel export to file_path
+
+        Parameters
+        ----------
+        file_path: Path
+            Location where the exported report will be saved
+        config: Dynaconf, optional
+            Configuration settings with the URL of and credentials for
+            CoreIntegrator
+        chunk_size: int, optional
+            Number of bytes to write to the file at a time
+
+        Returns
+        -------
+        Path
+            The location where the exported report was saved
+        """
+        page = self._login(config)
+        page = self._access_report(page)
+        response = self._post(page, self._export_data(page), stream=True)
+
+        # write to a partial file so an interrupted export isn't mistaken
+        # for a complete report
+        file_path.parent.mkdir(exist_ok=True, parents=True)
+        partial = file_path.with_name(file_path.name + ".part")
+        with response, open(partial, "wb") as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+        partial.replace(file_path)
+        return file_path
+
+    def _login(self, config: Dynaconf) -> FormPage:
+        """Submits the login form and returns the page that loads after"""
+        page = self._get(config["core_url"])
+        username = page.field_name(self.elements["username box"])
+        password = page.field_name(self.elements["password box"])
+        data = page.form_data()
+        data[username] = config["core_username"]
+        data[password] = config["core_password"]
+        data.update(self._button(page, self.elements["login button"]))
+        page = self._to_page(self._post(page, data))
+        if self.elements["username box"] in page.inputs:
+            raise PermissionError("Failed to log into CoreIntegrator")
+        return page
+
+    def _access_report(self, page: FormPage) -> FormPage:
+        """Opens the Prompt Payment report and runs it for today's date"""
+        # follow the report link, which is either a postback or a url
+        href = page.find_link(self.elements["report name"])
+        postback = POSTBACK.search(href)
+        if postback:
+            data = page.form_data()
+            data["__EVENTTARGET"], data["__EVENTARGUMENT"] = postback.groups()
+            page = self._to_page(self._post(page, data))
+        else:
+            page = self._get(urljoin(page.url, href))
+
+        # enter today's date and click the view report button
+        data = page.form_data()
+        date_field = page.field_name(self.elements["date box"])
+        data[date_field] = date.today().strftime("%m/%d/%Y")
+        data.update(self._button(page, self.elements["view report"]))
+        return self._to_page(self._post(page, data))
+
+    def _export_data(self, page: FormPage) -> dict:
+        """Returns the form data that clicks the export to Excel button"""
+        data = page.form_data()
+        data.update(self._button(page, self.elements["export report"]))
+        return data
+
+    def _button(self, page: FormPage, element_id: str) -> dict:
+        """Returns the form data posted when a button is clicked, image
+        buttons post the coordinates of the click instead of a value
+        """
+        attrs = page.inputs.get(element_id)
+        if attrs is None:
+            raise KeyError(f"No button found with the id '{element_id}'")
+        name = attrs["name"]
+        if attrs.get("type") == "image":
+            return {f"{name}.x": "1", f"{name}.y": "1"}
+        return {name: attrs.get("value", "")}
+
+    def _get(self, url: str) -> FormPage:
+        """Loads a page and parses its form"""
+        response = self.session.get(url, timeout=self.timeout)
+        return self._to_page(response)
+
+    def _post(
+        self,
+        page: FormPage,
+        data: dict,
+        stream: bool = False,
+    ) -> requests.Response:
+        """Posts form data back to the page's form action"""
+        response = self.session.post(
+            page.action,
+            data=data,
+            timeout=self.timeout,
+            stream=stream,
+        )
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if stream and not content_type.startswith(EXCEL_TYPES):
+            response.close()
+            raise ValueError("CoreIntegrator didn't return an Excel export")
+        return response
+
+    def _to_page(self, response: requests.Response) -> FormPage:
+        """Parses the HTML of a response as a FormPage"""
+        response.raise_for_status()
+        return FormPage(response.url, response.text)
@@ -1,10 +1,11 @@
 from __future__ import annotations  # prevents NameError for typehints
 import time
+import warnings
 from datetime import date
 from pathlib import Path
 
 import pandas as pd
-import xlwings as xl
+import requests
 from dynaconf import Dynaconf
 from selenium.common.exceptions import (
     TimeoutException,
@@ -14,6 +15,12 @@ from selenium.common.exceptions import (
 
 from dgs_fiscal.config import settings
 from dgs_fiscal.systems.core_integrator.driver import Driver
+from dgs_fiscal.systems.core_integrator.formulas import recalculate
+from dgs_fiscal.systems.core_integrator.download import (
+    DownloadWatcher,
+    PARTIAL_SUFFIX,
+)
+from dgs_fiscal.systems.core_integrator.http_scraper import HttpScraper
 from dgs_fiscal.systems.core_integrator.constants import CORE_ELEMENTS
 
 
@@ -32,6 +39,11 @@ class CoreIntegrator:
         Path to the location of the report that's downloaded from CoreIntegrator
     file_path: Path
         Path to location of the report after it's been renamed with today's date
+    cookie_path: Path
+        Path to the JSON file where the browser session's cookies are saved so
+        that later runs can skip logging in while the session is still valid
+    download_time: float
+        Number of seconds spent waiting for the last report download to finish
     driver: Driver
         Instance of Driver class used to programmatically interact with the
         CoreIntegrator website and access the Prompt Payment Report
@@ -45,6 +57,12 @@ class CoreIntegrator:
         UnexpectedAlertPresentException,
         SessionNotCreatedException,
     )
+    HTTP_EXCEPTIONS = (
+        KeyError,
+        ValueError,
+        PermissionError,
+        requests.RequestException,
+    )
 
     def __init__(  # pylint: disable=dangerous-default-value
         self,
@@ -63,12 +81,17 @@ class CoreIntegrator:
         self.download_dir = download_dir
         self.download_path = download_dir / download_name
         self.file_path = download_dir / file_name
+        self.cookie_path = archives_dir / "sessions" / "core_integrator.json"
+        self.download_time: float = None
         self.driver: Driver = None
 
     def scrape_report(
         self,
         config: Dynaconf = settings,
         attempts: int = 10,
+        headless: bool = None,
+        reuse_session: bool = None,
+        backend: str = None,
     ) -> pd.DataFrame:
         """Scrapes and downloads the Prompt Payment report from CoreIntegrator
         then loads it as a dataframe
@@ -81,36 +104,124 @@ class CoreIntegrator:
         attempts: int, optional
             The number of times to attempt scraping the report, if it doesn't
             execute successfully the first time
+        headless: bool, optional
+            Whether to run Chrome without a visible browser window. Default is
+            to use the core_headless config setting
+        reuse_session: bool, optional
+            Whether to keep a single browser open across attempts and reuse
+            the cookies saved by a previous run to skip logging in. Default is
+            to use the core_reuse_session config setting
+        backend: str, optional
+            Either "browser" to scrape the report with Chrome or "http" to
+            export it with HttpScraper, which doesn't need chromedriver.
+            Default is to use the core_backend config setting
 
         Returns
         -------
         pd.DataFrame
             The scraped Prompt Payment report loaded as a pandas dataframe
         """
+        backend = backend or config.get("core_backend", "browser")
+        if backend == "http":
+            return self._export_report(config, attempts)
+        if backend != "browser":
+            raise ValueError(
+                "Parameter backend must be one of ('browser','http')"
+            )
+        if headless is None:
+            headless = config.get("core_headless", False)
+        if reuse_session is None:
+            reuse_session = config.get("core_reuse_session", False)
+
         # try to scrape the report
+        try:
+            for _ in range(attempts):
+                try:
+                    self._start_session(config, headless, reuse_session)
+                    self._login(config, reuse_session)
+                    self._access_report()
+                    self._rename_download()
+                    assert self.file_path.exists()
+                    if reuse_session:
+                        self.driver.save_cookies(self.cookie_path)
+                    return self.file_path
+                except self.EXCEPTIONS as e:
+                    error = e
+                finally:
+                    # close the browser unless it's reused on the next attempt
+                    if not reuse_session:
+                        self.close()
+            raise error
+        finally:
+            self.close()
+
+    def _export_report(self, config: Dynaconf, attempts: int) -> Path:
+        """Exports the Prompt Payment report with HttpScraper instead of
+        scraping it with the browser
+
+        Parameters
+        ----------
+        config: Dynaconf
+            The configuration settings with the URL of and credentials for
+            CoreIntegrator
+        attempts: int
+            The number of times to attempt exporting the report
+
+        Returns
+        -------
+        Path
+            The location of the report exported from CoreIntegrator
+        """
         for _ in range(attempts):
             try:
-                self.driver = Driver(self.download_dir, config)
-                self._login(config)
-                self._access_report()
-                self._rename_download()
-                assert self.file_path.exists()
+                start = time.perf_counter()
+                HttpScraper(self.elements).export_report(
+                    self.file_path, config
+                )
+                self.download_time = time.perf_counter() - start
                 return self.file_path
-            except self.EXCEPTIONS as e:
+            except self.HTTP_EXCEPTIONS as e:
                 error = e
-            finally:
-                # close the browser if it's still open
-                if self.driver.driver.session_id:
-                    self.driver.quit()
         raise error
 
-    def _login(self, config: Dynaconf) -> None:
+    def close(self) -> None:
+        """Closes the browser if it's still open"""
+        if self.driver and self.driver.driver.session_id:
+            self.driver.quit()
+        self.driver = None
+
+    def _start_session(
+        self,
+        config: Dynaconf,
+        headless: bool,
+        reuse_session: bool,
+    ) -> None:
+        """Opens a new browser unless the current one can be reused
+
+        Parameters
+        ----------
+        config: Dynaconf
+            The configuration settings used to create the Driver
+        headless: bool
+            Whether to run Chrome without a visible browser window
+        reuse_session: bool
+            Whether an open browser from a previous attempt should be reused
+        """
+        if reuse_session and self.driver and self.driver.is_alive:
+            return
+        self.close()
+        self.driver = Driver(self.download_dir, config, headless=headless)
+
+    def _login(self, config: Dynaconf, reuse_session: bool = False) -> None:
         """Logs into the CoreIntegrator website to initiate scraping
 
         Parameters
         ----------
         config: Dynaconf
             Configuration settings that contain credentials to CoreIntegrator
+        reuse_session: bool, optional
+            Whether to skip the login form if the browser is still logged in,
+            either from a previous attempt or from the saved session cookies
         """
         # rename attributes and config vars for ease
         driver = self.driver
@@ -118,9 +229,19 @@ class CoreIntegrator:
         username_field = elements["username box"]
         password_field = elements["password box"]
         login_button = elements["login button"]
+        report_link = elements["report name"]
 
-        # load CoreIntegrator site and enter credentials
+        # load CoreIntegrator site and skip login if the session is valid
         driver.get(config["core_url"])
+        if reuse_session:
+            if driver.is_present(report_link, loc_type="link"):
+                return
+            if driver.load_cookies(self.cookie_path):
+                driver.get(config["core_url"])
+                if driver.is_present(report_link, loc_type="link"):
+                    return
+
+        # enter credentials
         driver.wait_to_load(username_field, seconds=5)
         driver.fill_in(username_field, config["core_username"])
         driver.fill_in(password_field, config["core_password"])
@@ -158,46 +279,54 @@ class CoreIntegrator:
         driver.wait_to_load(view_report)
         driver.click(view_report)
 
-        # export report
+        # export report, removing downloads left over from earlier attempts
+        self._clear_downloads()
         driver.wait_to_load(export_report, seconds=90)
         driver.click(export_report)
 
         # accept the dialog box to tigger the download
-        time.sleep(1)
-        driver.driver.switch_to.alert.accept()
+        driver.accept_alert()
+
+    def _clear_downloads(self) -> None:
+        """Removes the report and any partial downloads left in the download
+        directory so they aren't mistaken for the new download
+        """
+        if self.download_path.exists():
+            self.download_path.unlink()
+        for partial in self.download_dir.glob(f"*{PARTIAL_SUFFIX}"):
+            partial.unlink()
 
-    def _rename_download(self, attempts: int = 60) -> None:
-        """Confirms report was downloaded and renames it
+    def _rename_download(self, timeout: int = 60) -> None:
+        """Waits for the report to finish downloading and renames it
 
         Parameters
         ----------
-        attempts: int, optional
-            Number of attempts to check for the downloaded report. Default is
-            to attempt once per second for 60 seconds.
+        timeout: int, optional
+            Maximum number of seconds to wait for the report to download.
+            Default is to wait for 60 seconds.
         """
-        # set local vars for ease
-        download_path = self.download_path
-        renamed_path = self.file_path
-        # try to locate the download for given number of attempts
-        counter = 0
-        while not download_path.exists():
-            counter += 1
-            time.sleep(1)
-            if counter > attempts:
-                message = (
-                    f"File not found at '{download_path}' "
-                    f"after {counter} seconds."
-                )
-                raise FileNotFoundError(message)
+        # wait for Chrome to finish writing the download
+        watcher = DownloadWatcher(self.download_path)
+        self.download_time = watcher.wait(timeout)
         # rename downloaded file
-        download_path.replace(renamed_path)
+        self.download_path.replace(self.file_path)
 
-    def load_report(self) -> pd.DataFrame:
-        """Opens and resaves the downloaded report to trigger calculations
+    def load_report(self, engine: str = "python") -> pd.DataFrame:
+        """Calculates the formulas in the downloaded report and reads it in
 
-        Automates the opening and saving of an excel workbook before reading it
-        in through pd.read_excel, which addresses the NaN issue described in
-        this post: https://stackoverflow.com/a/41730454/7338319
+        The report is exported without the cached values of its formulas, so
+        they have to be calculated before the report is read in through
+        pd.read_excel, which addresses the NaN issue described in this post:
+        https://stackoverflow.com/a/41730454/7338319
+
+        Parameters
+        ----------
+        engine: str, optional
+            The engine used to calculate the formulas. "python" evaluates them
+            in-process with openpyxl and "excel" opens and resaves the report
+            in Excel through xlwings, which requires Excel to be installed.
+            Formulas the "python" engine doesn't support keep the value cached
+            in the report and are reported with a warning
 
         Returns
         -------
@@ -208,11 +337,27 @@ class CoreIntegrator:
         file = self.file_path
         if not file.exists():
             raise FileNotFoundError(f"Report wasn't found at location: {file}")
-        # open and save the wb to trigger formulas
+        # calculate the formulas and save their values to the workbook
+        if engine == "python":
+            unsupported = recalculate(file)
+            if unsupported:
+                warnings.warn(
+                    "Used the cached values of unsupported formulas in "
+                    f"{', '.join(unsupported)}"
+                )
+        elif engine == "excel":
+            self._recalculate_excel(file)
+        else:
+            raise ValueError(f"Unknown engine '{engine}'")
+        # read the excel into a dataframe
+        return pd.read_excel(file, engine="openpyxl")
+
+    def _recalculate_excel(self, file: Path) -> None:
+        """Opens and resaves the report in Excel to trigger its formulas"""
+        import xlwings as xl  # pylint: disable=import-outside-toplevel
+
         app = xl.App(visible=False)
         book = app.books.open(file)
         book.save()
         book.close()
         app.kill()
-        # read the excel into a dataframe
-        return pd.read_excel(file, engine="openpyxl")
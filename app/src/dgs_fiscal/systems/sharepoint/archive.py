@@ -1,8 +1,22 @@
+from typing import Iterable, List
 from pathlib import Path
 
 import pandas as pd
+import xlsxwriter
 from O365.drive import Folder, File
 
+from dgs_fiscal.metrics import metrics
+
+# header and banded row colors of Table Style Medium 9, which is the default
+# style of tables added by xlsxwriter
+HEADER_FORMAT = {"bold": True, "font_color": "#FFFFFF", "bg_color": "#4472C4"}
+BAND_FORMAT = {"bg_color": "#D9E1F2"}
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"  # matches the format used by pandas
+SIDE_EXPORTS = {
+    "csv": lambda df, file: df.to_csv(file, index=False),
+    "parquet": lambda df, file: df.to_parquet(file, index=False),
+}
+
 
 class ArchiveFolder:
     """Creates an API client for the Archive folder in the DGS Fiscal site
@@ -16,8 +30,9 @@ class ArchiveFolder:
     tmp_dir: Path
         A temporary directory in the archive directory used for downloading and
         manipulating files
-    sub_folders: List[Folder]
-        A list of instances of O365.Folder for each sub-folder in the Archive
+    subfolders: List[Folder]
+        A list of instances of O365.Folder for each sub-folder in the Archive,
+        which is retrieved from SharePoint the first time it's accessed
     """
 
     def __init__(self, folder: Folder, archive_dir: Path = None) -> None:
@@ -25,13 +40,22 @@ class ArchiveFolder:
         self.folder = folder
         self.archive_dir = archive_dir or (Path.cwd() / "archives")
         self.tmp_dir = self.archive_dir / "tmp"
-        self.subfolders = list(self.folder.get_child_folders())
         self.tmp_dir.mkdir(exist_ok=True, parents=True)
+        self._subfolders = None
+
+    @property
+    def subfolders(self) -> List[Folder]:
+        """Returns the sub-folders in the Archive, listing them on first use"""
+        if self._subfolders is None:
+            self._subfolders = list(self.folder.get_child_folders())
+        return self._subfolders
 
     def export_dataframe(
         self,
         df: pd.DataFrame,
         file_name: str,
+        constant_memory: bool = False,
+        side_exports: Iterable[str] = (),
     ) -> Path:
         """Export dataframe to Excel in local archive for upload to SharePoint
         and styles the data as a table
@@ -42,6 +66,13 @@ class ArchiveFolder:
             The dataframe to export to Excel
         file_name: str
             File name to save to save the exported dataframe under
+        constant_memory: bool, optional
+            Streams the rows to the file instead of holding the whole sheet in
+            memory, which is slower but keeps memory flat for large exports.
+            Default is False
+        side_exports: Iterable[str], optional
+            Additional formats, either "csv" or "parquet", to save the
+            dataframe as next to the Excel file. Default is no side exports
 
         Returns
         -------
@@ -51,6 +82,21 @@ class ArchiveFolder:
         # set the export location to local tmp_dir
         file = self.tmp_dir / file_name
 
+        # write the data to Excel as a table
+        if constant_memory:
+            self._stream_dataframe(df, file)
+        else:
+            self._write_dataframe(df, file)
+
+        # save a copy of the data in each of the side export formats
+        for file_format in side_exports:
+            if file_format not in SIDE_EXPORTS:
+                raise ValueError(f"Unsupported export format '{file_format}'")
+            SIDE_EXPORTS[file_format](df, file.with_suffix(f".{file_format}"))
+        return file
+
+    def _write_dataframe(self, df: pd.DataFrame, file: Path) -> None:
+        """Writes the dataframe to Excel in memory and formats it as a table"""
         # write the data to Excel and get the worksheet using XlsxWriter
         writer = pd.ExcelWriter(  # pylint: disable=abstract-class-instantiated
             file, engine="xlsxwriter"
@@ -64,9 +110,53 @@ class ArchiveFolder:
         worksheet.add_table(0, 0, max_row, max_col - 1, {"columns": columns})
         worksheet.set_column(0, max_col - 1, 12)
 
-        # save the file and return the path
+        # save the file
         writer.save()
-        return file
+
+    def _stream_dataframe(
+        self,
+        df: pd.DataFrame,
+        file: Path,
+        chunk_size: int = 10_000,
+    ) -> None:
+        """Writes the dataframe to Excel row by row in xlsxwriter's
+        constant_memory mode, which flushes each row to disk once the next
+        row is written
+
+        Tables aren't supported in constant_memory mode, so the table style is
+        recreated with a header format, banded rows, and an autofilter
+        """
+        options = {
+            "constant_memory": True,
+            "default_date_format": DATETIME_FORMAT,
+            "remove_timezone": True,
+        }
+        with xlsxwriter.Workbook(file, options) as workbook:
+            worksheet = workbook.add_worksheet("Sheet1")
+            (max_row, max_col) = df.shape
+            header = workbook.add_format(HEADER_FORMAT)
+            worksheet.write_row(0, 0, [str(col) for col in df.columns], header)
+
+            # write the rows in order, converting one chunk at a time so
+            # missing values are written as blank cells
+            for start in range(0, max_row, chunk_size):
+                chunk = df.iloc[start : start + chunk_size].astype(object)
+                chunk = chunk.where(chunk.notna(), None)
+                rows = chunk.itertuples(index=False, name=None)
+                for row_num, row in enumerate(rows, start=start + 1):
+                    worksheet.write_row(row_num, 0, row)
+
+            # style the data like a table and adjust col width
+            if max_row:
+                band = {
+                    "type": "formula",
+                    "criteria": "=MOD(ROW(),2)=0",
+                    "format": workbook.add_format(BAND_FORMAT),
+                }
+                worksheet.conditional_format(1, 0, max_row, max_col - 1, band)
+            worksheet.autofilter(0, 0, max_row, max_col - 1)
+            worksheet.freeze_panes(1, 0)
+            worksheet.set_column(0, max_col - 1, 12)
 
     def upload_file(
         self,
@@ -92,6 +182,10 @@ class ArchiveFolder:
         # upload file
         folder = self.get_subfolder_by_name(folder_name)
         file = folder.upload_file(local_path, file_name)
+        metrics.increment("graph_requests")
+        metrics.increment(
+            "sharepoint_bytes_uploaded", local_path.stat().st_size
+        )
         return file
 
     def download_file(
@@ -125,6 +219,8 @@ class ArchiveFolder:
         else:
             download_path = download_dir / file.name
         file.download(download_dir, download_name)
+        metrics.increment("graph_requests")
+        metrics.increment("sharepoint_bytes_downloaded", file.size)
         return download_path
 
     def read_excel(self, file: File) -> pd.DataFrame:
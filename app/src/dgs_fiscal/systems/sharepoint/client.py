@@ -23,7 +23,8 @@ class SharePoint:
     config: Dynaconf
         Configuration settings used to authenticate the client
     account: Account
-        Instance of O365.Account that manages authentication with Graph API
+        Instance of O365.Account that manages authentication with Graph API,
+        which is created from the config settings unless one is passed
     app: Sharepoint
         Instance of O365.Sharepoint that organizes other SharePoint classes
     site: Site
@@ -31,10 +32,10 @@ class SharePoint:
         Graph API resource
     """
 
-    def __init__(self, config: Dynaconf = settings):
+    def __init__(self, config: Dynaconf = settings, account: Account = None):
         """Instantiates the Client class"""
         self.config: Dynaconf = config
-        self.account: Account = authenticate_account(config)
+        self.account: Account = account or authenticate_account(config)
         self.app: Sharepoint = self.account.sharepoint()
         self.site: Site = self.app.get_site(self.config.site_id)
         self.drive: Drive = None
@@ -85,4 +86,4 @@ class SharePoint:
             Columns that are indexed for querying data
         """
         site_list = self.site.get_list_by_name(list_name)
-        return SiteList(site_list, key=index_cols)
+        return SiteList(site_list, key=index_cols, config=self.config)
@@ -1,12 +1,22 @@
 from __future__ import annotations  # prevents NameError for typehints
-from typing import Dict, List, Iterable, Any, Optional
+import time
+from typing import Dict, List, Iterable, Iterator, Any, Optional
 from dataclasses import dataclass, field
 
 import pandas as pd
+from dynaconf import Dynaconf
 from more_itertools import chunked
 from O365.sharepoint import SharepointList, SharepointListItem
+from O365.utils import NEXT_LINK_KEYWORD
 
-from dgs_fiscal.systems.sharepoint.utils import build_filter_str, col_api_name
+from dgs_fiscal.config import settings
+from dgs_fiscal.metrics import metrics
+from dgs_fiscal.systems.sharepoint.utils import (
+    build_filter_str,
+    col_api_name,
+    retry_delay,
+    serialize_value,
+)
 
 
 @dataclass
@@ -57,12 +67,21 @@ class SiteList:
     items: dict[InvoiceItem]
         A dictionary of the items in SharePoint list instantiated as members
         of the InvoiceItem class and keyed by the columns in self.key
+    config: Dynaconf
+        Configuration settings used to look up how many times throttled batch
+        requests are retried
     """
 
-    def __init__(self, site_list: SharepointList, key: list = None) -> None:
+    def __init__(
+        self,
+        site_list: SharepointList,
+        key: list = None,
+        config: Dynaconf = settings,
+    ) -> None:
         """Instantiates the SiteList class"""
         self.list = site_list
         self.key = key
+        self.config = config
 
     @property
     def columns(self) -> dict:
@@ -73,9 +92,13 @@ class SiteList:
         self,
         fields: Iterable = None,
         query: Dict[str, tuple] = None,
-    ) -> List[SharepointListItem]:
-        """Gets items from the SharePoint List and returns a list of
-        SharepointListItem instances
+    ) -> ItemCollection:
+        """Gets items from the SharePoint List and returns them as an
+        ItemCollection of read-only ListItem instances
+
+        The items are built directly from the JSON returned by Graph API,
+        storing only the id, eTag, and field values of each item, instead of
+        instantiating an O365.SharepointListItem for every item in the list
 
         Parameters
         ----------
@@ -88,20 +111,41 @@ class SiteList:
 
         Returns
         -------
-        List[SharepointListItem]
-            A list of items from the SharePoint list instantiated as members
-            of the o365.SharepointListItem class
+        ItemCollection
+            A collection of the items from the SharePoint list instantiated
+            as members of the ListItem class
         """
         # query invoice records from SharePoint
         fields = fields or self.columns.keys()
+        params = {
+            "$top": self.list.protocol.max_top_value,
+            "expand": self.list.build_field_filter(list(fields)),
+        }
         if query:
-            query = build_filter_str(self.columns, query)
-        results = self.list.get_items(query=query, expand_fields=list(fields))
-        if not results:
+            params["$filter"] = build_filter_str(self.columns, query)
+        items = [
+            ListItem.from_json(self, data)
+            for data in self._iter_pages(self.list.build_url("/items"), params)
+        ]
+        if not items:
             raise ValueError("No matching item found for that query")
-        items = [ListItem(self, item) for item in results]
         return ItemCollection(self, items, fields)
 
+    def _iter_pages(self, url: str, params: dict) -> Iterator[dict]:
+        """Yields the JSON of each item returned by a Graph API request,
+        following the next link until every page has been returned
+        """
+        response = self.list.con.get(url, params=params)
+        metrics.increment("graph_requests")
+        while response:
+            data = response.json()
+            yield from data.get("value", [])
+            next_link = data.get(NEXT_LINK_KEYWORD)
+            if not next_link:
+                break
+            response = self.list.con.get(next_link)
+            metrics.increment("graph_requests")
+
     def get_item_by_key(self, key: dict, fields: Iterable = None) -> ListItem:
         """Returns a single list item that matches the values passed to the key
 
@@ -140,7 +184,8 @@ class SiteList:
         """
         data = self._format_request_data(data)
         item = self.list.create_list_item(data)
-        return ListItem(self, item)
+        metrics.increment("graph_requests")
+        return ListItem.from_o365(self, item)
 
     def batch_upsert(self, changes: BatchedChanges) -> dict:
         """Submits batch requests to update or insert list items
@@ -187,9 +232,9 @@ class SiteList:
         Returns
         -------
         dict
-            Returns a JSON of the response returned by the batch request
+            Returns a JSON of the response returned by the batch request, with
+            the responses to each request in the order they were made
         """
-        batch_url = "https://graph.microsoft.com/v1.0/$batch"
         base_url = self.list.main_resource
         counter = 0
         requests = []
@@ -211,12 +256,51 @@ class SiteList:
             }
             requests.append(request)
 
-        response = self.list.con.post(batch_url, {"requests": requests})
-        return response.json()
+        return self._post_batch(requests)
+
+    def _post_batch(self, requests: List[dict]) -> dict:
+        """Posts a batch request and resends the requests that were throttled
+
+        Graph API throttles each request in a batch separately, returning a
+        429 status for the requests that should be retried after waiting for
+        the number of seconds in their Retry-After header. Those requests are
+        resent up to graph_batch_retries times before their 429 responses are
+        returned with the rest of the batch. If the header is missing or isn't
+        a number of seconds or an HTTP-date, the delay doubles on each retry.
+        """
+        batch_url = "https://graph.microsoft.com/v1.0/$batch"
+        retries = self.config.get("graph_batch_retries", 3)
+        responses = {}
+        pending = requests
+        wait = 0
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(wait)
+                metrics.increment("graph_batch_retries", len(pending))
+            response = self.list.con.post(batch_url, {"requests": pending})
+            metrics.increment("graph_requests")
+            throttled = []
+            wait = 0
+            for res in response.json()["responses"]:
+                responses[res["id"]] = res
+                if res["status"] == 429:
+                    headers = res.get("headers", {})
+                    delay = retry_delay(headers.get("Retry-After"), attempt)
+                    wait = max(wait, delay)
+                    throttled.append(res["id"])
+            pending = [req for req in pending if req["id"] in throttled]
+            if not pending:
+                break
+        return {"responses": [responses[req["id"]] for req in requests]}
 
     def _format_request_data(self, data) -> dict:
-        """Get the API col name for each column in the request data"""
-        return {col_api_name(self.columns, k): v for k, v in data.items()}
+        """Get the API col name for each column in the request data and
+        serialize its value with serialize_value()
+        """
+        return {
+            col_api_name(self.columns, k): serialize_value(v)
+            for k, v in data.items()
+        }
 
 
 class ItemCollection:
@@ -233,6 +317,8 @@ class ItemCollection:
         A list of the fields that were returned for each item in the collection
     """
 
+    __slots__ = ("items", "list", "columns")
+
     def __init__(
         self,
         site_list: SiteList,
@@ -297,38 +383,69 @@ class ItemCollection:
 
 
 class ListItem:
-    """Creates an API client for making calls to the SharePoint list item
+    """A read-only representation of a SharePoint list item that can be
+    promoted to an O365.SharepointListItem to make calls to the API
 
     Attributes
     ----------
     parent: Type[SiteList]
         An instance of the SiteList sub-class that this item belongs to
-    item: o365.SharepointListItem
-        An instance of the O365.SharepointListItem class that manages calls to
-        the ListItems resource in Graph API
+    id: str
+        The SharePoint id for this list item
+    fields: dict
+        The fields associated with this list item
+    etag: str, optional
+        The eTag of the list item when it was retrieved
     """
 
+    __slots__ = ("parent", "id", "fields", "etag", "_item")
+
     def __init__(
         self,
         parent: SiteList,
-        item: SharepointListItem,
+        item_id: str,
+        fields: dict,
+        etag: str = None,
+        item: SharepointListItem = None,
     ) -> None:
         """Instantiates the ListItem class"""
         self.parent = parent
-        self.item = item
-
-    @property
-    def fields(self) -> dict:
-        """Returns the fields associated with this list item"""
-        return self.item.fields
+        self.id = item_id
+        self.fields = fields
+        self.etag = etag
+        self._item = item
+
+    @classmethod
+    def from_json(cls, parent: SiteList, data: dict) -> ListItem:
+        """Creates a ListItem from the JSON of an item returned by Graph API"""
+        return cls(
+            parent,
+            item_id=data.get("id"),
+            fields=data.get("fields") or {},
+            etag=data.get("eTag"),
+        )
+
+    @classmethod
+    def from_o365(cls, parent: SiteList, item: SharepointListItem) -> ListItem:
+        """Creates a ListItem from an instance of O365.SharepointListItem"""
+        return cls(parent, item.object_id, item.fields or {}, item=item)
 
     @property
-    def id(self) -> dict:
-        """Returns the SharePoint id for this list item"""
-        return self.item.object_id
+    def item(self) -> SharepointListItem:
+        """Returns the O365.SharepointListItem for this list item, which
+        manages calls to the ListItems resource in Graph API, creating it from
+        the item's id and fields on first access
+        """
+        if self._item is None:
+            site_list = self.parent.list
+            key = site_list._cloud_data_key  # pylint: disable=protected-access
+            data = {"id": self.id, "eTag": self.etag, "fields": self.fields}
+            self._item = SharepointListItem(parent=site_list, **{key: data})
+        return self._item
 
     def update(self, data: dict) -> None:
-        """Updates the list item in SharePoint
+        """Updates the list item in SharePoint, promoting it to an
+        O365.SharepointListItem if it was returned by SiteList.get_items()
 
         Parameters
         ----------
@@ -337,7 +454,10 @@ class ListItem:
         """
         # gets api name for each field in update data
         cols = self.parent.columns
-        data = {col_api_name(cols, col): val for col, val in data.items()}
+        data = {
+            col_api_name(cols, col): serialize_value(val)
+            for col, val in data.items()
+        }
         # adds field to self.fields to avoid update error
         for col in data:
             if col not in self.fields:
@@ -346,6 +466,7 @@ class ListItem:
         # update and save field
         self.item.update_fields(data)
         self.item.save_updates()
+        metrics.increment("graph_requests")
 
     def get_val(self, column) -> Any:
         """Returns the value of an item's field"""
@@ -1,6 +1,12 @@
 from __future__ import annotations  # prevents NameError for typehints
+import math
 import re
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
 
+import numpy as np
+import pandas as pd
 from dynaconf import Dynaconf
 from O365 import Account
 
@@ -16,6 +22,8 @@ QUERY_MAPPING = {
     "starts with": ("function", "startsWith"),
     "ends with": ("function", "endsWith"),
 }
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+RETRY_BACKOFF = 1.0
 
 
 def authenticate_account(config: Dynaconf) -> Account:
@@ -129,3 +137,70 @@ def build_filter_str(columns: dict, query_dict: dict) -> str:
         query_str = filters[0]
 
     return query_str
+
+
+def serialize_value(value: Any) -> Any:
+    """Converts a value from a dataframe to a type that can be serialized in
+    the JSON body of a Graph API request
+
+    Values are converted when each request is built, so only the rows that
+    are sent to SharePoint are serialized instead of every row in the
+    dataframe
+
+    Parameters
+    ----------
+    value: Any
+        The value of a field in a list item
+
+    Returns
+    -------
+    Any
+        Dates and datetimes as ISO strings, missing values (None, NaN, and
+        NaT) as None, numpy scalars as the equivalent Python type, and all
+        other values unchanged
+    """
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)  # np.datetime64("NaT") becomes pd.NaT
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, date):  # includes datetime and pd.Timestamp
+        return value.strftime(ISO_FORMAT)
+    return value
+
+
+def retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Returns the number of seconds to wait before resending a throttled
+    request, based on the value of its Retry-After header
+
+    Parameters
+    ----------
+    retry_after: str, optional
+        The value of the Retry-After header, which is either a whole number
+        of seconds or an HTTP-date, or None if the header wasn't sent
+    attempt: int
+        The number of times the request has already been resent, which sets
+        the exponential delay used when the header can't be parsed
+
+    Returns
+    -------
+    float
+        The number of seconds in the header, the seconds until the date in
+        the header, or RETRY_BACKOFF * 2 ** attempt if the header is missing
+        or is neither of those
+    """
+    value = str(retry_after or "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        retry_at = None
+    if retry_at is None:
+        return RETRY_BACKOFF * 2**attempt
+    if retry_at.tzinfo is None:  # -0000 dates are parsed as naive UTC
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
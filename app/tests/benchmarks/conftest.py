@@ -0,0 +1,14 @@
+import pytest
+
+from tests.benchmarks.utils import SCALES
+from tests.utils.synthetic_data import create_synthetic_db
+
+
+@pytest.fixture(scope="session", params=SCALES, name="synthetic_db")
+def fixture_synthetic_db(request, tmp_path_factory):
+    """Creates a local CitiBuy database with synthetic data for each of the
+    benchmark scales and returns the number of rows and the connection url
+    """
+    rows = request.param
+    db_path = tmp_path_factory.mktemp("benchmarks") / f"citibuy_{rows}.db"
+    return rows, create_synthetic_db(f"sqlite:///{db_path}", rows)
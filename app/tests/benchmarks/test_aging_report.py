@@ -0,0 +1,30 @@
+"""Benchmarks the Aging Report queries against a synthetic CitiBuy database
+
+Run with: pytest tests/benchmarks -s
+"""
+from dgs_fiscal.etl import AgingReport
+from tests.benchmarks.utils import measure
+
+
+def test_get_citibuy_data(synthetic_db):
+    """Measures AgingReport.get_citibuy_data() at each benchmark scale"""
+    # setup
+    rows, conn_url = synthetic_db
+    aging = AgingReport(citibuy_url=conn_url)
+    # execution
+    with measure(f"get_citibuy_data() with {rows} invoices"):
+        df = aging.get_citibuy_data(invoice_window=365)
+    # validation
+    assert 0 < len(df) <= rows
+
+
+def test_get_receipt_queue(synthetic_db):
+    """Measures AgingReport.get_receipt_queue() at each benchmark scale"""
+    # setup
+    rows, conn_url = synthetic_db
+    aging = AgingReport(citibuy_url=conn_url)
+    # execution
+    with measure(f"get_receipt_queue() with {rows} receipts"):
+        df = aging.get_receipt_queue(receipt_window=365)
+    # validation
+    assert 0 < len(df) <= rows
@@ -0,0 +1,53 @@
+"""Benchmarks SiteList.batch_upsert() against the in-process stand-in for
+Graph API, which measures the overhead of building the batch requests
+
+Run with: pytest tests/benchmarks -s
+"""
+import pytest
+
+from dgs_fiscal.systems.sharepoint import BatchedChanges
+from tests.benchmarks.utils import SCALES, measure
+from tests.utils.mock_graph import MockGraph
+
+
+@pytest.mark.parametrize("rows", SCALES)
+def test_batch_upsert(rows):
+    """Measures batch_upsert() when half of the items are updated and half
+    are inserted
+    """
+    # setup
+    items = [{"Title": f"P{i}", "Status": "Sent"} for i in range(rows // 2)]
+    graph = MockGraph(items=items)
+    site_list = graph.site_list()
+    updates = {str(i + 1): {"Status": "Paid"} for i in range(rows // 2)}
+    inserts = [
+        {"Title": f"P{i}", "Status": "Sent", "Amount": float(i)}
+        for i in range(rows // 2, rows)
+    ]
+    changes = BatchedChanges(updates=updates, inserts=inserts)
+    # execution
+    with measure(f"batch_upsert() with {rows} items"):
+        results = site_list.batch_upsert(changes)
+    # validation
+    assert sum(len(batch) for batch in results.updates) == len(updates)
+    assert sum(len(batch) for batch in results.inserts) == len(inserts)
+    assert len(graph.items) == rows
+
+
+@pytest.mark.parametrize("rows", SCALES)
+def test_throttled_batch_upsert(rows):
+    """Measures batch_upsert() when each request takes a millisecond and a
+    tenth of the requests in each batch are throttled and resent
+    """
+    # setup
+    graph = MockGraph(latency=0.001, throttle=0.1)
+    site_list = graph.site_list()
+    inserts = [{"Title": f"P{i}", "Status": "Sent"} for i in range(rows)]
+    changes = BatchedChanges(inserts=inserts)
+    # execution
+    with measure(f"throttled batch_upsert() with {rows} items"):
+        results = site_list.batch_upsert(changes)
+    # validation
+    statuses = [res["status"] for batch in results.inserts for res in batch]
+    assert len(statuses) == rows
+    assert len(graph.items) == statuses.count(201)
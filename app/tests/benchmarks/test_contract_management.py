@@ -0,0 +1,49 @@
+"""Benchmarks the Contract Management workflow against a synthetic CitiBuy
+database
+
+Run with: pytest tests/benchmarks -s
+"""
+import pytest
+
+from dgs_fiscal.etl import ContractManagement
+from tests.benchmarks.utils import SCALES, measure
+
+
+def test_get_citibuy_data(synthetic_db):
+    """Measures ContractManagement.get_citibuy_data() at each benchmark scale,
+    which is capped by the limit on the number of POs that are queried
+    """
+    # setup
+    rows, conn_url = synthetic_db
+    contract = ContractManagement(citibuy_url=conn_url)
+    # execution
+    with measure(f"get_citibuy_data() with {rows} POs"):
+        output = contract.get_citibuy_data()
+    # validation
+    assert 0 < len(output.po) <= rows
+
+
+@pytest.mark.parametrize("rows", SCALES)
+def test_detect_changes(rows):
+    """Measures ContractManagement._detect_changes() when 10% of the items
+    have changed and 5% are new
+    """
+    # setup
+    old = [
+        {"id": str(i), "Title": f"P{i}", "Status": "Sent", "Cost": float(i)}
+        for i in range(rows)
+    ]
+    new = [
+        {"Title": f"P{i}", "Status": "Sent", "Cost": float(i)}
+        for i in range(rows // 20, rows + rows // 20)
+    ]
+    for item in new[::10]:
+        item["Status"] = "Partial Receipt"
+    titles = {item["Title"] for item in old}
+    updated = [item for item in new[::10] if item["Title"] in titles]
+    # execution
+    with measure(f"_detect_changes() with {rows} items"):
+        changes = ContractManagement()._detect_changes(old, new, "Title")
+    # validation
+    assert len(changes.inserts) == rows // 20
+    assert len(changes.updates) == len(updated)
@@ -0,0 +1,42 @@
+"""Compares the memory used by ArchiveFolder.export_dataframe() with and
+without xlsxwriter's constant_memory mode
+
+Run with: pytest tests/benchmarks -s
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgs_fiscal.systems.sharepoint.archive import ArchiveFolder
+from tests.benchmarks.utils import SCALES, measure
+
+
+def invoices(rows: int) -> pd.DataFrame:
+    """Creates a dataframe shaped like the InvoiceExport"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Vendor ID": [f"{i % 5000:08d}" for i in range(rows)],
+            "Invoice Key": [f"INV{i}" for i in range(rows)],
+            "Invoice Status": rng.choice(["Open", "Paid", "Hold"], rows),
+            "Invoice Amount": rng.uniform(0, 10_000, rows).round(2),
+            "Invoice Date": pd.date_range(
+                "2021-01-01", periods=rows, freq="T"
+            ),
+        }
+    )
+
+
+@pytest.mark.parametrize("rows", SCALES)
+@pytest.mark.parametrize("constant_memory", [False, True])
+def test_export_dataframe_memory(constant_memory, rows, tmp_path):
+    """Measures the peak memory allocated while exporting the invoices"""
+    # setup
+    archive = ArchiveFolder(folder=None, archive_dir=tmp_path)
+    df = invoices(rows)
+    label = f"constant_memory={constant_memory} with {rows} rows"
+    # execution
+    with measure(label):
+        archive.export_dataframe(df, "invoices.xlsx", constant_memory)
+    # validation
+    assert (archive.tmp_dir / "invoices.xlsx").exists()
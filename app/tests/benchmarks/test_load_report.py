@@ -0,0 +1,71 @@
+"""Compares the engines used by CoreIntegrator.load_report() to calculate the
+formulas in the exported Prompt Payment report
+
+Run with: pytest tests/benchmarks -s
+"""
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from dgs_fiscal.systems.core_integrator import CoreIntegrator
+
+SAMPLE_REPORT = (
+    Path(__file__).parents[1]
+    / "integration_tests"
+    / "prompt_payment"
+    / "new_report_input.xlsx"
+)
+ROWS = 5000  # roughly the size of a full export from CoreIntegrator
+LINK = "https://coreintegrator.rsm.cloud/workspace.aspx?repo=Baltimore&exid="
+
+
+@pytest.fixture(scope="module", name="sample_export")
+def fixture_sample_export(tmp_path_factory):
+    """Creates a sample export with ROWS rows by repeating the rows in the
+    sample report and giving each one a unique Execution ID formula
+    """
+    workbook = load_workbook(SAMPLE_REPORT)
+    worksheet = workbook.active
+    rows = [[cell.value for cell in row] for row in worksheet.iter_rows(2)]
+    for exid in range(worksheet.max_row - 1, ROWS):
+        row = list(rows[exid % len(rows)])
+        row[0] = f'=HYPERLINK("{LINK}{exid}","{exid}")'
+        worksheet.append(row)
+    file = tmp_path_factory.mktemp("benchmarks") / "sample_export.xlsx"
+    workbook.save(file)
+    return file
+
+
+def load(engine: str, sample_export: Path, tmp_path: Path) -> tuple:
+    """Loads a copy of the sample export and returns the dataframe and the
+    number of seconds it took to load
+    """
+    core = CoreIntegrator(tmp_path)
+    core.file_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(sample_export, core.file_path)
+    start = time.perf_counter()
+    df = core.load_report(engine=engine)
+    return df, time.perf_counter() - start
+
+
+def test_load_report_engines(sample_export, tmp_path):
+    """Times load_report() with the python engine and, where Excel is
+    installed, with the excel engine and checks that both return the same
+    report
+    """
+    # execution
+    df, seconds = load("python", sample_export, tmp_path / "python")
+    print(f"\npython engine: {seconds:.2f}s for {len(df)} rows")
+    # validation
+    assert len(df) == ROWS
+    assert df["Execution ID"].notna().all()
+    if sys.platform not in ("win32", "darwin"):
+        pytest.skip("The excel engine requires Excel to be installed")
+    pytest.importorskip("xlwings")
+    excel_df, excel_seconds = load("excel", sample_export, tmp_path / "xl")
+    print(f"excel engine: {excel_seconds:.2f}s for {len(excel_df)} rows")
+    assert df.equals(excel_df)
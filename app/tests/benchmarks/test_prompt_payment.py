@@ -0,0 +1,48 @@
+"""Benchmarks PromptPayment.reconcile_reports() with synthetic reports built
+from the sample reports used by the integration tests
+
+Run with: pytest tests/benchmarks -s
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgs_fiscal.etl import PromptPayment
+from dgs_fiscal.etl.prompt_payment import constants
+from tests.benchmarks.utils import SCALES, measure
+
+SAMPLE_DIR = Path(__file__).parents[1] / "integration_tests" / "prompt_payment"
+
+
+def sample_report(file_name: str, dtypes: dict, rows: int) -> pd.DataFrame:
+    """Creates a report with the number of rows passed by repeating the rows
+    of a sample report and giving each one a unique Document Number
+    """
+    df = pd.read_excel(SAMPLE_DIR / file_name, dtype=dtypes)
+    df = df.drop(columns="Unnamed: 0")
+    df = df.iloc[np.arange(rows) % len(df)].reset_index(drop=True)
+    df["Document Number"] = [f"{i:08d}" for i in range(rows)]
+    df["Vendor ID"] = [f"{i % 1000:08d}" for i in range(rows)]
+    return df
+
+
+@pytest.mark.parametrize("rows", SCALES)
+def test_reconcile_reports(rows, tmp_path):
+    """Measures reconcile_reports() when 80% of the invoices in the new
+    report were in the old report
+    """
+    # setup
+    new_dtypes = constants.NEW_REPORT["dtypes"]
+    old_dtypes = constants.OLD_REPORT["dtypes"]
+    new = sample_report("new_report_output.xlsx", new_dtypes, rows)
+    old = sample_report("old_report_output.xlsx", old_dtypes, rows)
+    old = old.iloc[rows // 5 :]
+    prompt = PromptPayment(local_archive=tmp_path)
+    # execution
+    with measure(f"reconcile_reports() with {rows} invoices"):
+        output = prompt.reconcile_reports(new, old, tmp_path)
+    # validation
+    assert len(output.df) == rows
+    assert output.file.exists()
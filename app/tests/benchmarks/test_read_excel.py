@@ -0,0 +1,48 @@
+"""Compares the engines used by dgs_fiscal.etl.excel.read_excel() to read
+the Prompt Payment report
+
+Run with: pytest tests/benchmarks -s
+"""
+import time
+
+import pytest
+from openpyxl import load_workbook
+
+from dgs_fiscal.etl.excel import read_excel
+from dgs_fiscal.etl.prompt_payment import constants
+from tests.benchmarks.test_load_report import SAMPLE_REPORT, ROWS
+
+ENGINES = ["pandas", "openpyxl", "calamine"]
+
+
+@pytest.fixture(scope="module", name="sample_report")
+def fixture_sample_report(tmp_path_factory):
+    """Creates a sample report with ROWS rows by repeating the rows in the
+    sample report
+    """
+    workbook = load_workbook(SAMPLE_REPORT)
+    worksheet = workbook.active
+    rows = [[cell.value for cell in row] for row in worksheet.iter_rows(2)]
+    for exid in range(worksheet.max_row - 1, ROWS):
+        row = list(rows[exid % len(rows)])
+        row[0] = str(exid)
+        worksheet.append(row)
+    file = tmp_path_factory.mktemp("benchmarks") / "sample_report.xlsx"
+    workbook.save(file)
+    return file
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_read_excel_engines(engine, sample_report):
+    """Times read_excel() with each engine on the sample report"""
+    # setup
+    if engine == "calamine":
+        pytest.importorskip("python_calamine")
+    dtypes = constants.NEW_REPORT["dtypes"]
+    # execution
+    start = time.perf_counter()
+    df = read_excel(sample_report, dtypes, list(dtypes), engine=engine)
+    seconds = time.perf_counter() - start
+    print(f"\n{engine} engine: {seconds:.2f}s for {len(df)} rows")
+    # validation
+    assert len(df) == ROWS
@@ -0,0 +1,49 @@
+"""Times how long the dgs_fiscal entrypoint and each command take to start
+
+Run with: pytest tests/benchmarks -s
+"""
+import sys
+import json
+import time
+import subprocess
+
+import pytest
+
+# maximum number of seconds each entrypoint may take to start up
+HELP_BUDGET = 1.0
+COMMAND_BUDGET = 2.0
+
+COMMANDS = ["aging_report", "contract_management", "prompt_payment"]
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+from dgs_fiscal import etl
+import dgs_fiscal.etl.{command}
+print(time.perf_counter() - start)
+"""
+
+
+def test_help_startup():
+    """Times `dgs_fiscal --help` against HELP_BUDGET"""
+    # execution
+    start = time.perf_counter()
+    subprocess.run(["dgs_fiscal", "--help"], check=True, capture_output=True)
+    elapsed = time.perf_counter() - start
+    print(f"\ndgs_fiscal --help: {elapsed:.2f}s")
+    # validation
+    assert elapsed < HELP_BUDGET
+
+
+@pytest.mark.parametrize("command", COMMANDS)
+def test_command_startup(command):
+    """Times the import of each workflow against COMMAND_BUDGET"""
+    # execution
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(command=command)],
+        check=True,
+        capture_output=True,
+    )
+    elapsed = json.loads(output.stdout.decode("utf-8"))
+    print(f"\n{command} import: {elapsed:.2f}s")
+    # validation
+    assert elapsed < COMMAND_BUDGET
@@ -0,0 +1,35 @@
+"""Benchmarks loading synthetic data into a local CitiBuy database with
+batched executemany() inserts
+
+Run with: pytest tests/benchmarks -s
+"""
+import pytest
+import sqlalchemy as sa
+
+from tests.benchmarks.utils import SCALES, measure
+from tests.utils.synthetic_data import create_synthetic_db
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "recent"])
+@pytest.mark.parametrize("rows", SCALES)
+def test_create_synthetic_db(rows, distribution, tmp_path):
+    """Measures create_synthetic_db() for each date distribution"""
+    # setup
+    conn_url = f"sqlite:///{tmp_path / 'citibuy.db'}"
+    recent = sa.text(
+        "SELECT COUNT(*) FROM PO_HEADER WHERE PO_DATE > DATE('now', '-45 day')"
+    )
+    # execution
+    with measure(f"create_synthetic_db() with {rows} {distribution} rows"):
+        create_synthetic_db(conn_url, rows, distribution=distribution)
+    engine = sa.create_engine(conn_url)
+    with engine.connect() as conn:
+        count = conn.execute(sa.text("SELECT COUNT(*) FROM PO_HEADER"))
+        recent_count = conn.execute(recent).scalar()
+        # validation
+        assert count.scalar() == rows
+        if distribution == "recent":
+            assert recent_count > rows * 0.4
+        else:
+            assert recent_count < rows * 0.2
+    engine.dispose()
@@ -0,0 +1,51 @@
+"""Helpers for measuring the time and peak memory of each benchmark"""
+from __future__ import annotations
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List
+
+# number of rows to generate for the benchmarks of the ETL workflows, which
+# can be overridden with BENCHMARK_ROWS, e.g. BENCHMARK_ROWS=10000,1000000
+SCALES: List[int] = [
+    int(rows)
+    for rows in os.getenv("BENCHMARK_ROWS", "10000,100000").split(",")
+]
+
+
+@dataclass
+class Measurement:
+    """Stores the time and peak memory allocated by a benchmark
+
+    Attributes
+    ----------
+    seconds: float
+        The number of seconds the benchmark took to run
+    peak: float
+        The peak memory allocated by Python while it ran, in MiB
+    """
+
+    seconds: float = 0.0
+    peak: float = 0.0
+
+
+@contextmanager
+def measure(label: str) -> Iterator[Measurement]:
+    """Measures the time and peak memory allocated by the code in the block
+    and prints them with the label once the block exits
+
+    The peak memory is traced with tracemalloc, which slows down the code
+    being measured, so times should only be compared with each other
+    """
+    result = Measurement()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.seconds = time.perf_counter() - start
+        result.peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        print(f"\n{label}: {result.seconds:.2f}s, peak {result.peak:.1f} MiB")
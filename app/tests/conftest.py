@@ -11,7 +11,7 @@ from dgs_fiscal.systems.core_integrator.driver import Driver
 from dgs_fiscal.systems.citibuy import models
 from tests.utils.populate_citibuy_db import populate_db
 
-collect_ignore = ["integration_tests"]
+collect_ignore = ["integration_tests", "benchmarks"]
 
 
 @pytest.fixture(scope="session")
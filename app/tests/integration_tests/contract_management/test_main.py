@@ -4,6 +4,7 @@ import pytest
 import pandas as pd
 
 from dgs_fiscal.systems.sharepoint import BatchedChanges
+from dgs_fiscal.systems.sharepoint.utils import serialize_value
 from dgs_fiscal.etl import ContractManagement
 from dgs_fiscal.etl.contract_management import ContractData, constants
 
@@ -83,7 +84,7 @@ class TestContractManagement:
         assert release_title == "P111:1"
         assert list(df_po["PO Type"]) == po_types
         for col in ["End Date", "Start Date"]:
-            assert "T00:00:00Z" in df_con.loc[0, col]
+            assert "T00:00:00Z" in serialize_value(df_con.loc[0, col])
         # validation - PO locations were aggregated correctly
         assert list(df_con["Locations"]) is not None
         assert list(df_ven["Agency Locations"]) is not None
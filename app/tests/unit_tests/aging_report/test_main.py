@@ -0,0 +1,107 @@
+import pandas as pd
+from dynaconf import Dynaconf
+
+from dgs_fiscal.etl import AgingReport
+from dgs_fiscal.systems import CitiBuy
+
+
+class TestAgingReportInit:
+    """Tests that the AgingReport class creates its clients lazily"""
+
+    def test_init_lazy(self, mock_db):
+        """Tests that AgingReport doesn't create its clients when it inits
+
+        Validates the following conditions:
+        - Neither the CitiBuy nor the SharePoint client is created on init
+        - The CitiBuy client is created with citibuy_url on first access
+        - The same CitiBuy client is returned on subsequent accesses
+        """
+        # execution
+        aging = AgingReport(citibuy_url=mock_db)
+        # validation - no clients created on init
+        assert aging._citibuy is None
+        assert aging._sharepoint is None
+        # validation - client created on first access
+        citibuy = aging.citibuy
+        assert isinstance(citibuy, CitiBuy)
+        assert aging.citibuy is citibuy
+        assert aging._sharepoint is None
+
+    def test_init_injected(self, mock_db):
+        """Tests that clients passed to AgingReport are used instead of
+        creating new ones
+        """
+        # setup
+        citibuy = CitiBuy(conn_url=mock_db)
+        sharepoint = object()  # stands in for an authenticated client
+        # execution
+        aging = AgingReport(citibuy=citibuy, sharepoint=sharepoint)
+        # validation
+        assert aging.citibuy is citibuy
+        assert aging.sharepoint is sharepoint
+
+    def test_query_report(self, mock_db, tmp_path):
+        """Tests that query_report() only returns a report once a profiled
+        CitiBuy client has run a query, without creating the client itself
+        """
+        # setup
+        config = Dynaconf(citibuy_profile_dir=str(tmp_path))
+        citibuy = CitiBuy(config=config, conn_url=mock_db, profile=True)
+        aging = AgingReport(citibuy_url=mock_db)
+        profiled = AgingReport(citibuy=citibuy)
+        # execution
+        profiled.get_receipt_queue()
+        # validation
+        assert aging.query_report() is None
+        assert aging._citibuy is None
+        assert "get_receipts" in profiled.query_report()
+
+
+class TestAgingReportCitiBuy:
+    """Tests the AgingReport methods that export data from CitiBuy"""
+
+    def test_get_citibuy_data(self, mock_db):
+        """Tests that get_citibuy_data() recodes the status columns
+
+        Validates the following conditions:
+        - The invoice and PO statuses are categoricals of their descriptions
+        - The other columns aren't recoded
+        """
+        # setup
+        aging = AgingReport(citibuy_url=mock_db)
+        invoice_status = list(CitiBuy.INVOICE_STATUS.values())
+        # execution
+        df = aging.get_citibuy_data(invoice_window=3650)
+        # validation
+        assert df["Invoice Status"].dtype == "category"
+        assert list(df["Invoice Status"].cat.categories) == invoice_status
+        assert df["PO Status"].isin(CitiBuy.PO_STATUS.values()).all()
+        assert df["Vendor ID"].dtype == object
+
+    def test_get_receipt_queue(self, mock_db):
+        """Tests that get_receipt_queue() recodes the receipt statuses"""
+        # setup
+        aging = AgingReport(citibuy_url=mock_db)
+        # execution
+        df = aging.get_receipt_queue(receipt_window=3650)
+        # validation
+        assert df["Receipt Status"].dtype == "category"
+        assert df["Receipt Status"].isin(CitiBuy.RECEIPT_STATUS.values()).all()
+
+    def test_populate_report(self, mock_db):
+        """Tests that populate_report() leaves unmatched statuses blank"""
+        # setup
+        aging = AgingReport(citibuy_url=mock_db)
+        citibuy_data = aging.get_citibuy_data(invoice_window=3650)
+        invoice = citibuy_data.iloc[0]
+        report = pd.DataFrame(
+            {
+                "Vendor ID": [invoice["Vendor ID"], "00000000"],
+                "Invoice Key": [invoice["Invoice Number"], "MISSING"],
+            }
+        )
+        # execution
+        df = aging.populate_report(report, citibuy_data)
+        # validation
+        statuses = [invoice["Invoice Status"], ""]
+        assert df["CitiBuy Status"].tolist() == statuses
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from dgs_fiscal.etl.aging_report import utils
+
+CODES = {"4IP": "4IP - Paid", "4IC": "4IC - Cancelled"}
+
+
+def test_recode_status():
+    """Tests that recode_status() recodes a column as a categorical
+
+    Validates the following conditions:
+    - Known codes are replaced by their descriptions
+    - Unknown codes and missing values are kept as is
+    - The described statuses are listed first in the categories
+    """
+    # setup
+    col = pd.Series(["4IP", "4IX", None, "4IP"])
+    # execution
+    output = utils.recode_status(col, CODES)
+    # validation
+    assert output.dtype == "category"
+    assert output.tolist()[:2] == ["4IP - Paid", "4IX"]
+    assert output.isna().tolist() == [False, False, True, False]
+    assert list(output.cat.categories) == [*CODES.values(), "4IX"]
+
+
+def test_recode_statuses():
+    """Tests that recode_statuses() only recodes the status columns"""
+    # setup
+    df = pd.DataFrame({"Status": ["4IC"], "Invoice Number": ["4IP"]})
+    # execution
+    output = utils.recode_statuses(df, {"Status": CODES})
+    # validation
+    assert output["Status"].tolist() == ["4IC - Cancelled"]
+    assert output["Invoice Number"].tolist() == ["4IP"]
+    assert df["Status"].tolist() == ["4IC"]
+
+
+def test_fill_blanks():
+    """Tests that fill_blanks() fills missing values in categorical columns"""
+    # setup
+    df = pd.DataFrame(
+        {
+            "CitiBuy Status": pd.Categorical(["4IP - Paid", None]),
+            "Vendor": ["Acme", None],
+        }
+    )
+    # execution
+    output = utils.fill_blanks(df)
+    # validation
+    assert output["CitiBuy Status"].tolist() == ["4IP - Paid", ""]
+    assert output["Vendor"].tolist() == ["Acme", ""]
@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+import importlib.util
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+from dynaconf import Dynaconf
+
+from dgs_fiscal.metrics import metrics
+from dgs_fiscal.systems import CitiBuy
+from dgs_fiscal.systems.citibuy.cache import QueryCache
+from dgs_fiscal.systems.citibuy.client import query_params
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@pytest.fixture(name="query_cache")
+def fixture_query_cache(tmp_path):
+    """Creates a QueryCache that pickles results to a temporary directory"""
+    return QueryCache(tmp_path, ttl=60, file_format="pickle")
+
+
+@pytest.fixture(name="cached_citibuy")
+def fixture_cached_citibuy(mock_db, tmp_path):
+    """Creates a CitiBuy client that caches its query results"""
+    config = Dynaconf(
+        citibuy_cache_dir=str(tmp_path / "cache"),
+        citibuy_cache_ttl=60,
+        citibuy_cache_format="pickle",
+    )
+    return CitiBuy(config=config, conn_url=mock_db, cache=True)
+
+
+class TestQueryCache:
+    """Tests the QueryCache class"""
+
+    def test_key(self, mock_db):
+        """Tests that the cache key is computed from the compiled query
+
+        Validates the following conditions:
+        - Identical queries have the same key
+        - Queries with different parameters have different keys
+        - The same query run against different databases has different keys
+        """
+        # setup
+        citibuy = CitiBuy(config=Dynaconf(), conn_url=mock_db)
+        other = sa.create_engine("sqlite://")
+        # execution
+        query = citibuy.invoice_query()
+        key = QueryCache.key(citibuy.engine, query, query_params(90))
+        same = QueryCache.key(citibuy.engine, query, query_params(90))
+        days = QueryCache.key(citibuy.engine, query, query_params(30))
+        engine = QueryCache.key(other, query, query_params(90))
+        # validation
+        assert key == same
+        assert key != days
+        assert key != engine
+
+    def test_set_and_get(self, query_cache):
+        """Tests that cached results are returned until they expire
+
+        Validates the following conditions:
+        - The results are returned by get() after they're saved
+        - Results that haven't been cached return None
+        - Expired results return None and are deleted from the cache
+        """
+        # setup
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", None]})
+        # execution
+        file = query_cache.set("key", df)
+        cached = query_cache.get("key")
+        missing = query_cache.get("other")
+        expired = time.time() - 120
+        os.utime(file, (expired, expired))
+        # validation
+        pd.testing.assert_frame_equal(cached, df)
+        assert missing is None
+        assert query_cache.get("key") is None
+        assert not file.exists()
+
+    def test_clear(self, query_cache):
+        """Tests that clear() deletes each cached result"""
+        # setup
+        query_cache.set("a", pd.DataFrame({"id": [1]}))
+        query_cache.set("b", pd.DataFrame({"id": [2]}))
+        # execution
+        deleted = query_cache.clear()
+        # validation
+        assert deleted == 2
+        assert query_cache.get("a") is None
+
+    def test_unsupported_format(self, tmp_path):
+        """Tests that an unsupported format raises a ValueError"""
+        with pytest.raises(ValueError):
+            QueryCache(tmp_path, ttl=60, file_format="csv")
+
+    @pytest.mark.skipif(not HAS_PYARROW, reason="requires pyarrow")
+    def test_parquet(self, tmp_path):
+        """Tests that results can be cached as parquet files"""
+        # setup
+        cache = QueryCache(tmp_path, ttl=60)
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", None]})
+        # execution
+        file = cache.set("key", df)
+        # validation
+        assert file.suffix == ".parquet"
+        pd.testing.assert_frame_equal(cache.get("key"), df)
+
+    def test_parquet_missing_pyarrow(self, tmp_path, monkeypatch):
+        """Tests that results are pickled instead when the parquet format is
+        used and pyarrow can't be imported
+
+        Validates the following conditions:
+        - set() doesn't raise an ImportError
+        - The results are saved as a pickle file and returned by get()
+        """
+        # setup
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        cache = QueryCache(tmp_path, ttl=60)
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", None]})
+        # execution
+        file = cache.set("key", df)
+        # validation
+        assert file.suffix == ".pkl"
+        pd.testing.assert_frame_equal(cache.get("key"), df)
+        assert cache.clear() == 1
+
+    @pytest.mark.skipif(not HAS_PYARROW, reason="requires pyarrow")
+    def test_parquet_mixed_types(self, tmp_path):
+        """Tests that results with columns pyarrow can't convert are pickled
+        instead and replace the results previously cached as parquet
+        """
+        # setup
+        cache = QueryCache(tmp_path, ttl=60)
+        parquet = cache.set("key", pd.DataFrame({"id": [1, 2]}))
+        df = pd.DataFrame({"id": [1, "a"]})
+        # execution
+        file = cache.set("key", df)
+        # validation
+        assert file.suffix == ".pkl"
+        assert not parquet.exists()
+        pd.testing.assert_frame_equal(cache.get("key"), df)
+
+
+class TestCitiBuyCache:
+    """Tests caching the results of the CitiBuy client's queries"""
+
+    def test_cached_queries(self, cached_citibuy):
+        """Tests that identical queries are read from the cache
+
+        Validates the following conditions:
+        - The first query is run against the database and cached
+        - The identical query returns the same rows from the cache
+        - A query with different parameters isn't read from the cache
+        """
+        # setup
+        metrics.reset()
+        # execution
+        first = cached_citibuy.get_invoices()
+        second = cached_citibuy.get_invoices()
+        cached_citibuy.get_invoices(days_ago=30)
+        # validation
+        assert metrics.counters["citibuy_cache_hits"] == 1
+        assert second.cols == first.cols
+        assert second.records == first.records
+        assert second.dataframe.shape == first.dataframe.shape
+
+    def test_refresh_cache(self, cached_citibuy):
+        """Tests that the cache is bypassed when refresh_cache is True
+
+        Validates the following conditions:
+        - The query is rerun against the database instead of the cache
+        - The new results replace the cached results
+        """
+        # setup
+        cached_citibuy.get_receipts()
+        cached_citibuy.refresh_cache = True
+        metrics.reset()
+        # execution
+        cached_citibuy.get_receipts()
+        # validation
+        assert "citibuy_cache_hits" not in metrics.counters
+        assert metrics.counters["citibuy_rows_fetched"] > 0
+        assert len(list(cached_citibuy.cache.cache_dir.iterdir())) == 1
+
+    def test_parquet_cache_without_pyarrow(
+        self, mock_db, tmp_path, monkeypatch
+    ):
+        """Tests that queries still return their rows and are cached when the
+        parquet cache format is used and pyarrow can't be imported
+        """
+        # setup
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        config = Dynaconf(
+            citibuy_cache_dir=str(tmp_path),
+            citibuy_cache_ttl=60,
+        )
+        citibuy = CitiBuy(config=config, conn_url=mock_db, cache=True)
+        metrics.reset()
+        # execution
+        first = citibuy.get_invoices()
+        second = citibuy.get_invoices()
+        # validation
+        assert metrics.counters["citibuy_cache_hits"] == 1
+        assert second.records == first.records
+        assert [file.suffix for file in tmp_path.iterdir()] == [".pkl"]
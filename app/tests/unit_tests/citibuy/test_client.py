@@ -1,11 +1,16 @@
+from collections import OrderedDict
 from pprint import pprint
 
 import pytest
 import sqlalchemy
+from sqlalchemy.dialects import mssql, postgresql, sqlite
 
 from tests.unit_tests.citibuy import data
 from dgs_fiscal.systems import CitiBuy
+from dgs_fiscal.systems.citibuy import client as citibuy_client
+from dgs_fiscal.systems.citibuy.functions import string_agg
 import dgs_fiscal.etl.aging_report.constants as aging_constants
+import dgs_fiscal.etl.contract_management.constants as contract_constants
 
 
 @pytest.fixture(scope="session", name="mock_citibuy")
@@ -23,6 +28,92 @@ class TestCitiBuy:
         assert isinstance(mock_citibuy.engine, sqlalchemy.engine.Engine)
 
 
+class TestCachedStatements:
+    """Tests that the query statements are built once and reused"""
+
+    def test_statements_reused(self, mock_citibuy, mock_db):
+        """Tests that each query is only built once for each set of arguments
+
+        Validates the following conditions:
+        - The same statement is returned for the same arguments
+        - The statements are shared by each instance of the client
+        - Different labels or decode_statuses build a different statement
+        """
+        # setup
+        other = CitiBuy(conn_url=mock_db)
+        labels = {"id": "Invoice ID", "amount": "Invoice Amount"}
+        # execution
+        query = mock_citibuy.invoice_query()
+        labeled = mock_citibuy.invoice_query(labels=dict(labels))
+        # validation
+        assert other.invoice_query() is query
+        assert mock_citibuy.invoice_query(None, False) is query
+        assert mock_citibuy.invoice_query(labels=dict(labels)) is labeled
+        assert labeled is not query
+        assert mock_citibuy.invoice_query(decode_statuses=True) is not query
+
+    def test_statements_per_dialect(self, mock_citibuy, mock_db, monkeypatch):
+        """Tests that the cached statements are keyed on the dialect of the
+        client's engine and only the most recently used ones are kept
+
+        Validates the following conditions:
+        - Clients with different dialects don't share a statement
+        - The least recently used statement is dropped once the cache is full
+        - A statement that was used again isn't dropped
+        """
+        # setup
+        monkeypatch.setattr(citibuy_client, "STATEMENTS", OrderedDict())
+        monkeypatch.setattr(citibuy_client, "STATEMENT_CACHE_SIZE", 2)
+        other = CitiBuy(conn_url=mock_db)
+        other.engine = sqlalchemy.create_mock_engine("mssql://", None)
+        # execution
+        query = mock_citibuy.purchase_order_query(limit=1)
+        mssql_query = other.purchase_order_query(limit=1)
+        mock_citibuy.purchase_order_query(limit=1)  # most recently used
+        mock_citibuy.purchase_order_query(limit=2)
+        # validation
+        assert mssql_query is not query
+        assert mock_citibuy.purchase_order_query(limit=1) is query
+        assert [key[:2] for key in citibuy_client.STATEMENTS] == [
+            ("sqlite", "purchase_order_query"),
+            ("sqlite", "purchase_order_query"),
+        ]
+        assert other.purchase_order_query(limit=1) is not mssql_query
+
+    def test_bound_parameters(self, mock_citibuy):
+        """Tests that the cutoff dates are bound parameters
+
+        Validates the following conditions:
+        - The cutoff dates are left as named bound parameters
+        - The SQL sent to the database doesn't change with their values
+        - The PO queries still compile for SQL Server, which needs a literal
+          limit for TOP
+        """
+        # setup
+        statements = []
+        sqlalchemy.event.listen(
+            mock_citibuy.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, stmt, *args: statements.append(stmt),
+        )
+        po_params = mock_citibuy.purchase_order_query().compile().params
+        invoice_params = mock_citibuy.invoice_query().compile().params
+        # execution
+        mock_citibuy.get_invoices(days_ago=30)
+        mock_citibuy.get_invoices(days_ago=90)
+        mock_citibuy.get_receipts(days_ago=30)
+        mock_citibuy.get_receipts(days_ago=90)
+        po_sql = mock_citibuy.purchase_order_query(5).compile(
+            dialect=mssql.dialect()
+        )
+        # validation
+        assert "contract_cutoff" in po_params
+        assert "cutoff_date" in invoice_params
+        assert statements[0] == statements[1]
+        assert statements[2] == statements[3]
+        assert "TOP __[POSTCOMPILE_param_1]" in str(po_sql)
+
+
 class TestGetPurchaseOrders:
     """Tests the CitiBuy.get_purchase_orders() method"""
 
@@ -68,6 +159,102 @@ class TestGetPurchaseOrders:
         # validation
         assert output == expected
 
+    def test_query_labeled(self, mock_citibuy):
+        """Tests that CitiBuy.get_purchase_orders() computes the PO title and
+        type and renames the columns in the query when labels are passed
+
+        Validates the following conditions:
+        - Only the labeled columns are returned, in the order passed
+        - The PO title includes the release number only for releases
+        - The PO type is based on the release number and contract
+        - The PO statuses are decoded when decode_statuses is True
+        """
+        # setup
+        labels = contract_constants.CITIBUY["po_cols"]
+        expected = data.PO_RESULTS
+        # execution
+        output = mock_citibuy.get_purchase_orders(
+            labels=labels,
+            decode_statuses=True,
+        ).records
+        pprint(output)
+        # validation
+        assert list(output[0].keys()) == list(labels.values())
+        assert len(output) == len(expected)
+        for record, raw in zip(output, expected):
+            release = raw["release_nbr"]
+            title = raw["po_nbr"] + (f":{release}" if release else "")
+            if release:
+                po_type = "Release"
+            elif raw.get("start_date"):
+                po_type = "Master Blanket"
+            else:
+                po_type = "Open Market"
+            assert record["Title"] == title
+            assert record["PO Type"] == po_type
+            assert record["Status"] == CitiBuy.PO_STATUS[raw["status"]]
+
+
+class TestGetPurchaseOrderSets:
+    """Tests the CitiBuy.get_purchase_order_sets() method"""
+
+    def test_get_sets(self, mock_citibuy):
+        """Tests that get_purchase_order_sets() returns the unique POs,
+        vendors, and contracts with their locations aggregated in the query
+
+        Validates the following conditions:
+        - Each set has the labeled columns, in the order passed
+        - Each set is de-duplicated, preferring DGS contracts
+        - Open Market POs are excluded from the contracts
+        - Only DGS locations are aggregated, sorted and separated by ", "
+        """
+        # setup
+        cols = contract_constants.CITIBUY
+        con_locs = {
+            "P111": "DGS - BUILDING MAINTENANCE, DGS - FLEET MANAGEMENT",
+            "P444": "DGS - ENERGY",
+        }
+        # execution
+        output = mock_citibuy.get_purchase_order_sets(
+            po_cols=cols["po_cols"],
+            vendor_cols=cols["vendor_cols"],
+            contract_cols=cols["contract_cols"],
+        )
+        pos = output["po"].records
+        vendors = output["vendor"].records
+        contracts = output["contract"].records
+        pprint(contracts)
+        # validation - columns were labeled
+        assert list(pos[0]) == list(cols["po_cols"].values())
+        assert list(vendors[0]) == list(cols["vendor_cols"].values())
+        assert list(contracts[0]) == list(cols["contract_cols"].values())
+        # validation - sets were de-duplicated
+        titles = [po["Title"] for po in pos]
+        assert titles == ["P111", "P111:1", "P444", "P444:1", "P555"]
+        assert [ven["Vendor ID"] for ven in vendors] == ["111", "222"]
+        assert [con["Agency"] for con in contracts] == ["DGS", "DGS"]
+        # validation - locations were aggregated
+        assert {
+            con["Title"]: con["Locations"] for con in contracts
+        } == con_locs
+        assert "DPW" not in vendors[1]["Agency Locations"]
+
+    def test_string_agg_dialects(self):
+        """Tests that string_agg() compiles to the aggregate function of each
+        database dialect
+        """
+        # setup
+        col = sqlalchemy.column("unit")
+        query = sqlalchemy.select(string_agg(col, ", "))
+        expected = {
+            mssql: "STRING_AGG(unit, :param_1) WITHIN GROUP (ORDER BY unit)",
+            postgresql: "STRING_AGG(unit, %(param_1)s ORDER BY unit)",
+            sqlite: "GROUP_CONCAT(unit, ?)",
+        }
+        # validation
+        for dialect, sql in expected.items():
+            assert sql in str(query.compile(dialect=dialect.dialect()))
+
 
 class TestGetInvoices:
     """Tests the CitiBuy.get_invoices() method"""
@@ -123,6 +310,36 @@ class TestGetInvoices:
         assert len(output) >= len(filtered)  # ensure more results are returned
         assert old_invoice in invoice_ids
 
+    def test_query_labeled(self, mock_citibuy):
+        """Tests that CitiBuy.get_invoices() decodes the statuses, computes
+        the PO type, and renames the columns in the query
+
+        Validates the following conditions:
+        - Every column in the Aging Report's invoice_cols is returned under
+          its label, in the order passed
+        - The invoice and PO statuses are decoded
+        - Invoices without a contract are Open Market invoices
+        """
+        # setup
+        labels = aging_constants.CITIBUY["invoice_cols"]
+        expected = data.INVOICE_RESULTS
+        # execution
+        output = mock_citibuy.get_invoices(
+            labels=labels,
+            decode_statuses=True,
+        ).records
+        pprint(output)
+        # validation
+        assert list(output[0].keys()) == list(labels.values())
+        assert len(output) == len(expected)
+        for record, raw in zip(output, expected):
+            open_market = raw["contract_end_date"] is None
+            po_type = "Open Market" if open_market else "Release"
+            invoice_status = CitiBuy.INVOICE_STATUS[raw["status"]]
+            assert record["Invoice Status"] == invoice_status
+            assert record["PO Status"] == CitiBuy.PO_STATUS[raw["po_status"]]
+            assert record["PO Type"] == po_type
+
 
 class TestGetReceipts:
     """Tests the CitiBuy.get_receipts() method"""
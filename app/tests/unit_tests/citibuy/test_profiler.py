@@ -0,0 +1,104 @@
+import pytest
+from dynaconf import Dynaconf
+
+from dgs_fiscal.systems import CitiBuy
+from dgs_fiscal.systems.citibuy.profiler import (
+    PROFILE_FILE,
+    QueryProfiler,
+    load_profiles,
+    value_bytes,
+)
+
+
+@pytest.fixture(name="profiled_citibuy")
+def fixture_profiled_citibuy(mock_db, tmp_path):
+    """Creates a CitiBuy client that profiles its queries"""
+    config = Dynaconf(citibuy_profile_dir=str(tmp_path))
+    return CitiBuy(config=config, conn_url=mock_db, profile=True)
+
+
+class TestQueryProfiler:
+    """Tests the QueryProfiler class"""
+
+    def test_profile_queries(self, profiled_citibuy, tmp_path):
+        """Tests that each query run by the client is profiled
+
+        Validates the following conditions:
+        - A profile is recorded for each query under the method's name
+        - The queries run when SQLAlchemy first connects aren't recorded
+        - The SQL, timing, row count, and bytes are recorded
+        - Each profile is appended to the profile file
+        """
+        # execution
+        receipts = profiled_citibuy.get_receipts()
+        invoices = profiled_citibuy.get_invoices()
+        profiles = profiled_citibuy.profiler.profiles
+        saved = load_profiles(tmp_path)
+        # validation
+        assert [p.name for p in profiles] == ["get_receipts", "get_invoices"]
+        assert "WITH receipts AS" in profiles[0].sql
+        assert profiles[0].rows == len(receipts.rows)
+        assert profiles[1].rows == len(invoices.rows)
+        assert all(p.execute_seconds > 0 for p in profiles)
+        assert all(p.bytes > 0 for p in profiles)
+        assert (tmp_path / PROFILE_FILE).exists()
+        assert saved["name"].tolist() == ["get_receipts", "get_invoices"]
+
+    def test_report(self, profiled_citibuy):
+        """Tests that the report lists each query that was profiled"""
+        # execution
+        profiled_citibuy.execute_stmt("SELECT 1 AS one")
+        report = profiled_citibuy.profiler.report()
+        # validation
+        assert "execute_stmt" in report
+        assert "total_seconds" in report
+
+    def test_profiling_disabled(self, mock_db):
+        """Tests that queries aren't profiled unless profiling is enabled"""
+        # execution
+        citibuy = CitiBuy(config=Dynaconf(), conn_url=mock_db)
+        output = citibuy.get_receipts()
+        # validation
+        assert citibuy.profiler is None
+        assert output.rows
+
+    def test_statistics_mssql_only(self, profiled_citibuy):
+        """Tests that SET STATISTICS is only turned on for SQL Server"""
+        # execution
+        profiler = QueryProfiler(profiled_citibuy.engine, statistics=True)
+        # validation
+        assert not profiler.statistics
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [(None, 0), ("abc", 3), ("é", 2), (b"ab", 2), (1.5, 8)],
+    )
+    def test_value_bytes(self, value, expected):
+        """Tests that the size of each type of value is estimated"""
+        assert value_bytes(value) == expected
+
+    def test_profile_staged_and_source(self, mock_db, tmp_path):
+        """Tests that queries are profiled on the engine they're run on when
+        the client is in staging mode
+
+        Validates the following conditions:
+        - The queries run on the staging database are profiled
+        - execute_stmt(), which runs on the CitiBuy database, is profiled
+        """
+        # setup
+        config = Dynaconf(
+            citibuy_profile_dir=str(tmp_path),
+            citibuy_staging_url=f"sqlite:///{tmp_path / 'staging.db'}",
+        )
+        citibuy = CitiBuy(
+            config=config, conn_url=mock_db, profile=True, staging=True
+        )
+        # execution
+        citibuy.get_receipts()
+        citibuy.execute_stmt("SELECT 1 AS one")
+        profiles = citibuy.profiler.profiles
+        # validation
+        assert [p.name for p in profiles] == ["get_receipts", "execute_stmt"]
+        assert "WITH receipts AS" in profiles[0].sql
+        assert profiles[1].sql == "SELECT 1 AS one"
+        assert all(p.execute_seconds > 0 for p in profiles)
@@ -0,0 +1,92 @@
+import pytest
+
+from dgs_fiscal.systems import CitiBuy
+from dgs_fiscal.systems.citibuy import schema
+
+INDEXES = [
+    "IX_INVOICE_HDR_UPDATED_DATE",
+    "IX_PO_HEADER_DEPT_NBR_PREFIX_REF",
+    "IX_RECEIPT_ROUTING_RECEIPT_ID_ORDER_SEQUENCE",
+    "IX_BLANKET_CONTROL_BLANKET_END_DATE",
+]
+
+
+@pytest.fixture(scope="module", name="mock_citibuy")
+def fixture_mock_citibuy(mock_db):
+    """Creates a mock instance of CitiBuy class for unit testing"""
+    return CitiBuy(conn_url=mock_db)
+
+
+class TestGenerateDDL:
+    """Tests the generate_ddl() function"""
+
+    def test_index_ddl(self):
+        """Tests that a CREATE INDEX statement is returned for each index
+
+        Validates the following conditions:
+        - Each index declared on the models is created
+        - The statements are compiled for SQL Server by default
+        - CREATE TABLE statements aren't included by default
+        """
+        # execution
+        output = schema.generate_ddl()
+        # validation
+        assert len(output) == len(INDEXES)
+        for index in INDEXES:
+            assert any(f"CREATE INDEX [{index}]" in stmt for stmt in output)
+        assert not any("CREATE TABLE" in stmt for stmt in output)
+
+    def test_table_ddl(self):
+        """Tests that CREATE TABLE statements are included when requested"""
+        # execution
+        output = schema.generate_ddl("sqlite", tables=True)
+        # validation
+        assert output[0].startswith("CREATE TABLE")
+        assert 'CREATE INDEX "IX_INVOICE_HDR_UPDATED_DATE"' in "".join(output)
+
+    def test_unsupported_dialect(self):
+        """Tests that an unsupported dialect raises a ValueError"""
+        with pytest.raises(ValueError):
+            schema.generate_ddl("oracle")
+
+
+class TestCheckQueryPlans:
+    """Tests the check_query_plans() and find_full_scans() functions"""
+
+    def test_check_query_plans(self, mock_citibuy):
+        """Tests that the plan of each client query is captured
+
+        Validates the following conditions:
+        - A plan is returned for each query in client_queries()
+        - The receipt query uses the RECEIPT_ROUTING index
+        - Each full scan flagged is a step in the query plan
+        """
+        # execution
+        plans = schema.check_query_plans(mock_citibuy)
+        receipts = plans[2]
+        # validation
+        assert [plan.name for plan in plans] == [
+            "get_purchase_orders",
+            "get_invoices",
+            "get_receipts",
+        ]
+        assert any(INDEXES[2] in step for step in receipts.steps)
+        for plan in plans:
+            assert set(plan.full_scans) <= set(plan.steps)
+
+    def test_find_full_scans(self, mock_citibuy):
+        """Tests that only scans of the tables in the query are flagged and
+        not scans that use an index or scans of subqueries
+        """
+        # setup
+        query = mock_citibuy.receipt_query()
+        steps = [
+            "SCAN receipt",
+            "SCAN approver USING INDEX IX_RECEIPT_ROUTING",
+            "SCAN (subquery-3)",
+            "SCAN receipts",
+        ]
+        # execution
+        output = schema.find_full_scans(query, steps)
+        # validation
+        assert output == ["SCAN receipt"]
@@ -0,0 +1,200 @@
+import shutil
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+from dynaconf import Dynaconf
+
+from dgs_fiscal.systems import CitiBuy
+from dgs_fiscal.systems.citibuy import models
+from dgs_fiscal.systems.citibuy.staging import StagingDatabase, WATERMARKS
+
+
+@pytest.fixture(name="source_url")
+def fixture_source_url(mock_db, tmp_path):
+    """Copies the mock database so that its rows can be changed by a test"""
+    source = tmp_path / "source.db"
+    shutil.copy(mock_db.split("sqlite:///")[1], source)
+    return f"sqlite:///{source}"
+
+
+@pytest.fixture(name="staging_url")
+def fixture_staging_url(tmp_path):
+    """Returns the URL of a staging database in a temporary directory"""
+    return f"sqlite:///{tmp_path / 'staging' / 'citibuy.db'}"
+
+
+@pytest.fixture(name="staging_db")
+def fixture_staging_db(source_url, staging_url):
+    """Creates a staging database that's synced from the mock database"""
+    return StagingDatabase(sa.create_engine(source_url), staging_url)
+
+
+def count_rows(engine: sa.engine.Engine) -> dict:
+    """Returns the number of rows in each of the CitiBuy tables"""
+    with engine.connect() as conn:
+        return {
+            table.name: conn.execute(
+                sa.select(sa.func.count()).select_from(table)
+            ).scalar()
+            for table in models.Base.metadata.sorted_tables
+        }
+
+
+class TestStagingDatabase:
+    """Tests the StagingDatabase class"""
+
+    def test_full_sync(self, staging_db):
+        """Tests that every table is copied the first time it's synced
+
+        Validates the following conditions:
+        - Each table has the same rows as the source database
+        - Every table is copied in full, including the incremental tables
+        - The staging database is marked as synced afterwards
+        """
+        # setup
+        assert not staging_db.is_synced
+        # execution
+        results = staging_db.sync()
+        # validation
+        expected = count_rows(staging_db.source)
+        assert count_rows(staging_db.engine) == expected
+        assert {r.table: r.rows for r in results} == expected
+        assert not any(result.incremental for result in results)
+        assert staging_db.is_synced
+        assert set(staging_db.last_synced()) == set(expected)
+
+    def test_incremental_sync(self, staging_db):
+        """Tests that only the changed rows of the tables with a modified
+        timestamp are copied by the next sync
+
+        Validates the following conditions:
+        - The tables in WATERMARKS are synced incrementally
+        - Only the rows modified at or after the last watermark are copied
+        - Changes to a row that was already staged replace the staged row
+        - The other tables are copied in full
+        """
+        # setup
+        staging_db.sync()
+        invoices = models.Invoice.__table__
+        changed = invoices.c.ID == "invoice1"
+        update = (
+            invoices.update()
+            .where(changed)
+            .values(INVOICE_STATUS="4IX", UPDATED_DATE=datetime(2100, 1, 1))
+        )
+        with staging_db.source.begin() as conn:
+            assert conn.execute(update).rowcount == 1
+        # execution
+        results = {r.table: r for r in staging_db.sync()}
+        # validation
+        for table, result in results.items():
+            assert result.incremental == (table in WATERMARKS)
+        # the changed invoice and the two invoices modified at the watermark
+        assert results["INVOICE_HDR"].rows == 3
+        assert (
+            results["INVOICE_HDR"].rows
+            < count_rows(staging_db.source)["INVOICE_HDR"]
+        )
+        with staging_db.engine.connect() as conn:
+            query = sa.select(invoices.c.INVOICE_STATUS).where(changed)
+            assert conn.execute(query).scalar() == "4IX"
+        assert count_rows(staging_db.engine) == count_rows(staging_db.source)
+
+    def test_full_resync(self, staging_db):
+        """Tests that every table is copied in full when full=True"""
+        # setup
+        staging_db.sync()
+        # execution
+        results = staging_db.sync(full=True)
+        # validation
+        assert not any(result.incremental for result in results)
+        assert count_rows(staging_db.engine) == count_rows(staging_db.source)
+
+    def test_unsupported_staging_db(self, source_url):
+        """Tests that a staging database that isn't SQLite raises an error"""
+        with pytest.raises(ValueError):
+            StagingDatabase(
+                sa.create_engine(source_url), "postgresql://localhost/db"
+            )
+
+
+class TestCitiBuyStaging:
+    """Tests running the CitiBuy client's queries in staging mode"""
+
+    @pytest.mark.parametrize(
+        "method", ["get_invoices", "get_receipts", "get_purchase_orders"]
+    )
+    def test_staged_queries(self, source_url, staging_url, method):
+        """Tests that the queries return the same rows from the staging
+        database as they do from the source database
+
+        Validates the following conditions:
+        - The staging database is synced the first time it's queried
+        - The queries are run against the staging database
+        - The rows match the rows returned by the source database
+        """
+        # setup
+        config = Dynaconf(citibuy_staging_url=staging_url)
+        source = CitiBuy(config=config, conn_url=source_url)
+        staged = CitiBuy(config=config, conn_url=source_url, staging=True)
+        assert source.staging is None
+        assert staged.engine is staged.staging.engine
+        # execution
+        expected = getattr(source, method)().records
+        output = getattr(staged, method)().records
+        # validation
+        assert staged.staging.is_synced
+        assert str(staged.engine.url) == staging_url
+        assert output == expected
+
+    @pytest.mark.parametrize("max_age,status", [(0, "4IX"), (3600, "4IP")])
+    def test_sync_each_run(self, source_url, staging_url, max_age, status):
+        """Tests that each client syncs the staging database on its first
+        query unless it was synced within citibuy_staging_max_age seconds
+
+        Validates the following conditions:
+        - A later run picks up the rows changed in the source database
+        - A run within max_age of the last sync reads the existing copy
+        """
+        # setup
+        config = Dynaconf(
+            citibuy_staging_url=staging_url,
+            citibuy_staging_max_age=max_age,
+        )
+        invoices = models.Invoice.__table__
+        changed = invoices.c.ID == "invoice1"
+        update = (
+            invoices.update()
+            .where(changed)
+            .values(INVOICE_STATUS="4IX", UPDATED_DATE=datetime(2100, 1, 1))
+        )
+        first = CitiBuy(config=config, conn_url=source_url, staging=True)
+        first.get_invoices()
+        with sa.create_engine(source_url).begin() as conn:
+            conn.execute(update)
+        # execution
+        staged = CitiBuy(config=config, conn_url=source_url, staging=True)
+        staged.get_invoices()
+        # validation
+        with staged.engine.connect() as conn:
+            query = sa.select(invoices.c.INVOICE_STATUS).where(changed)
+            assert conn.execute(query).scalar() == status
+
+    def test_execute_stmt_source(self, source_url, staging_url):
+        """Tests that execute_stmt() runs against the source database unless
+        staged=True is passed
+        """
+        # setup
+        config = Dynaconf(citibuy_staging_url=staging_url)
+        staged = CitiBuy(config=config, conn_url=source_url, staging=True)
+        query = (
+            "SELECT name FROM sqlite_master "
+            "WHERE name = 'STAGING_SYNC_STATE'"
+        )
+        # execution
+        source_rows = staged.execute_stmt(query).rows
+        staged_rows = staged.execute_stmt(query, staged=True).rows
+        # validation
+        assert len(source_rows) == 0
+        assert len(staged_rows) == 1
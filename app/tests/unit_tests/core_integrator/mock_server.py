@@ -0,0 +1,141 @@
+"""Local stand-in for the CoreIntegrator website used to test HttpScraper
+
+The server mimics the ASP.NET pages that HttpScraper posts back to: each page
+issues a new __VIEWSTATE that must be posted back with the next request, and
+every page after the login page requires the session cookie it sets
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from dgs_fiscal.systems.core_integrator.constants import CORE_ELEMENTS
+
+USERNAME = "test_user"
+PASSWORD = "test_password"
+SESSION = "ASP.NET_SessionId=12345"
+REPORT = b"PK\x03\x04 mock excel export"
+LINK_TARGET = "ctl00$ContentPlaceHolder1$ReportListView$ctrl0$ReportLink"
+
+
+def name(element_id: str) -> str:
+    """Returns the ASP.NET form name for an element id"""
+    return element_id.replace("_", "$")
+
+
+def page(state: str, body: str) -> str:
+    """Returns an ASP.NET page with a form that posts back to itself"""
+    return f"""
+    <html><body>
+    <form method="post" action="./Default.aspx" id="aspnetForm">
+      <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{state}" />
+      <input type="hidden" name="__EVENTVALIDATION" value="{state}-valid" />
+      <input type="hidden" name="__EVENTTARGET" value="" />
+      <input type="hidden" name="__EVENTARGUMENT" value="" />
+      {body}
+    </form>
+    </body></html>
+    """
+
+
+def field(element_id: str, input_type: str = "text", value: str = "") -> str:
+    """Returns an input element with an ASP.NET id and name"""
+    return (
+        f'<input type="{input_type}" id="{element_id}" '
+        f'name="{name(element_id)}" value="{value}" />'
+    )
+
+
+LOGIN_PAGE = page(
+    "login",
+    field(CORE_ELEMENTS["username box"])
+    + field(CORE_ELEMENTS["password box"], "password")
+    + field(CORE_ELEMENTS["login button"], "submit", "Log In"),
+)
+HOME_PAGE = page(
+    "home",
+    f"""<a href="javascript:__doPostBack('{LINK_TARGET}','')">
+    {CORE_ELEMENTS["report name"]}</a>""",
+)
+PARAMS_PAGE = page(
+    "params",
+    field(CORE_ELEMENTS["date box"])
+    + field(CORE_ELEMENTS["view report"], "submit", "View Report"),
+)
+REPORT_PAGE = page(
+    "report",
+    field(CORE_ELEMENTS["date box"])
+    + field(CORE_ELEMENTS["export report"], "image"),
+)
+
+
+class MockCoreIntegrator(BaseHTTPRequestHandler):
+    """Request handler that serves each page of the mock CoreIntegrator site
+    and records each request that was made to it
+    """
+
+    requests = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serves the login page"""
+        self.requests.append(("GET", self.path, {}))
+        self._send(200, LOGIN_PAGE)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Serves the page that follows each postback"""
+        length = int(self.headers["Content-Length"])
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        data = {key: values[0] for key, values in form.items()}
+        self.requests.append(("POST", self.path, data))
+        state = data.get("__VIEWSTATE")
+        export = name(CORE_ELEMENTS["export report"]) + ".x"
+
+        # login page
+        if state == "login":
+            username = data.get(name(CORE_ELEMENTS["username box"]))
+            password = data.get(name(CORE_ELEMENTS["password box"]))
+            if (username, password) != (USERNAME, PASSWORD):
+                return self._send(200, LOGIN_PAGE)
+            return self._send(200, HOME_PAGE, cookie=SESSION)
+
+        # every other page requires the session cookie
+        if self.headers.get("Cookie") != SESSION:
+            return self._send(403, "Forbidden")
+        if state == "home" and data.get("__EVENTTARGET") == LINK_TARGET:
+            return self._send(200, PARAMS_PAGE)
+        if state == "params" and data.get(name(CORE_ELEMENTS["date box"])):
+            return self._send(200, REPORT_PAGE)
+        if state == "report" and export in data:
+            return self._send_report()
+        return self._send(400, "Invalid postback")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silences the request logs"""
+
+    def _send(self, status: int, html: str, cookie: str = None) -> None:
+        """Sends an HTML response"""
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if cookie:
+            self.send_header("Set-Cookie", f"{cookie}; path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_report(self) -> None:
+        """Sends the mock Excel export"""
+        self.send_response(200)
+        excel = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+        self.send_header("Content-Type", f"{excel}.sheet")
+        self.send_header("Content-Length", str(len(REPORT)))
+        self.end_headers()
+        self.wfile.write(REPORT)
+
+
+def start_server() -> ThreadingHTTPServer:
+    """Starts the mock CoreIntegrator server on an open local port"""
+    MockCoreIntegrator.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockCoreIntegrator)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,74 @@
+import time
+import threading
+
+import pytest
+
+from dgs_fiscal.systems.core_integrator.download import DownloadWatcher
+
+
+def simulate_download(download_path, delay=0.2):
+    """Mimics Chrome writing a download to a partial file then renaming it"""
+    partial = download_path.with_name(download_path.name + ".crdownload")
+    download_path.touch()  # Chrome creates an empty placeholder first
+    partial.write_bytes(b"partial")
+    time.sleep(delay)
+    partial.write_bytes(b"complete")
+    partial.replace(download_path)
+
+
+class TestDownloadWatcher:
+    """Tests the DownloadWatcher class"""
+
+    def test_wait_for_download(self, tmp_path):
+        """Tests that wait() returns once the partial download is renamed
+
+        Validates the following conditions:
+        - wait() doesn't return while the .crdownload file still exists
+        - The downloaded file has the complete contents
+        - The elapsed time is returned
+        - The observer stops promptly once the download is complete
+        """
+        # setup
+        download_path = tmp_path / "report.xlsx"
+        watcher = DownloadWatcher(download_path)
+        thread = threading.Thread(
+            target=simulate_download, args=(download_path,)
+        )
+        # execution
+        thread.start()
+        start = time.perf_counter()
+        elapsed = watcher.wait(timeout=10)
+        seconds = time.perf_counter() - start
+        thread.join()
+        # validation
+        assert download_path.read_bytes() == b"complete"
+        assert 0.1 < elapsed < 10
+        assert seconds - elapsed < 0.5  # the observer stops promptly
+
+    def test_wait_already_downloaded(self, tmp_path):
+        """Tests that wait() returns immediately if the download finished
+        before it was called
+        """
+        # setup
+        download_path = tmp_path / "report.xlsx"
+        download_path.write_bytes(b"complete")
+        # execution
+        start = time.perf_counter()
+        elapsed = DownloadWatcher(download_path).wait(timeout=10)
+        seconds = time.perf_counter() - start
+        # validation
+        assert elapsed < 0.1
+        assert seconds < 0.1
+
+    def test_wait_timeout(self, tmp_path):
+        """Tests that wait() raises a FileNotFoundError if the download
+        doesn't complete before the timeout
+        """
+        # setup
+        download_path = tmp_path / "report.xlsx"
+        download_path.touch()
+        partial = tmp_path / "report.xlsx.crdownload"
+        partial.touch()
+        # validation
+        with pytest.raises(FileNotFoundError):
+            DownloadWatcher(download_path).wait(timeout=0.2)
@@ -0,0 +1,152 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from dgs_fiscal.systems.core_integrator.formulas import (
+    FormulaEvaluator,
+    UnsupportedFormula,
+    recalculate,
+)
+
+LINK = "https://coreintegrator.test/workspace.aspx?repo=Baltimore&exid=25"
+
+
+@pytest.fixture(name="worksheet")
+def fixture_worksheet():
+    """Creates a worksheet with a mix of values and formulas"""
+    worksheet = Workbook().active
+    worksheet.append(["Execution ID", "Amount", "Label"])
+    worksheet.append([f'=HYPERLINK("{LINK}","25")', 10.5, '="ID "&A2'])
+    other = worksheet.parent.create_sheet("Other Sheet")
+    other.append(["Total", 4])
+    return worksheet
+
+
+class TestFormulaEvaluator:
+    """Tests the FormulaEvaluator class"""
+
+    @pytest.mark.parametrize(
+        "formula,expected",
+        [
+            (f'=HYPERLINK("{LINK}","25")', "25"),
+            (f'=HYPERLINK("{LINK}")', LINK),
+            ('=CONCATENATE("a", "b", 1)', "ab1"),
+            ('="say ""hi"""', 'say "hi"'),
+            ("=1+2*3", 7),
+            ("=(1+2)*3", 9),
+            ("=B2*2", 21),
+            ("=$C$2", "ID 25"),
+            ("=TRUE", True),
+            ("=-B2", -10.5),
+            ("=-(1+2)*3", -9),
+            ("='Other Sheet'!B1*2", 8),
+            ("=#N/A", "#N/A"),
+            ('=CONCATENATE("a", #N/A)', "#N/A"),
+            ("=1/0", "#DIV/0!"),
+            ('="a"*2', "#VALUE!"),
+        ],
+    )
+    def test_evaluate(self, worksheet, formula, expected):
+        """Tests that evaluate() returns the value Excel would calculate"""
+        # setup
+        evaluator = FormulaEvaluator(worksheet)
+        # execution
+        value = evaluator.evaluate(formula)
+        # validation
+        assert value == expected
+
+    @pytest.mark.parametrize(
+        "formula",
+        [
+            "=SUM(B2:B3)",
+            "=B2>1",
+            "=B2%",
+            "=Missing!A1",
+            "=[1]Sheet1!A1",
+            "=HYPERLINK()",
+            '=HYPERLINK("a", "b", "c")',
+        ],
+    )
+    def test_evaluate_unsupported(self, worksheet, formula):
+        """Tests that evaluate() raises UnsupportedFormula for functions,
+        operators, and references that aren't supported
+        """
+        # setup
+        evaluator = FormulaEvaluator(worksheet)
+        # validation
+        with pytest.raises(UnsupportedFormula):
+            evaluator.evaluate(formula)
+
+    @pytest.mark.parametrize(
+        "cells",
+        [{"D2": "=D2+1"}, {"D2": "=E2*2", "E2": "='Other Sheet'!C1"}],
+    )
+    def test_evaluate_circular(self, worksheet, cells):
+        """Tests that circular references raise UnsupportedFormula instead of
+        a RecursionError
+        """
+        # setup
+        worksheet.parent["Other Sheet"]["C1"] = "=Sheet!D2"
+        for coordinate, formula in cells.items():
+            worksheet[coordinate] = formula
+        evaluator = FormulaEvaluator(worksheet)
+        # validation
+        with pytest.raises(UnsupportedFormula):
+            evaluator.evaluate("=D2")
+        assert ("Sheet", "D2") in evaluator.unsupported
+
+    def test_evaluate_memoized(self, worksheet):
+        """Tests that each formula cell is evaluated once and its value is
+        reused by the formulas that reference it
+        """
+        # setup
+        evaluator = FormulaEvaluator(worksheet)
+        evaluator.evaluate("=C2")
+        worksheet["A2"] = "changed"  # only read if C2 is evaluated again
+        # execution
+        value = evaluator.evaluate("=C2&A2")
+        # validation
+        assert evaluator.values[("Sheet", "C2")] == "ID 25"
+        assert value == "ID 25changed"
+
+
+def test_recalculate(worksheet, tmp_path):
+    """Tests that recalculate() replaces each formula with its value
+
+    Validates the following conditions:
+    - The formulas are replaced by their values in the saved workbook
+    - Cells without formulas are unchanged
+    """
+    # setup
+    file = tmp_path / "report.xlsx"
+    worksheet.parent.save(file)
+    # execution
+    unsupported = recalculate(file)
+    values = list(load_workbook(file).active.values)
+    # validation
+    assert unsupported == []
+    assert values[1] == ("25", 10.5, "ID 25")
+
+
+def test_recalculate_unsupported(worksheet, tmp_path):
+    """Tests that recalculate() falls back to the cached values of the
+    formulas it doesn't support instead of failing
+
+    Validates the following conditions:
+    - The cells with unsupported formulas, the cells that reference them,
+      and circular references are returned
+    - Those cells are replaced with their cached value, which is blank for
+      workbooks saved by openpyxl
+    - The supported formulas are still replaced by their values
+    """
+    # setup
+    worksheet["D2"] = "=SUM(B2:B3)"
+    worksheet["E2"] = "=D2+1"
+    worksheet["F2"] = "=F2+1"
+    file = tmp_path / "report.xlsx"
+    worksheet.parent.save(file)
+    # execution
+    unsupported = recalculate(file)
+    values = list(load_workbook(file).active.values)
+    # validation
+    assert unsupported == ["Sheet!D2", "Sheet!E2", "Sheet!F2"]
+    assert values[1] == ("25", 10.5, "ID 25", None, None, None)
@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+
+from dgs_fiscal.systems.core_integrator import CoreIntegrator
+from dgs_fiscal.systems.core_integrator.http_scraper import HttpScraper
+from dgs_fiscal.systems.core_integrator.constants import CORE_ELEMENTS
+from tests.unit_tests.core_integrator import mock_server
+
+
+@pytest.fixture(scope="module", name="server")
+def fixture_server():
+    """Runs the mock CoreIntegrator website for the tests in this module"""
+    server = mock_server.start_server()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(name="config")
+def fixture_config(server):
+    """Returns the config settings that point to the mock CoreIntegrator"""
+    mock_server.MockCoreIntegrator.requests.clear()
+    host, port = server.server_address
+    return {
+        "core_url": f"http://{host}:{port}/Login.aspx",
+        "core_username": mock_server.USERNAME,
+        "core_password": mock_server.PASSWORD,
+        "core_backend": "http",
+    }
+
+
+class TestHttpScraper:
+    """Tests the HttpScraper class against the mock CoreIntegrator website"""
+
+    def test_export_report(self, config, tmp_path):
+        """Tests that export_report() downloads the report without a browser
+
+        Validates the following conditions:
+        - The exported report is saved to the file path
+        - The __VIEWSTATE from each page is posted back with the next request
+        - Today's date is entered in the date field
+        - No partial download is left behind
+        """
+        # setup
+        file_path = tmp_path / "report.xlsx"
+        date_field = mock_server.name(CORE_ELEMENTS["date box"])
+        # execution
+        output = HttpScraper().export_report(file_path, config)
+        posts = mock_server.MockCoreIntegrator.requests
+        states = [data.get("__VIEWSTATE") for _, _, data in posts]
+        # validation
+        assert output == file_path
+        assert file_path.read_bytes() == mock_server.REPORT
+        assert states == [None, "login", "home", "params", "report"]
+        assert posts[3][2][date_field] == date.today().strftime("%m/%d/%Y")
+        assert list(tmp_path.iterdir()) == [file_path]
+
+    def test_export_report_bad_login(self, config, tmp_path):
+        """Tests that export_report() raises a PermissionError when the
+        credentials are rejected
+        """
+        # setup
+        config["core_password"] = "wrong_password"
+        # validation
+        with pytest.raises(PermissionError):
+            HttpScraper().export_report(tmp_path / "report.xlsx", config)
+
+
+def test_scrape_report_http_backend(config, tmp_path):
+    """Tests that CoreIntegrator.scrape_report() uses HttpScraper when the
+    core_backend setting is "http"
+    """
+    # setup
+    scraper = CoreIntegrator(tmp_path)
+    # execution
+    file = scraper.scrape_report(config, attempts=1)
+    # validation
+    assert file == scraper.file_path
+    assert file.read_bytes() == mock_server.REPORT
+    assert scraper.download_time is not None
@@ -1,4 +1,101 @@
+# pylint: disable=unused-argument
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from selenium.common.exceptions import TimeoutException
+
+from dgs_fiscal.systems.core_integrator import scraper
 from dgs_fiscal.systems.core_integrator.scraper import CoreIntegrator
+from dgs_fiscal.systems.core_integrator.driver import Driver
+
+CONFIG = {"core_url": "https://core.test", "core_username": "user"}
+SAMPLE_REPORT = (
+    Path(__file__).parents[2]
+    / "integration_tests"
+    / "prompt_payment"
+    / "new_report_input.xlsx"
+)
+
+
+class MockSession:
+    """Mock version of the selenium webdriver wrapped by Driver"""
+
+    session_id = "12345"
+
+
+class MockDriver:
+    """Mock version of the Driver class that doesn't open a browser"""
+
+    instances = []
+
+    def __init__(self, download_dir, config, headless=None):
+        """Mock version of Driver.__init__() that records each instance"""
+        self.driver = MockSession()
+        self.headless = headless
+        self.logged_in = False
+        self.saved_cookies = None
+        self.instances.append(self)
+
+    @property
+    def is_alive(self):
+        """Mock version of Driver.is_alive"""
+        return self.driver.session_id is not None
+
+    def get(self, url):
+        """Mock version of Driver.get()"""
+
+    def is_present(self, locator, loc_type="id"):
+        """Mock version of Driver.is_present() that checks for the report
+        link, which is only present once the browser is logged in
+        """
+        return self.logged_in
+
+    def load_cookies(self, cookie_path):
+        """Mock version of Driver.load_cookies()"""
+        return False
+
+    def save_cookies(self, cookie_path):
+        """Mock version of Driver.save_cookies()"""
+        self.saved_cookies = cookie_path
+
+    def quit(self):
+        """Mock version of Driver.quit()"""
+        self.driver.session_id = None
+
+
+@pytest.fixture(name="mock_scraper")
+def fixture_mock_scraper(tmp_path, monkeypatch):
+    """Creates a CoreIntegrator instance that uses MockDriver and fails to
+    access the report on its first attempt
+    """
+    MockDriver.instances = []
+    calls = {"login": 0, "access": 0}
+
+    def mock_login(self, config, reuse_session=False):
+        calls["login"] += 1
+        self.driver.logged_in = True
+
+    def mock_access_report(self):
+        calls["access"] += 1
+        if calls["access"] == 1:
+            raise TimeoutException("Report didn't load")
+
+    def mock_rename_download(self):
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file_path.touch()
+
+    monkeypatch.setattr(scraper, "Driver", MockDriver)
+    monkeypatch.setattr(CoreIntegrator, "_login", mock_login)
+    monkeypatch.setattr(CoreIntegrator, "_access_report", mock_access_report)
+    monkeypatch.setattr(
+        CoreIntegrator, "_rename_download", mock_rename_download
+    )
+    core = CoreIntegrator(tmp_path)
+    core.calls = calls
+    return core
 
 
 class TestCoreIntegrator:
@@ -10,3 +107,118 @@ class TestCoreIntegrator:
         CoreIntegrator()
         # validation
         assert 1
+
+    def test_scrape_new_session_per_attempt(self, mock_scraper):
+        """Tests that scrape_report() opens a new browser for each attempt
+        when reuse_session is False
+
+        Validates the following conditions:
+        - A new Driver is created for each attempt
+        - Each browser is closed after its attempt
+        """
+        # execution
+        file = mock_scraper.scrape_report(CONFIG, attempts=3, headless=True)
+        # validation
+        assert file == mock_scraper.file_path
+        assert len(MockDriver.instances) == 2
+        assert mock_scraper.calls["login"] == 2
+        for driver in MockDriver.instances:
+            assert driver.headless is True
+            assert driver.driver.session_id is None
+        assert mock_scraper.driver is None
+
+    def test_scrape_reuse_session(self, mock_scraper):
+        """Tests that scrape_report() keeps a single browser open across
+        attempts when reuse_session is True
+
+        Validates the following conditions:
+        - Only one Driver is created across both attempts
+        - The session cookies are saved after a successful scrape
+        - The browser is closed once the report is scraped
+        """
+        # execution
+        file = mock_scraper.scrape_report(
+            CONFIG,
+            attempts=3,
+            reuse_session=True,
+        )
+        driver = MockDriver.instances[0]
+        # validation
+        assert file == mock_scraper.file_path
+        assert len(MockDriver.instances) == 1
+        assert driver.saved_cookies == mock_scraper.cookie_path
+        assert driver.driver.session_id is None
+
+    def test_login_skipped_when_logged_in(self, monkeypatch, tmp_path):
+        """Tests that _login() skips the login form when the browser session
+        is still logged in and reuse_session is True
+        """
+        # setup
+        core = CoreIntegrator(tmp_path)
+        core.driver = MockDriver(tmp_path, CONFIG)
+        core.driver.logged_in = True
+        # execution - MockDriver has no form methods, so this fails if called
+        core._login(CONFIG, reuse_session=True)
+
+    def test_load_report(self, tmp_path):
+        """Tests that load_report() calculates the formulas in the report
+        without opening Excel
+
+        Validates the following conditions:
+        - It returns a dataframe
+        - The values in the Execution ID column are populated
+        """
+        # setup
+        core = CoreIntegrator(tmp_path)
+        core.file_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(SAMPLE_REPORT, core.file_path)
+        # execution
+        df = core.load_report()
+        # validation
+        assert isinstance(df, pd.DataFrame)
+        assert all(pd.notna(df["Execution ID"]))
+        assert df["Execution ID"].iloc[0] == 25
+
+    def test_load_report_unsupported_formula(self, tmp_path):
+        """Tests that load_report() warns about formulas the python engine
+        doesn't support instead of failing
+
+        Validates the following conditions:
+        - A warning is raised listing the unsupported cell
+        - The rest of the report is still loaded
+        """
+        # setup
+        core = CoreIntegrator(tmp_path)
+        core.file_path.parent.mkdir(parents=True, exist_ok=True)
+        workbook = load_workbook(SAMPLE_REPORT)
+        workbook.active["B2"] = "=SUM(C2:C3)"
+        workbook.save(core.file_path)
+        # execution
+        with pytest.warns(UserWarning, match="!B2"):
+            df = core.load_report()
+        # validation
+        assert df["Execution ID"].iloc[0] == 25
+
+    def test_load_report_unknown_engine(self, tmp_path):
+        """Tests that load_report() raises a ValueError for unknown engines"""
+        # setup
+        core = CoreIntegrator(tmp_path)
+        core.file_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(SAMPLE_REPORT, core.file_path)
+        # validation
+        with pytest.raises(ValueError):
+            core.load_report(engine="libreoffice")
+
+
+@pytest.mark.parametrize("headless", [True, False])
+def test_driver_options(headless, tmp_path):
+    """Tests that Driver.build_options() only adds the headless argument when
+    headless is True
+    """
+    # execution
+    driver = Driver.__new__(Driver)  # skips launching the browser
+    options = driver.build_options(tmp_path, headless)
+    prefs = options.experimental_options["prefs"]
+    # validation
+    assert ("--headless" in options.arguments) == headless
+    assert prefs["download.default_directory"] == str(tmp_path)
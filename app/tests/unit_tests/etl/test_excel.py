@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from dgs_fiscal.etl.excel import read_excel
+from dgs_fiscal.etl.prompt_payment import constants
+
+DATA_DIR = Path(__file__).parents[2] / "integration_tests" / "prompt_payment"
+REPORTS = [
+    (DATA_DIR / "new_report_input.xlsx", constants.NEW_REPORT["dtypes"]),
+    (DATA_DIR / "old_report_input.xlsx", constants.OLD_REPORT["dtypes"]),
+]
+
+
+@pytest.fixture(name="workbook")
+def fixture_workbook(tmp_path):
+    """Creates a workbook with blank rows and values pandas parses as NA"""
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(["ID", "Amount", "Note", None])
+    worksheet.append([1851.0, 10.5, "N/A", "extra"])
+    worksheet.append([None, None, None, None])
+    worksheet.append(["00048571", 20, "Paid", None])
+    file = tmp_path / "report.xlsx"
+    workbook.save(file)
+    return file
+
+
+class TestReadExcel:
+    """Tests the read_excel() function"""
+
+    @pytest.mark.parametrize("file,dtypes", REPORTS)
+    def test_matches_pandas(self, file, dtypes):
+        """Tests that the openpyxl engine returns the same dataframe as
+        pd.read_excel() for the sample Prompt Payment reports
+        """
+        # execution
+        expected = read_excel(file, dtypes, list(dtypes), engine="pandas")
+        df = read_excel(file, dtypes, list(dtypes), engine="openpyxl")
+        # validation
+        pd.testing.assert_frame_equal(df, expected[list(dtypes)])
+
+    def test_usecols_and_dtypes(self, workbook):
+        """Tests that read_excel() parses only the columns that were passed
+
+        Validates the following conditions:
+        - Only the columns in usecols are returned, in that order
+        - The dtypes are applied while the columns are parsed
+        - Whole number floats aren't read as strings like '1851.0'
+        - Blank rows are skipped and "N/A" is parsed as a missing value
+        """
+        # setup
+        dtypes = {"ID": "string", "Note": "string"}
+        # execution
+        df = read_excel(workbook, dtypes, usecols=["Note", "ID"])
+        # validation
+        assert list(df.columns) == ["Note", "ID"]
+        assert df["ID"].dtype == "string"
+        assert df["ID"].tolist() == ["1851", "00048571"]
+        assert df["Note"].isna().tolist() == [True, False]
+
+    def test_unnamed_columns(self, workbook):
+        """Tests that columns without a header are named the way pandas
+        names them and that columns without dtypes are inferred
+        """
+        # execution
+        df = read_excel(workbook)
+        # validation
+        assert list(df.columns) == ["ID", "Amount", "Note", "Unnamed: 3"]
+        assert df["Amount"].dtype == "float64"
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"usecols": ["Missing"]}, {"engine": "xlrd"}],
+    )
+    def test_errors(self, workbook, kwargs):
+        """Tests that read_excel() raises a ValueError for missing columns
+        and unknown engines
+        """
+        # validation
+        with pytest.raises(ValueError):
+            read_excel(workbook, **kwargs)
+
+    @pytest.mark.parametrize("file,dtypes", REPORTS)
+    def test_calamine(self, file, dtypes):
+        """Tests that the calamine engine matches the openpyxl engine"""
+        # setup
+        pytest.importorskip("python_calamine")
+        # execution
+        expected = read_excel(file, dtypes, list(dtypes), engine="openpyxl")
+        df = read_excel(file, dtypes, list(dtypes), engine="calamine")
+        # validation
+        pd.testing.assert_frame_equal(df, expected)
@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from dgs_fiscal.etl.prompt_payment import utils
+
+STAFF = {"Fiscal": ["Rose Carter", "Troy Parrish"], "Fleet": ["Asia Ali"]}
+
+
+@pytest.mark.parametrize(
+    "name,division",
+    [
+        ("Rose Carter", "Fiscal"),
+        ("Rose Carter, Troy Parrish", "Fiscal"),
+        ("Rose Carter,Asia Ali", "Multiple people listed"),
+        ("Asia Ali, Mickey Mouse", "Multiple people listed"),
+        ("Rose Carter, Troy Parrish, Mickey Mouse", "Multiple people listed"),
+        ("Mickey Mouse, Minnie Mouse", "Multiple people listed"),
+        ("Mickey Mouse", "No matching division"),
+        (None, "No matching division"),
+    ],
+)
+def test_update_division(name, division):
+    """Tests that update_division() resolves each comma-separated name to its
+    division and flags rows whose names don't all match the same division
+    """
+    # setup
+    df = pd.DataFrame({"DGS Name": pd.array([name], dtype="string")})
+    # execution
+    output = utils.update_division(df, STAFF)
+    # validation
+    assert output["Division"].tolist() == [division]
+
+
+def test_update_division_index():
+    """Tests that update_division() assigns divisions by position so that
+    duplicate index labels, like those left by merges, are handled
+    """
+    # setup
+    df = pd.DataFrame(
+        {"DGS Name": ["Asia Ali", "Troy Parrish", "Rose Carter"]},
+        index=[3, 3, 1],
+    )
+    # execution
+    output = utils.update_division(df, STAFF)
+    # validation
+    assert output["Division"].tolist() == ["Fleet", "Fiscal", "Fiscal"]
+
+
+def test_column_widths():
+    """Tests that column_widths() fits each column to its longest value or
+    header within the min and max widths
+    """
+    # setup
+    df = pd.DataFrame(
+        {
+            "Comments": ["short", "x" * 100],
+            "Vendor ID": ["00048571", None],
+            "A": [1, 22],
+        }
+    )
+    # execution
+    widths = utils.column_widths(df)
+    # validation
+    assert widths.to_dict() == {"Comments": 80, "Vendor ID": 11, "A": 10}
+
+
+def test_format_workbook(tmp_path):
+    """Tests that format_workbook() formats the Prompt Payment sheet
+
+    Validates the following conditions:
+    - Days Since Creation is hidden
+    - The highlighted columns have conditional formatting
+    - Current Status has a dropdown of the validation options
+    - The header row is frozen and the data is filtered
+    """
+    # setup
+    file = tmp_path / "report.xlsx"
+    df = pd.DataFrame(
+        {
+            "Vendor ID": ["00048571", "00001928"],
+            "Days Since Creation": [10, 40],
+            "Current Status": ["Paid", None],
+            "Age of Invoice": [5, 50],
+        }
+    )
+    # execution
+    with pd.ExcelWriter(file, engine="xlsxwriter") as writer:
+        df.to_excel(writer, sheet_name="Prompt Payment", index=False)
+        utils.format_workbook(writer, df)
+    worksheet = load_workbook(file)["Prompt Payment"]
+    highlights = [str(rule.sqref) for rule in worksheet.conditional_formatting]
+    dropdowns = worksheet.data_validations.dataValidation
+    # validation
+    assert worksheet.column_dimensions["B"].hidden
+    assert sorted(highlights) == ["B2:B1048576", "D2:D1048576"]
+    assert [str(dropdown.sqref) for dropdown in dropdowns] == ["C2:C1048576"]
+    assert "Paid" in dropdowns[0].formula1
+    assert worksheet.freeze_panes == "A2"
+    assert worksheet.auto_filter.ref == "A1:D3"
@@ -27,6 +27,10 @@ class MockContractManagement:
         """Mock version of update_po_list() for CLI tests"""
         return UpdateResult(mapping={}, upserts={}, results={})
 
+    def query_report(self):
+        """Mock version of query_report() for CLI tests"""
+        return None
+
 
 class MockAgingReport:
     """Mock version of ContractManagement class for CLI tests"""
@@ -44,3 +48,7 @@ class MockAgingReport:
     def update_sharepoint(self, df: pd.DataFrame, report_name: str):
         """Mock version of update_po_list() for CLI tests"""
         print(report_name)
+
+    def query_report(self):
+        """Mock version of query_report() for CLI tests"""
+        return None
@@ -1,12 +1,29 @@
+import sys
+import json
 import subprocess
 
 import pytest
 from typer.testing import CliRunner
 
 from dgs_fiscal import etl
+from dgs_fiscal.config import settings
 from dgs_fiscal.runner import app
 from tests.unit_tests.runner import mock_etl
 
+# dependencies each command should be able to start without importing
+HEAVY_DEPS = ("pandas", "sqlalchemy", "pyodbc", "O365", "selenium", "xlwings")
+COMMAND_DEPS = {
+    "aging_report": ("pyodbc", "selenium", "xlwings"),
+    "contract_management": ("pyodbc", "selenium", "xlwings"),
+    "prompt_payment": ("pyodbc", "sqlalchemy", "xlwings"),
+}
+IMPORT_SCRIPT = """
+import sys, json
+from dgs_fiscal import etl
+import dgs_fiscal.etl.{command}
+print(json.dumps(list(sys.modules)))
+"""
+
 
 @pytest.fixture(scope="module", name="runner")
 def fixture_cli_runner():
@@ -14,6 +31,24 @@ def fixture_cli_runner():
     return CliRunner()
 
 
+@pytest.fixture(name="metrics_dir", autouse=True)
+def fixture_metrics_dir(tmp_path):
+    """Writes the metrics for each command to a temporary directory"""
+    old_dir = settings.get("metrics_dir")
+    settings.set("metrics_dir", str(tmp_path))
+    yield tmp_path
+    settings.set("metrics_dir", old_dir)
+
+
+@pytest.fixture(name="profile_dir")
+def fixture_profile_dir(tmp_path):
+    """Saves the cProfile stats for each command to a temporary directory"""
+    old_dir = settings.get("profile_dir")
+    settings.set("profile_dir", str(tmp_path / "profiles"))
+    yield tmp_path / "profiles"
+    settings.set("profile_dir", old_dir)
+
+
 @pytest.fixture(name="contract_etl")
 def fixture_contract_mgmt_etl(monkeypatch):
     """Monkeypatches the ContractManagement ETL class with the test class
@@ -52,6 +87,48 @@ def test_entrypoint():
     assert "Hello, Billy" in stdout
 
 
+def test_help_startup():
+    """Tests that `dgs_fiscal --help` starts without the heavy dependencies
+
+    Validates the following conditions:
+    - The command executes with exit code 0 (success)
+    - None of the heavy dependencies are imported by the runner module
+    """
+    # execution
+    output = subprocess.run(
+        ["dgs_fiscal", "--help"],
+        check=True,
+        capture_output=True,
+    )
+    script = "import sys, dgs_fiscal; print(' '.join(sys.modules))"
+    modules = subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+    ).stdout.decode("utf-8")
+    # validation
+    assert output.returncode == 0
+    for dep in HEAVY_DEPS:
+        assert dep not in modules.split()
+
+
+@pytest.mark.parametrize("command", COMMAND_DEPS.keys())
+def test_command_startup(command):
+    """Tests that each command imports its workflow without importing the
+    dependencies of the other workflows
+    """
+    # execution
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(command=command)],
+        check=True,
+        capture_output=True,
+    )
+    modules = json.loads(output.stdout.decode("utf-8"))
+    # validation
+    for dep in COMMAND_DEPS[command]:
+        assert dep not in modules
+
+
 def test_hello(runner):
     """Tests that the hello command executes correctly
 
@@ -116,3 +193,101 @@ def test_aging_report(runner, aging_etl):  # pylint: disable=unused-argument
     assert result.exit_code == 0
     for message in messages:
         assert message in result.stdout
+
+
+def test_command_metrics(
+    runner, contract_etl, metrics_dir
+):  # pylint: disable=unused-argument
+    """Tests that the metrics for a command are written once it finishes
+
+    Validates the following conditions:
+    - The path to the metrics file is printed to the console
+    - A JSON record with the time spent in the command is appended
+    """
+    # execution
+    result = runner.invoke(app, ["contract_management"])
+    file = metrics_dir / "metrics.jsonl"
+    records = [json.loads(line) for line in file.read_text().splitlines()]
+    # validation
+    assert result.exit_code == 0
+    assert f"Metrics written to {file}" in result.stdout
+    assert records[0]["command"] == "contract_management"
+    assert records[0]["name"] == "contract_management"
+    assert records[0]["type"] == "timing"
+
+
+def test_profile_option(runner, profile_dir):
+    """Tests that the --profile option profiles the command
+
+    Validates the following conditions:
+    - The command executes with exit code 0 (success)
+    - The cProfile stats are saved to the profile directory
+    - The hottest functions are printed to the console
+    """
+    # execution
+    result = runner.invoke(app, ["--profile", "hello", "Billy"])
+    files = list(profile_dir.glob("hello_*.pstats"))
+    # validation
+    assert result.exit_code == 0
+    assert "Hello, Billy" in result.stdout
+    assert len(files) == 1
+    assert f"Profile written to {files[0]}" in result.stdout
+    assert "hello_world" in result.stdout
+
+
+def test_trace_memory_option(runner):
+    """Tests that the --trace-memory option reports the memory allocated"""
+    # execution
+    result = runner.invoke(app, ["--trace-memory", "hello", "Billy"])
+    # validation
+    assert result.exit_code == 0
+    assert "Peak memory allocated" in result.stdout
+    assert "Memory allocated by module" in result.stdout
+
+
+def test_citibuy_ddl(runner):
+    """Tests that the citibuy_ddl command prints the index DDL"""
+    # execution
+    result = runner.invoke(app, ["citibuy_ddl", "--dialect", "sqlite"])
+    # validation
+    assert result.exit_code == 0
+    assert 'CREATE INDEX "IX_INVOICE_HDR_UPDATED_DATE"' in result.stdout
+
+
+def test_citibuy_sync(runner, mock_db, tmp_path):
+    """Tests that the citibuy_sync command syncs the staging database
+
+    Validates the following conditions:
+    - Each table is copied from the database passed to --conn-url
+    - The staging database is created at the citibuy_staging_url setting
+    """
+    # setup
+    old_url = settings.get("citibuy_staging_url")
+    staging_db = tmp_path / "staging.db"
+    settings.set("citibuy_staging_url", f"sqlite:///{staging_db}")
+    # execution
+    try:
+        result = runner.invoke(
+            app, ["citibuy_sync", "--conn-url", mock_db, "--full"]
+        )
+    finally:
+        settings.set("citibuy_staging_url", old_url)
+    # validation
+    assert result.exit_code == 0
+    assert "INVOICE_HDR: copied" in result.stdout
+    assert staging_db.exists()
+
+
+def test_refresh_cache_option(runner):
+    """Tests that --refresh-cache bypasses the CitiBuy query cache"""
+    # setup
+    old_value = settings.get("citibuy_cache_refresh")
+    # execution
+    try:
+        result = runner.invoke(app, ["--refresh-cache", "hello", "Test"])
+        refresh = settings.get("citibuy_cache_refresh")
+    finally:
+        settings.set("citibuy_cache_refresh", old_value)
+    # validation
+    assert result.exit_code == 0
+    assert refresh is True
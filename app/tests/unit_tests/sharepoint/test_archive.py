@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from dgs_fiscal.systems.sharepoint.archive import ArchiveFolder
+
+
+@pytest.fixture(name="archive")
+def fixture_archive(tmp_path):
+    """Creates an ArchiveFolder that exports to a temporary directory"""
+    return ArchiveFolder(folder=None, archive_dir=tmp_path)
+
+
+@pytest.fixture(name="df")
+def fixture_df():
+    """Returns a dataframe with missing values of several dtypes"""
+    return pd.DataFrame(
+        {
+            "Invoice": pd.array(["INV1", pd.NA, "INV3"], dtype="string"),
+            "Amount": [10.5, None, 30.0],
+            "Invoice Date": pd.to_datetime(["2021-01-01", None, "2021-03-01"]),
+            "Paid": [True, False, True],
+        }
+    )
+
+
+class TestExportDataframe:
+    """Tests the ArchiveFolder.export_dataframe() method"""
+
+    @pytest.mark.parametrize("constant_memory", [True, False])
+    def test_export_dataframe(self, archive, df, constant_memory):
+        """Tests that both export modes write the same data to Excel"""
+        # execution
+        file = archive.export_dataframe(df, "test.xlsx", constant_memory)
+        output = pd.read_excel(file)
+        # validation
+        assert file == archive.tmp_dir / "test.xlsx"
+        assert output["Invoice"].tolist()[::2] == ["INV1", "INV3"]
+        assert output["Amount"].isna().tolist() == [False, True, False]
+        assert output["Invoice Date"].tolist()[2] == pd.Timestamp("2021-3-1")
+        assert output["Paid"].tolist() == [True, False, True]
+
+    def test_constant_memory_styling(self, archive, df):
+        """Tests that the streamed export is styled like a table
+
+        Validates the following conditions:
+        - The header row is formatted and frozen
+        - The data has an autofilter and banded rows
+        """
+        # execution
+        file = archive.export_dataframe(df, "test.xlsx", constant_memory=True)
+        worksheet = load_workbook(file).active
+        rules = worksheet.conditional_formatting
+        # validation
+        assert worksheet["A1"].font.b
+        assert worksheet.freeze_panes == "A2"
+        assert worksheet.auto_filter.ref == "A1:D4"
+        assert [str(rule.sqref) for rule in rules] == ["A2:D4"]
+
+    def test_side_exports(self, archive, df):
+        """Tests that the dataframe is also saved in each side export format
+        and that unsupported formats raise a ValueError
+        """
+        # execution
+        archive.export_dataframe(df, "test.xlsx", side_exports=["csv"])
+        output = pd.read_csv(archive.tmp_dir / "test.csv")
+        # validation
+        assert output["Invoice"].tolist()[0] == "INV1"
+        with pytest.raises(ValueError):
+            archive.export_dataframe(df, "test.xlsx", side_exports=["json"])
@@ -0,0 +1,84 @@
+import pytest
+
+from dgs_fiscal.metrics import metrics
+from dgs_fiscal.systems.sharepoint import SharePoint
+from dgs_fiscal.systems.sharepoint.archive import ArchiveFolder
+from dgs_fiscal.systems.sharepoint.list import SiteList
+from tests.utils.mock_graph import MockGraph
+
+
+@pytest.fixture(name="mock_graph")
+def fixture_mock_graph():
+    """Returns a mock Graph API with a Reports folder in the Archive"""
+    mock_graph = MockGraph(items=[{"Title": "Alice"}])
+    mock_graph.add_folder("reports", "Reports", parent="archive")
+    mock_graph.add_file("reports", "old.txt", b"old")
+    return mock_graph
+
+
+@pytest.fixture(name="sharepoint")
+def fixture_sharepoint(mock_graph):
+    """Returns a SharePoint client whose requests are made to the mock"""
+    return mock_graph.sharepoint()
+
+
+class TestSharePoint:
+    """Tests the SharePoint client against the mock Graph API"""
+
+    def test_init(self, sharepoint):
+        """Tests that the SharePoint client uses the account passed to it"""
+        # validation
+        assert isinstance(sharepoint, SharePoint)
+        assert sharepoint.is_authenticated
+        assert sharepoint.site.object_id == sharepoint.config.site_id
+
+    def test_get_list(self, sharepoint):
+        """Tests that get_list() returns a SiteList with the list's items"""
+        # execution
+        site_list = sharepoint.get_list("list")
+        items = site_list.get_items()
+        # validation
+        assert isinstance(site_list, SiteList)
+        assert site_list.config is sharepoint.config
+        assert items.items[0].get_val("Title") == "Alice"
+
+    def test_get_item_by_path(self, sharepoint):
+        """Tests that get_item_by_path() returns the file at the path"""
+        # execution
+        file = sharepoint.get_item_by_path("/Archive/Reports/old.txt")
+        # validation
+        assert file.name == "old.txt"
+
+
+class TestArchiveFolder:
+    """Tests uploading and downloading files in the Archive folder"""
+
+    def test_upload_and_download(self, sharepoint, mock_graph, tmp_path):
+        """Tests that a file uploaded to an Archive sub-folder can be
+        downloaded as the most recent upload
+
+        Validates the following conditions:
+        - The sub-folders of the Archive are listed
+        - The file is uploaded to the sub-folder with its new name
+        - get_last_upload() returns the uploaded file
+        - The downloaded file has the same content as the uploaded file
+        - The bytes uploaded and downloaded are counted in the metrics
+        """
+        # setup
+        local_file = tmp_path / "report.txt"
+        local_file.write_bytes(b"new")
+        archive = sharepoint.get_archive_folder(tmp_path)
+        metrics.reset()
+        # execution
+        archive.upload_file(local_file, "Reports", "new.txt")
+        last_upload = archive.get_last_upload("Reports")
+        output = archive.download_file(last_upload, tmp_path / "downloads")
+        # validation
+        assert isinstance(archive, ArchiveFolder)
+        assert [folder.name for folder in archive.subfolders] == ["Reports"]
+        assert last_upload.name == "new.txt"
+        assert output.read_bytes() == b"new"
+        assert mock_graph.requests[-1][0] == "GET"
+        assert mock_graph.requests[-1][1].endswith("/content")
+        assert metrics.counters["sharepoint_bytes_uploaded"] == 3
+        assert metrics.counters["sharepoint_bytes_downloaded"] == 3
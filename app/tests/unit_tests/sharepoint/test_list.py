@@ -1,4 +1,23 @@
+import pytest
+from dynaconf import Dynaconf
+from O365.sharepoint import SharepointListItem
+
 from dgs_fiscal.systems.sharepoint import BatchedChanges
+from dgs_fiscal.systems.sharepoint import list as list_module
+from dgs_fiscal.systems.sharepoint.list import ItemCollection, ListItem
+from tests.utils.mock_graph import MockGraph
+
+ITEMS = [
+    {"Title": "Alice", "Status": "Open"},
+    {"Title": "Bob", "Status": "Open"},
+    {"Title": "Carol", "Status": "Paid"},
+]
+
+
+@pytest.fixture(name="mock_graph")
+def fixture_mock_graph():
+    """Returns a mock Graph API with two items on each page of results"""
+    return MockGraph(items=ITEMS, page_size=2)
 
 
 class TestBatchedChanges:
@@ -43,3 +62,140 @@ class TestBatchedChanges:
         # validation - adding items
         assert batch.updates == self.UPDATES
         assert batch.inserts == self.INSERTS
+
+
+class TestGetItems:
+    """Tests the SiteList.get_items() method and the ListItem class"""
+
+    def test_get_items(self, mock_graph):
+        """Tests that get_items() returns read-only ListItems for every page
+        of items returned by Graph API
+
+        Validates the following conditions:
+        - The items on each page are returned in an ItemCollection
+        - Each ListItem stores the id, eTag, and fields of the item
+        - No O365.SharepointListItem is created for the items
+        - The requested fields are expanded in the request
+        """
+        # setup
+        site_list = mock_graph.site_list()
+        # execution
+        output = site_list.get_items(fields=["Title"])
+        pages = [req for req in mock_graph.requests if "/items" in req[1]]
+        # validation
+        assert isinstance(output, ItemCollection)
+        assert [item.id for item in output.items] == ["1", "2", "3"]
+        assert [item.etag for item in output.items] == ["1.1", "2.1", "3.1"]
+        assert output.items[2].get_val("Title") == "Carol"
+        assert all(item._item is None for item in output.items)
+        assert not hasattr(output.items[0], "__dict__")
+        assert len(pages) == 2
+        assert pages[0][2]["expand"] == "fields(select=Title)"
+
+    def test_update(self, mock_graph):
+        """Tests that ListItem.update() promotes the item to an
+        O365.SharepointListItem and patches the changed fields
+        """
+        # setup
+        item = mock_graph.site_list().get_items().items[0]
+        # execution
+        item.update({"Status": "Paid"})
+        method, url, data = mock_graph.requests[-1]
+        # validation
+        assert isinstance(item, ListItem)
+        assert isinstance(item.item, SharepointListItem)
+        assert method == "PATCH"
+        assert url.endswith("/lists/list/items/1/fields")
+        assert data == {"Status": "Paid"}
+        assert mock_graph.items["1"]["fields"]["Status"] == "Paid"
+
+
+class TestBatchUpsert:
+    """Tests the SiteList.batch_upsert() method"""
+
+    def test_batch_upsert(self, mock_graph):
+        """Tests that batch_upsert() sends the updates and inserts in batches
+        of 20 requests
+
+        Validates the following conditions:
+        - The inserts and updates are split into batches of 20 requests
+        - The display names are replaced with the API names of the columns
+        - The responses to each batch are returned in BatchResults
+        """
+        # setup
+        site_list = mock_graph.site_list()
+        inserts = [{"Vendor ID": str(i)} for i in range(25)]
+        changes = BatchedChanges(
+            updates={"1": {"Status": "Paid"}}, inserts=inserts
+        )
+        # execution
+        results = site_list.batch_upsert(changes)
+        # validation
+        assert [len(batch) for batch in results.inserts] == [20, 5]
+        assert [len(batch) for batch in results.updates] == [1]
+        assert results.updates[0][0]["status"] == 200
+        assert mock_graph.items["1"]["fields"]["Status"] == "Paid"
+        assert mock_graph.items["28"]["fields"] == {"VendorID": "24"}
+
+    @pytest.mark.parametrize("retries", [10, 0])
+    def test_throttled_requests(self, retries):
+        """Tests that the requests in a batch that are throttled with a 429
+        response are resent up to graph_batch_retries times
+
+        Validates the following conditions:
+        - Only the throttled requests are resent in the next batch
+        - The responses are returned in the order the requests were made
+        - The 429 responses are returned once the retries are used up
+        """
+        # setup
+        mock_graph = MockGraph(throttle=0.5, seed=1)
+        config = Dynaconf(graph_batch_retries=retries)
+        site_list = mock_graph.site_list(config=config)
+        inserts = [{"Vendor ID": str(i)} for i in range(20)]
+        # execution
+        results = site_list.batch_upsert(BatchedChanges(inserts=inserts))
+        responses = results.inserts[0]
+        statuses = [res["status"] for res in responses]
+        batches = [
+            data["requests"]
+            for method, _, data in mock_graph.requests
+            if method == "POST"
+        ]
+        # validation
+        assert [res["id"] for res in responses] == [
+            str(i) for i in range(1, 21)
+        ]
+        assert len(batches[0]) == 20
+        if retries:
+            assert set(statuses) == {201}
+            assert len(mock_graph.items) == 20
+            assert len(batches) > 1
+            assert all(
+                len(b) < len(prev) for prev, b in zip(batches, batches[1:])
+            )
+        else:
+            assert 429 in statuses
+            assert len(mock_graph.items) == statuses.count(201)
+            assert len(batches) == 1
+
+    def test_throttled_unparsed_retry_after(self, monkeypatch):
+        """Tests that throttled requests are still resent when their
+        Retry-After header isn't a whole number of seconds
+
+        Validates the following conditions:
+        - The batch update doesn't fail on a fractional Retry-After value
+        - The delay between retries doubles on each attempt
+        """
+        # setup
+        waits = []
+        monkeypatch.setattr(list_module.time, "sleep", waits.append)
+        mock_graph = MockGraph(throttle=0.5, retry_after="1.5", seed=1)
+        config = Dynaconf(graph_batch_retries=10)
+        site_list = mock_graph.site_list(config=config)
+        inserts = [{"Vendor ID": str(i)} for i in range(20)]
+        # execution
+        results = site_list.batch_upsert(BatchedChanges(inserts=inserts))
+        # validation
+        assert {res["status"] for res in results.inserts[0]} == {201}
+        assert waits == [2.0**i for i in range(len(waits))]
+        assert len(waits) > 1
@@ -1,6 +1,16 @@
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import numpy as np
+import pandas as pd
 import pytest
 
-from dgs_fiscal.systems.sharepoint.utils import build_filter_str, col_api_name
+from dgs_fiscal.systems.sharepoint.utils import (
+    build_filter_str,
+    col_api_name,
+    retry_delay,
+    serialize_value,
+)
 
 COLS = {"Text Col": "TextCol", "Num Col": "NumCol"}
 
@@ -76,3 +86,72 @@ def test_col_api_name_error():
     # validation
     with pytest.raises(KeyError):
         col_api_name(COLS, "fake_col")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (pd.Timestamp("2021-07-01 12:30"), "2021-07-01T12:30:00Z"),
+        (np.datetime64("2021-07-01"), "2021-07-01T00:00:00Z"),
+        (datetime(2021, 7, 1), "2021-07-01T00:00:00Z"),
+        (date(2021, 7, 1), "2021-07-01T00:00:00Z"),
+        (pd.NaT, None),
+        (np.datetime64("NaT"), None),
+        (np.datetime64("NaT", "ns"), None),
+        (np.nan, None),
+        (np.float64("nan"), None),
+        (None, None),
+        (np.int64(5), 5),
+        ("P12345", "P12345"),
+    ],
+)
+def test_serialize_value(value, expected):
+    """Tests that serialize_value() converts values to JSON serializable types
+
+    Validates the following conditions:
+    - Dates and datetimes are converted to ISO strings
+    - Missing values are converted to None
+    - Numpy scalars are converted to Python types
+    - Other values are returned unchanged
+    """
+    # execution
+    output = serialize_value(value)
+    # validation
+    assert output == expected
+    assert type(output) is type(expected)
+
+
+@pytest.mark.parametrize(
+    "retry_after, attempt, expected",
+    [
+        ("5", 0, 5),
+        (" 0 ", 2, 0),
+        ("1.5", 0, 1),
+        ("soon", 2, 4),
+        (None, 1, 2),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0, 0),
+    ],
+)
+def test_retry_delay(retry_after, attempt, expected):
+    """Tests that retry_delay() falls back to an exponential delay when the
+    Retry-After header isn't a whole number of seconds or an HTTP-date
+
+    Validates the following conditions:
+    - Whole numbers of seconds are returned as they are
+    - Dates in the past return no delay
+    - Fractional, invalid, and missing values double on each attempt
+    """
+    # execution
+    output = retry_delay(retry_after, attempt)
+    # validation
+    assert output == expected
+
+
+def test_retry_delay_http_date():
+    """Tests that retry_delay() returns the seconds until an HTTP-date"""
+    # setup
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    # execution
+    output = retry_delay(format_datetime(retry_at, usegmt=True), 0)
+    # validation
+    assert 28 < output <= 30
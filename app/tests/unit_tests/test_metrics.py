@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from dynaconf import Dynaconf
+
+from dgs_fiscal.metrics import Metrics, metrics, timed
+
+
+@pytest.fixture(name="recorded")
+def fixture_recorded():
+    """Returns a Metrics instance with one timed step and two counters"""
+    recorded = Metrics()
+    with recorded.timer("extract"):
+        pass
+    recorded.increment("rows_fetched", 10)
+    recorded.increment("rows_fetched", 5)
+    recorded.increment("graph_requests")
+    return recorded
+
+
+class TestMetrics:
+    """Tests the Metrics class and the timed() decorator"""
+
+    def test_timer_and_increment(self, recorded):
+        """Tests that the timer records each call and the counters add up
+
+        Validates the following conditions:
+        - The time is recorded when the body of the with statement raises
+        - Each call to a step is counted
+        - The values passed to increment() are added to the counter
+        """
+        # execution
+        with pytest.raises(ValueError):
+            with recorded.timer("extract"):
+                raise ValueError
+        # validation
+        assert recorded.timings["extract"].calls == 2
+        assert recorded.timings["extract"].seconds >= 0
+        assert recorded.counters == {"rows_fetched": 15, "graph_requests": 1}
+
+    def test_timed(self):
+        """Tests that timed() records each call under the function's name or
+        the step name passed to it
+        """
+
+        # setup
+        @timed
+        def extract():
+            return "extracted"
+
+        @timed(step="load")
+        def upload():
+            return "uploaded"
+
+        metrics.reset()
+        # execution
+        output = [extract(), upload(), upload()]
+        # validation
+        assert output == ["extracted", "uploaded", "uploaded"]
+        step = "TestMetrics.test_timed.<locals>.extract"
+        assert metrics.timings[step].calls == 1
+        assert metrics.timings["load"].calls == 2
+        metrics.reset()
+
+    def test_write_json(self, recorded, tmp_path):
+        """Tests that the metrics are appended to metrics.jsonl"""
+        # setup
+        config = Dynaconf(metrics_format="json", metrics_dir=str(tmp_path))
+        # execution
+        recorded.write("aging_report", config)
+        file = recorded.write("aging_report", config)
+        records = [json.loads(line) for line in file.read_text().splitlines()]
+        # validation
+        assert file == tmp_path / "metrics.jsonl"
+        assert len(records) == 6
+        assert records[0]["type"] == "timing"
+        assert records[0]["calls"] == 1
+        assert records[1]["name"] == "rows_fetched"
+        assert records[1]["value"] == 15
+
+    def test_write_prometheus(self, recorded, tmp_path):
+        """Tests that the metrics are written as a Prometheus textfile
+
+        Validates the following conditions:
+        - The metrics are written to a .prom file named after the command
+        - Each step and counter is labeled with the command
+        - The temporary file is replaced by the .prom file
+        """
+        # setup
+        config = Dynaconf(metrics_format="prometheus", metrics_dir=tmp_path)
+        # execution
+        file = recorded.write("aging_report", config)
+        lines = file.read_text().splitlines()
+        # validation
+        assert file == tmp_path / "aging_report.prom"
+        assert list(tmp_path.iterdir()) == [file]
+        step = 'command="aging_report",step="extract"'
+        assert f"dgs_fiscal_step_calls{{{step}}} 1" in lines
+        assert (
+            'dgs_fiscal_rows_fetched_total{command="aging_report"} 15' in lines
+        )
+        assert "# TYPE dgs_fiscal_graph_requests_total counter" in lines
+
+    def test_write_unsupported_format(self, recorded, tmp_path):
+        """Tests that an unsupported metrics format raises a ValueError"""
+        # setup
+        config = Dynaconf(metrics_format="xml", metrics_dir=tmp_path)
+        # validation
+        with pytest.raises(ValueError):
+            recorded.write("aging_report", config)
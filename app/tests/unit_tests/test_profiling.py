@@ -0,0 +1,37 @@
+import time
+
+from dynaconf import Dynaconf
+
+from dgs_fiscal.profiling import CommandProfiler
+
+
+def module_mib(lines, module):
+    """Returns the MiB reported for a module in the memory report"""
+    for line in lines:
+        if line.strip().endswith(module):
+            return float(line.split()[0])
+    return 0.0
+
+
+def test_memory_report_peak():
+    """Tests that memory_report() breaks down the memory allocated by each
+    module at the peak rather than when the command finished
+
+    Validates the following conditions:
+    - The memory freed before the command finished is still reported
+    - The report is labeled as the sampled peak
+    """
+    # setup
+    profiler = CommandProfiler(
+        "test", trace_memory=True, config=Dynaconf(), sample_interval=0.01
+    )
+    # execution
+    profiler.start()
+    data = [str(i) for i in range(200_000)]  # roughly 10 MiB
+    time.sleep(0.2)
+    del data
+    lines = profiler.memory_report()
+    # validation
+    assert lines[0].startswith("Peak memory allocated")
+    assert lines[1].startswith("Memory allocated by module at the sampled")
+    assert module_mib(lines, __name__) > 5
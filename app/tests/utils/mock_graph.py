@@ -0,0 +1,369 @@
+"""In-process stand-in for the Graph API endpoints used by the SharePoint,
+SiteList, and ArchiveFolder classes
+
+MockGraph implements the get(), post(), put(), and patch() methods of the
+O365 Connection class, so the O365 classes wrapped by dgs_fiscal can be
+created with it and used without a network connection. It answers requests
+for the site, its lists and list items, the $batch endpoint, and the items in
+a document library, including file uploads and downloads.
+
+The latency of each request, the number of items on each page of results, and
+the share of the requests in a $batch request that are throttled with a 429
+response can be configured to test and benchmark batching and throttling.
+Throttling is only injected into $batch sub-requests because the O365
+Connection class retries other throttled requests on its own.
+"""
+from __future__ import annotations
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import count
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qs, unquote, urlparse
+
+from dynaconf import Dynaconf
+from O365.connection import MSGraphProtocol
+from O365.sharepoint import Sharepoint, SharepointList
+
+from dgs_fiscal.systems.sharepoint import SharePoint
+from dgs_fiscal.systems.sharepoint.list import SiteList
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+SITE_ID = "mock.sharepoint.com,12345,67890"
+DRIVE_ID = "mockdrive"
+ROOT_ID = "root"
+ARCHIVE_ID = "archive"
+DEFAULT_LIST = "list"
+COLUMNS = [
+    {"displayName": "Title", "name": "Title", "readOnly": False},
+    {"displayName": "Vendor ID", "name": "VendorID", "readOnly": False},
+    {"displayName": "Status", "name": "Status", "readOnly": False},
+    {"displayName": "Amount", "name": "Amount", "readOnly": False},
+]
+
+
+class MockResponse:
+    """Mocks the response returned by the O365 Connection class"""
+
+    def __init__(
+        self,
+        data: Optional[dict] = None,
+        status_code: int = 200,
+        content: bytes = b"",
+    ) -> None:
+        self.data = data or {}
+        self.status_code = status_code
+        self.content = content
+        self.reason = "OK" if self else "Error"
+
+    def __bool__(self) -> bool:
+        return self.status_code < 400
+
+    def __enter__(self) -> MockResponse:
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def json(self) -> dict:
+        """Returns the JSON body of the response"""
+        return self.data
+
+    def iter_content(self, chunk_size: int = 1024):
+        """Yields the content of the response in chunks"""
+        for i in range(0, len(self.content), chunk_size or 1024):
+            yield self.content[i : i + chunk_size]
+
+
+class MockAccount:
+    """Mocks the O365 Account class with an account that's always
+    authenticated and whose requests are made to a MockGraph
+    """
+
+    def __init__(self, graph: MockGraph) -> None:
+        self.graph = graph
+        self.is_authenticated = True
+
+    def sharepoint(self) -> Sharepoint:
+        """Returns the O365.Sharepoint instance for the mock tenant"""
+        return Sharepoint(con=self.graph, protocol=MSGraphProtocol())
+
+
+class MockGraph:  # pylint: disable=too-many-instance-attributes
+    """Mocks the O365 Connection class for a SharePoint site with lists and a
+    document library
+
+    Attributes
+    ----------
+    lists: Dict[str, Dict[str, dict]]
+        The JSON of the items in each list, keyed by list name and item id
+    columns: Dict[str, List[dict]]
+        The JSON of the columns in each list, keyed by list name
+    drive_items: Dict[str, dict]
+        The JSON of the files and folders in the document library, keyed by
+        item id
+    files: Dict[str, bytes]
+        The content of each file in the document library, keyed by item id
+    page_size: int
+        The maximum number of items returned on each page of results
+    latency: float
+        The number of seconds each request takes to return
+    throttle: float
+        The share of the requests in a $batch request that are throttled
+    retry_after: int or str
+        The value of the Retry-After header of throttled requests
+    requests: List[tuple]
+        The method, url, and params or body of each request that was made
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        columns: List[dict] = None,
+        items: List[dict] = None,
+        page_size: int = 999,
+        latency: float = 0.0,
+        throttle: float = 0.0,
+        retry_after: Union[int, str] = 0,
+        seed: int = 0,
+    ) -> None:
+        """Inits the MockGraph class"""
+        self.lists: Dict[str, Dict[str, dict]] = {}
+        self.columns: Dict[str, List[dict]] = {}
+        self.drive_items: Dict[str, dict] = {}
+        self.files: Dict[str, bytes] = {}
+        self.page_size = page_size
+        self.latency = latency
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.requests: List[tuple] = []
+        self.random = random.Random(seed)
+        self.ids = count(1)
+        self.lock = threading.Lock()
+        self.add_list(DEFAULT_LIST, columns, items)
+        self.add_folder(ROOT_ID, "root")
+        self.add_folder(ARCHIVE_ID, "Archive", parent=ROOT_ID)
+
+    @property
+    def items(self) -> Dict[str, dict]:
+        """Returns the items in the default list"""
+        return self.lists[DEFAULT_LIST]
+
+    @property
+    def config(self) -> Dynaconf:
+        """Returns the settings used to create SharePoint with this mock"""
+        return Dynaconf(
+            site_id=SITE_ID, drive_id=DRIVE_ID, archive_id=ARCHIVE_ID
+        )
+
+    def sharepoint(self) -> SharePoint:
+        """Returns a SharePoint client whose requests are made to this mock"""
+        return SharePoint(config=self.config, account=MockAccount(self))
+
+    def site_list(
+        self,
+        name: str = DEFAULT_LIST,
+        config: Dynaconf = None,
+    ) -> SiteList:
+        """Returns a SiteList whose requests are made to this mock without
+        requesting the site first
+        """
+        site_list = SharepointList(
+            con=self,
+            protocol=MSGraphProtocol(),
+            main_resource=f"sites/{SITE_ID}",
+            __cloud_data__={"id": name, "displayName": name},
+        )
+        return SiteList(site_list, config=config or self.config)
+
+    def add_list(
+        self,
+        name: str,
+        columns: List[dict] = None,
+        items: List[dict] = None,
+    ) -> None:
+        """Adds a list with the columns and items passed to the site"""
+        self.lists[name] = {}
+        self.columns[name] = columns or COLUMNS
+        for fields in items or []:
+            self.create_item(name, fields)
+
+    def add_folder(self, item_id: str, name: str, parent: str = None) -> dict:
+        """Adds a folder to the document library and returns its JSON"""
+        folder = self._drive_item(item_id, name, parent, folder={})
+        self.drive_items[item_id] = folder
+        return folder
+
+    def add_file(self, parent: str, name: str, content: bytes) -> dict:
+        """Adds a file to a folder in the document library, replacing the file
+        with the same name if one exists, and returns its JSON
+        """
+        for item in self.children(parent):
+            if item["name"] == name and "file" in item:
+                item_id = item["id"]
+                break
+        else:
+            item_id = str(next(self.ids))
+        file = self._drive_item(item_id, name, parent, file={})
+        file["size"] = len(content)
+        self.drive_items[item_id] = file
+        self.files[item_id] = content
+        return file
+
+    def children(self, parent: str) -> List[dict]:
+        """Returns the JSON of the items in a folder"""
+        return [
+            item
+            for item in self.drive_items.values()
+            if item["parentReference"].get("id") == parent
+        ]
+
+    def create_item(self, list_name: str, fields: dict) -> dict:
+        """Adds an item to a list and returns its JSON"""
+        with self.lock:
+            item_id = str(next(self.ids))
+        item = {"id": item_id, "eTag": f"{item_id}.1", "fields": dict(fields)}
+        self.lists[list_name][item_id] = item
+        return item
+
+    def update_item(
+        self,
+        list_name: str,
+        item_id: str,
+        fields: dict,
+    ) -> MockResponse:
+        """Updates the fields of an item and returns its fields"""
+        item = self.lists[list_name].get(item_id)
+        if item is None:
+            return MockResponse({"error": {"code": "itemNotFound"}}, 404)
+        item["fields"].update(fields)
+        return MockResponse(item["fields"])
+
+    def get(self, url: str, params: dict = None, **kwargs) -> MockResponse:
+        """Answers requests for the site, lists, items, and drive items"""
+        path, query = self._request("GET", url, params)
+        params = {**query, **(params or {})}
+        if match := re.fullmatch(r"sites/([^/]+)", path):
+            return MockResponse({"id": match.group(1), "name": "mock"})
+        if match := re.search(r"/lists/([^/]+)$", path):
+            name = match.group(1)
+            if name not in self.lists:
+                return MockResponse({}, 404)
+            return MockResponse({"id": name, "displayName": name})
+        if match := re.search(r"/lists/([^/]+)/columns$", path):
+            return MockResponse({"value": self.columns[match.group(1)]})
+        if match := re.search(r"/lists/([^/]+)/items$", path):
+            items = list(self.lists[match.group(1)].values())
+            return self._page(url, items, params)
+        if match := re.search(r"(?:^|/)drives/([^/]+)$", path):
+            return MockResponse({"id": match.group(1), "name": "Documents"})
+        if match := re.search(r"/root:(.+)$", path):
+            return self._get_by_path(match.group(1))
+        if match := re.search(r"/items/([^/]+)/children$", path):
+            return self._page(url, self.children(match.group(1)), params)
+        if match := re.search(r"/items/([^/]+)/content$", path):
+            content = self.files.get(match.group(1))
+            if content is None:
+                return MockResponse({}, 404)
+            return MockResponse(content=content)
+        if match := re.search(r"/items/([^/]+)$", path):
+            item = self.drive_items.get(match.group(1))
+            return MockResponse(item, 200 if item else 404)
+        return MockResponse({"error": {"code": "invalidRequest"}}, 400)
+
+    def post(self, url: str, data: dict = None, **kwargs) -> MockResponse:
+        """Creates a list item or answers each request in a $batch request"""
+        path, _ = self._request("POST", url, data)
+        if path.endswith("$batch"):
+            responses = [self._batch_response(req) for req in data["requests"]]
+            return MockResponse({"responses": responses})
+        list_name = re.search(r"/lists/([^/]+)/items$", path).group(1)
+        return MockResponse(self.create_item(list_name, data["fields"]), 201)
+
+    def patch(self, url: str, data: dict = None, **kwargs) -> MockResponse:
+        """Updates the fields of a list item"""
+        path, _ = self._request("PATCH", url, data)
+        match = re.search(r"/lists/([^/]+)/items/([^/]+)/fields$", path)
+        return self.update_item(match.group(1), match.group(2), data)
+
+    def put(self, url: str, data: bytes = None, **kwargs) -> MockResponse:
+        """Uploads a file to a folder in the document library"""
+        path, _ = self._request("PUT", url, None)
+        match = re.search(r"/items/([^/:]+):/([^/:]+):/content$", path)
+        parent, name = match.group(1), unquote(match.group(2))
+        return MockResponse(self.add_file(parent, name, data), 201)
+
+    def _request(self, method: str, url: str, data) -> tuple:
+        """Records a request, waits for the configured latency, and returns
+        the path and query string parameters of the url
+        """
+        self.requests.append((method, url, data))
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(url)
+        path = parsed.path.split("/v1.0/", 1)[-1].strip("/")
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        return path, query
+
+    def _page(self, url: str, items: List[dict], params: dict) -> MockResponse:
+        """Returns the page of items that starts at the $skiptoken param"""
+        start = int(params.get("$skiptoken", 0))
+        top = int(params.get("$top", self.page_size))
+        stop = start + min(top, self.page_size)
+        page = {"value": items[start:stop]}
+        if stop < len(items):
+            base_url = url.split("?", 1)[0]
+            page[
+                "@odata.nextLink"
+            ] = f"{base_url}?$top={top}&$skiptoken={stop}"
+        return MockResponse(page)
+
+    def _get_by_path(self, path: str) -> MockResponse:
+        """Returns the drive item at a path relative to the root folder"""
+        parent = ROOT_ID
+        item = None
+        for name in unquote(path).strip("/").split("/"):
+            children = self.children(parent)
+            item = next((i for i in children if i["name"] == name), None)
+            if item is None:
+                return MockResponse({"error": {"code": "itemNotFound"}}, 404)
+            parent = item["id"]
+        return MockResponse(item)
+
+    def _batch_response(self, request: dict) -> dict:
+        """Returns the response to one of the requests in a $batch request"""
+        if self.throttle and self.random.random() < self.throttle:
+            return {
+                "id": request["id"],
+                "status": 429,
+                "headers": {"Retry-After": str(self.retry_after)},
+                "body": {"error": {"code": "tooManyRequests"}},
+            }
+        list_name = re.search(r"/lists/([^/]+)/items", request["url"]).group(1)
+        if request["method"] == "POST":
+            body = self.create_item(list_name, request["body"]["fields"])
+            status = 201
+        else:
+            item_id = re.search(r"/items/([^/]+)", request["url"]).group(1)
+            response = self.update_item(list_name, item_id, request["body"])
+            body, status = response.json(), response.status_code
+        return {"id": request["id"], "status": status, "body": body}
+
+    @staticmethod
+    def _drive_item(
+        item_id: str,
+        name: str,
+        parent: str = None,
+        **facets,
+    ) -> dict:
+        """Returns the JSON of a file or folder in the document library"""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        return {
+            "id": item_id,
+            "name": name,
+            "createdDateTime": now,
+            "lastModifiedDateTime": now,
+            "parentReference": {"driveId": DRIVE_ID, "id": parent},
+            **facets,
+        }
@@ -1,37 +1,74 @@
 from __future__ import annotations
-from typing import Iterable
+from typing import Dict, Iterable
 
+import sqlalchemy as sa
+from more_itertools import chunked
 from sqlalchemy.orm import Session
 
 from dgs_fiscal.systems.citibuy import models
 from tests.utils import citibuy_data as data
 
+BATCH_SIZE = 10_000  # number of records inserted by each executemany()
 
-def add_to_session(session: Session, entries: Iterable) -> None:
-    """Adds uncommitted schema objects to the session
+# fixture records for each model, in the order they need to be inserted
+FIXTURES: Dict[models.Base, dict] = {
+    models.Location: data.LOCATIONS,
+    models.Vendor: data.VENDORS,
+    models.Address: data.ADDRESSES,
+    models.VendorAddress: data.VEN_ADDRESS,
+    models.PurchaseOrder: data.PO_RECORDS,
+    models.BlanketContract: data.CONTRACTS,
+    models.Invoice: data.INVOICES,
+    models.InvoiceStatusHistory: data.INV_HISTORY,
+    models.Receipt: data.RECEIPTS,
+    models.Approver: data.APPROVERS,
+}
 
-    Parameters
-    ----------
-    session: Session
-        The SQLAlchemy session to add the items to before committing
-    entries: Iterable
-        An iterable of instances of SQLAlchemy models to add to the session
-    """
-    for entry in entries:
-        session.add(entry)
 
-
-def create_records(model: models.Base, records: dict):
-    """Uses a SQLAlchemy model to create a record for each entry in the data
+def bulk_insert(
+    session: Session,
+    model: models.Base,
+    records: Iterable[dict],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Inserts records into a model's table in batches, sending each batch
+    as a single executemany() instead of adding each model instance to the
+    session
 
     Parameters
     ----------
+    session: Session
+        The SQLAlchemy session used to insert the records
     model: models.Base
         A model that inherits from SQLAlchemy's declarative base
-    records: dict
-        A dictionary of entries to insert into the test database
+    records: Iterable[dict]
+        The records to insert, keyed by the model's attribute names. This can
+        be a generator so that the records are created one batch at a time
+    batch_size: int, optional
+        The number of records inserted by each executemany()
+
+    Returns
+    -------
+    int
+        The number of records that were inserted
     """
-    return [model(**entry) for entry in records.values()]
+    # maps the model's attribute names to the names of the table's columns
+    cols = {
+        prop.key: prop.columns[0].key
+        for prop in sa.inspect(model).column_attrs
+    }
+    stmt = sa.insert(model.__table__)
+    count = 0
+    for batch in chunked(records, batch_size):
+        # every record in an executemany() needs to set the same columns
+        attrs = set().union(*batch)
+        batch = [
+            {cols[attr]: record.get(attr) for attr in attrs}
+            for record in batch
+        ]
+        session.execute(stmt, batch)
+        count += len(batch)
+    return count
 
 
 def populate_db(session: Session) -> None:
@@ -42,25 +79,6 @@ def populate_db(session: Session) -> None:
     session: Session
         A SQLAlchemy session object passed to this function by the fixture
     """
-    vendors = create_records(models.Vendor, data.VENDORS)
-    po_records = create_records(models.PurchaseOrder, data.PO_RECORDS)
-    invoices = create_records(models.Invoice, data.INVOICES)
-    contracts = create_records(models.BlanketContract, data.CONTRACTS)
-    addresses = create_records(models.Address, data.ADDRESSES)
-    locations = create_records(models.Location, data.LOCATIONS)
-    ven_addresses = create_records(models.VendorAddress, data.VEN_ADDRESS)
-    inv_history = create_records(models.InvoiceStatusHistory, data.INV_HISTORY)
-    receipts = create_records(models.Receipt, data.RECEIPTS)
-    approvers = create_records(models.Approver, data.APPROVERS)
-
-    add_to_session(session, vendors)
-    add_to_session(session, po_records)
-    add_to_session(session, invoices)
-    add_to_session(session, contracts)
-    add_to_session(session, addresses)
-    add_to_session(session, locations)
-    add_to_session(session, ven_addresses)
-    add_to_session(session, inv_history)
-    add_to_session(session, receipts)
-    add_to_session(session, approvers)
+    for model, records in FIXTURES.items():
+        bulk_insert(session, model, records.values())
     session.commit()
@@ -0,0 +1,286 @@
+"""Generates synthetic CitiBuy data at scale for benchmarking the ETL
+workflows against a local version of the CitiBuy database
+
+The records are created by cycling through the fixture records in
+tests/utils/citibuy_data.py and giving each copy a unique key, so the
+synthetic data covers the same mix of statuses, agencies, and contract types
+as the unit tests. Dates are spread over the past year by default so that the
+date filters in the CitiBuy queries include a realistic share of the rows.
+
+The records are generated lazily and inserted in batches, so databases with
+millions of rows can be created from the command line, e.g.
+
+    python -m tests.utils.synthetic_data sqlite:///citibuy.db --rows 1000000
+"""
+from __future__ import annotations
+import argparse
+import random
+from datetime import datetime, timedelta
+from itertools import cycle
+from typing import Dict, Iterator
+
+import sqlalchemy
+from sqlalchemy.orm import Session
+
+from dgs_fiscal.systems.citibuy import models
+from tests.utils import citibuy_data as data
+from tests.utils.populate_citibuy_db import BATCH_SIZE, bulk_insert
+
+RELEASES = 4  # number of PO rows for each PO number, including release 0
+DISTRIBUTIONS = ("uniform", "recent")
+
+
+class SyntheticCitiBuy:
+    """Creates synthetic records for each of the CitiBuy tables
+
+    Attributes
+    ----------
+    rows: int
+        The number of invoices, purchase orders, and receipts to create
+    vendors: int
+        The number of vendors the records are spread across
+    seed: int
+        Seed for the random number generator so the data is reproducible
+    days: int
+        The number of days in the past the dates are spread over
+    distribution: str
+        How the dates are spread over that period, either "uniform" or
+        "recent", which places half of the dates in the most recent eighth
+        of the period like the activity in the production database
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        rows: int,
+        vendors: int = None,
+        seed: int = 0,
+        days: int = 365,
+        distribution: str = "uniform",
+    ) -> None:
+        """Inits the SyntheticCitiBuy class"""
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown date distribution '{distribution}'")
+        self.rows = rows
+        self.vendors = vendors or max(rows // 100, len(data.VENDORS))
+        self.seed = seed
+        self.days = days
+        self.distribution = distribution
+        self.random = random.Random(seed)
+        self.today = datetime.combine(datetime.today(), datetime.min.time())
+
+    def days_ago(self, max_days: int = None) -> datetime:
+        """Returns a random date within the past max_days, which defaults to
+        the number of days the dates are spread over
+        """
+        max_days = max_days or self.days
+        if self.distribution == "recent":
+            # exponential with a median of an eighth of the period
+            mean = max_days / (8 * 0.693)
+            days = min(int(self.random.expovariate(1 / mean)), max_days)
+        else:
+            days = self.random.randint(0, max_days)
+        return self.today - timedelta(days)
+
+    def vendor_id(self, i: int) -> str:
+        """Returns the vendor id for the ith record"""
+        return f"{i % self.vendors:08d}"
+
+    def po_key(self, i: int) -> tuple:
+        """Returns the PO and release number for the ith record"""
+        return f"P{i // RELEASES:07d}", i % RELEASES
+
+    def tables(self) -> Dict[models.Base, Iterator[dict]]:
+        """Returns a generator of the synthetic records for each model, in
+        the order they need to be inserted
+        """
+        return {
+            models.Location: iter(data.LOCATIONS.values()),
+            models.Vendor: self.vendor_records(),
+            models.Address: self.address_records(),
+            models.VendorAddress: self.vendor_address_records(),
+            models.PurchaseOrder: self.po_records(),
+            models.BlanketContract: self.contract_records(),
+            models.Invoice: self.invoice_records(),
+            models.InvoiceStatusHistory: self.history_records(),
+            models.Receipt: self.receipt_records(),
+            models.Approver: self.approver_records(),
+        }
+
+    def vendor_records(self) -> Iterator[dict]:
+        """Yields a record for each vendor"""
+        templates = cycle(data.VENDORS.values())
+        for i, template in zip(range(self.vendors), templates):
+            yield {
+                **template,
+                "vendor_id": self.vendor_id(i),
+                "name": f"Vendor {i}",
+            }
+
+    def address_records(self) -> Iterator[dict]:
+        """Yields a mailing address for each vendor"""
+        templates = cycle(data.ADDRESSES.values())
+        for i, template in zip(range(self.vendors), templates):
+            yield {**template, "address_id": self.vendor_id(i)}
+
+    def vendor_address_records(self) -> Iterator[dict]:
+        """Yields the record that links each vendor to its mailing address"""
+        for i in range(self.vendors):
+            yield {
+                "vendor_id": self.vendor_id(i),
+                "address_id": self.vendor_id(i),
+                "address_type": "M",
+                "default": "Y",
+            }
+
+    def po_records(self) -> Iterator[dict]:
+        """Yields a record for each PO and release"""
+        templates = cycle(data.PO_RECORDS.values())
+        for i, template in zip(range(self.rows), templates):
+            po_nbr, release_nbr = self.po_key(i)
+            yield {
+                **template,
+                "po_nbr": po_nbr,
+                "release_nbr": release_nbr,
+                "vendor_id": self.vendor_id(i // RELEASES),
+                "date": self.days_ago(),
+            }
+
+    def contract_records(self) -> Iterator[dict]:
+        """Yields a blanket contract for every other PO number"""
+        templates = cycle(data.CONTRACTS.values())
+        for i, template in zip(range(0, self.rows, RELEASES * 2), templates):
+            start_date = self.days_ago(730)
+            yield {
+                **template,
+                "po_nbr": self.po_key(i)[0],
+                "release_nbr": 0,
+                "start_date": start_date,
+                "end_date": start_date + timedelta(730),
+            }
+
+    def invoice_records(self) -> Iterator[dict]:
+        """Yields a record for each invoice, spread across the POs"""
+        templates = cycle(data.INVOICES.values())
+        for i, template in zip(range(self.rows), templates):
+            po_nbr, release_nbr = self.po_key(i)
+            yield {
+                **template,
+                "id": f"invoice{i}",
+                "po_nbr": po_nbr,
+                "release_nbr": release_nbr,
+                "vendor_id": self.vendor_id(i // RELEASES),
+                "invoice_nbr": f"Invoice#{i}",
+                "invoice_date": self.days_ago(),
+                "modified": self.days_ago(),
+            }
+
+    def history_records(self) -> Iterator[dict]:
+        """Yields a status change for each invoice"""
+        templates = cycle(data.INV_HISTORY.values())
+        for i, template in zip(range(self.rows), templates):
+            yield {
+                **template,
+                "id": f"update{i}",
+                "invoice_id": f"invoice{i}",
+                "invoice_nbr": f"Invoice#{i}",
+                "vendor_id": self.vendor_id(i // RELEASES),
+                "status_date": self.days_ago(),
+            }
+
+    def receipt_records(self) -> Iterator[dict]:
+        """Yields a record for each receipt, spread across the POs"""
+        templates = cycle(data.RECEIPTS.values())
+        for i, template in zip(range(self.rows), templates):
+            po_nbr, release_nbr = self.po_key(i)
+            yield {
+                **template,
+                "receipt_id": f"D{i:07d}",
+                "po_nbr": po_nbr,
+                "release_nbr": release_nbr,
+                "desc": f"Invoice#{i}",
+                "created_date": self.days_ago(),
+                "modified_date": self.days_ago(),
+            }
+
+    def approver_records(self) -> Iterator[dict]:
+        """Yields two approvers in the approval path of each receipt"""
+        templates = cycle(data.APPROVERS.values())
+        for i in range(self.rows):
+            for order in (1, 2):
+                yield {
+                    **next(templates),
+                    "receipt_id": f"D{i:07d}",
+                    "order": order,
+                    "requested_date": self.days_ago(),
+                }
+
+
+def create_synthetic_db(  # pylint: disable=too-many-arguments
+    conn_url: str,
+    rows: int,
+    seed: int = 0,
+    days: int = 365,
+    distribution: str = "uniform",
+    batch_size: int = BATCH_SIZE,
+) -> str:
+    """Creates a local CitiBuy database populated with synthetic data
+
+    Parameters
+    ----------
+    conn_url: str
+        The connection url of the database to create, e.g. sqlite:///mock.db
+    rows: int
+        The number of invoices, purchase orders, and receipts to create
+    seed: int, optional
+        Seed for the random number generator so the data is reproducible
+    days: int, optional
+        The number of days in the past the dates are spread over
+    distribution: str, optional
+        How the dates are spread over that period, either "uniform" or
+        "recent"
+    batch_size: int, optional
+        The number of records inserted by each executemany()
+
+    Returns
+    -------
+    str
+        The connection url of the populated database
+    """
+    synthetic = SyntheticCitiBuy(
+        rows, seed=seed, days=days, distribution=distribution
+    )
+    engine = sqlalchemy.create_engine(conn_url)
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for model, records in synthetic.tables().items():
+            bulk_insert(session, model, records, batch_size)
+        session.commit()
+    engine.dispose()
+    return conn_url
+
+
+def main() -> None:
+    """Creates a synthetic CitiBuy database from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("conn_url", help="e.g. sqlite:///citibuy.db")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument(
+        "--distribution", choices=DISTRIBUTIONS, default="uniform"
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    create_synthetic_db(
+        args.conn_url,
+        args.rows,
+        seed=args.seed,
+        days=args.days,
+        distribution=args.distribution,
+        batch_size=args.batch_size,
+    )
+    print(f"Created {args.rows} synthetic CitiBuy records at {args.conn_url}")
+
+
+if __name__ == "__main__":
+    main()